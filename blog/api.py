@@ -0,0 +1,174 @@
+"""
+API JSON somente leitura (v1) - SQL PURO, sem templates
+
+Rotas:
+    GET /api/v1/posts/                         lista (cursor: ?depois= / ?antes=)
+    GET /api/v1/posts/<slug>/                  um post
+    GET /api/v1/posts/<slug>/comentarios/      comentários do post (cursor)
+    GET /api/v1/ranking/                       top N "Em alta", "Mais comentados" e "Mais vistos"
+
+Parâmetros:
+- fields=id,titulo,slug  campos retornados (só eles são lidos do banco)
+- por_pagina=N           10 a 100 (padrão 20)
+- categoria=<id>         filtro da lista de posts
+
+Respostas levam ETag (hash do corpo) e respondem 304 a If-None-Match.
+Serialização com orjson quando instalado (pip install orjson); sem ele,
+json da biblioteca padrão.
+"""
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from . import consultas, paginacao, ranking
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+
+CAMPOS_PADRAO_LISTA = [campo for campo in consultas.CAMPOS_POST
+                       if campo not in ('conteudo', 'conteudo_html')]
+CAMPOS_PADRAO_DETALHE = [campo for campo in consultas.CAMPOS_POST if campo != 'resumo']
+
+
+def serializar(dados):
+    if orjson is not None:
+        return orjson.dumps(dados)
+    return json.dumps(dados, cls=DjangoJSONEncoder, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def resposta_json(request, dados, status=200):
+    """HttpResponse JSON com ETag; 304 se o cliente já tem o mesmo corpo"""
+    corpo = serializar(dados)
+    response = HttpResponse(corpo, status=status, content_type='application/json')
+    if status != 200:
+        return response
+
+    etag = '"%s"' % hashlib.md5(corpo, usedforsecurity=False).hexdigest()
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def erro(request, mensagem, status):
+    return resposta_json(request, {'erro': mensagem}, status=status)
+
+
+def ler_campos(request, padrao):
+    """
+    Lista de campos de ?fields= (na ordem pedida) ou o padrão
+
+    Retorna (campos, desconhecidos)
+    """
+    texto = request.GET.get('fields', '').strip()
+    if not texto:
+        return padrao, []
+    pedidos = list(dict.fromkeys(campo.strip() for campo in texto.split(',') if campo.strip()))
+    desconhecidos = [campo for campo in pedidos if campo not in consultas.CAMPOS_POST]
+    return pedidos, desconhecidos
+
+
+def links_pagina(request, pagina):
+    """URLs absolutas das páginas vizinhas (mantém os demais parâmetros)"""
+    def link(nome, valor):
+        if valor is None:
+            return None
+        parametros = request.GET.copy()
+        parametros.pop('antes', None)
+        parametros.pop('depois', None)
+        parametros[nome] = valor
+        return request.build_absolute_uri(f"{request.path}?{parametros.urlencode()}")
+
+    return {
+        'proximo': link('depois', pagina.proximo),
+        'anterior': link('antes', pagina.anterior),
+    }
+
+
+@require_GET
+def posts(request):
+    """
+    Lista paginada de posts
+
+    SQL EXECUTADO:
+    1. SELECT <fields> FROM blog_post ... ORDER BY criado_em DESC, id DESC LIMIT N+1
+    """
+    campos, desconhecidos = ler_campos(request, CAMPOS_PADRAO_LISTA)
+    if desconhecidos:
+        return erro(request, f"Campos inválidos: {', '.join(desconhecidos)}", 400)
+
+    categoria_id = request.GET.get('categoria')
+    if categoria_id is not None:
+        try:
+            categoria_id = int(categoria_id)
+        except ValueError:
+            return erro(request, 'categoria deve ser um número.', 400)
+
+    pagina = paginacao.PaginaKeyset(
+        consultas.ORDENACAO_POSTS, request.GET,
+        por_pagina=paginacao.ler_por_pagina(request.GET, padrao=20, minimo=1, maximo=100),
+    )
+    resultados = consultas.listar_posts(campos, pagina, categoria_id)
+
+    return resposta_json(request, {'resultados': resultados, **links_pagina(request, pagina)})
+
+
+@require_GET
+def post(request, slug):
+    """
+    Um post pelo slug
+
+    SQL EXECUTADO:
+    1. SELECT <fields> FROM blog_post ... WHERE slug = %s
+    """
+    campos, desconhecidos = ler_campos(request, CAMPOS_PADRAO_DETALHE)
+    if desconhecidos:
+        return erro(request, f"Campos inválidos: {', '.join(desconhecidos)}", 400)
+
+    dados = consultas.buscar_post(slug, campos)
+    if dados is None:
+        return erro(request, 'Post não encontrado.', 404)
+    return resposta_json(request, dados)
+
+
+@require_GET
+def comentarios(request, slug):
+    """
+    Comentários paginados de um post
+
+    SQL EXECUTADO:
+    1. SELECT id FROM blog_post WHERE slug = %s
+    2. SELECT comentários ... ORDER BY criado_em DESC, id DESC LIMIT N+1
+    """
+    post_id = consultas.id_do_post(slug)
+    if post_id is None:
+        return erro(request, 'Post não encontrado.', 404)
+
+    pagina = paginacao.PaginaKeyset(
+        consultas.ORDENACAO_COMENTARIOS, request.GET,
+        por_pagina=paginacao.ler_por_pagina(request.GET, padrao=20, minimo=1, maximo=100),
+    )
+    resultados = consultas.listar_comentarios(post_id, pagina)
+
+    return resposta_json(request, {'resultados': resultados, **links_pagina(request, pagina)})
+
+
+@require_GET
+def ranking_posts(request):
+    """
+    Posts "Em alta", "Mais comentados" e "Mais vistos" (mesmo cache do
+    widget de post_list)
+
+    SQL EXECUTADO (apenas no recálculo do cache, ver ranking.py):
+    1. Consolidar baldes de atividade
+    2. SELECT top N por pontuação (índice)
+    """
+    return resposta_json(request, ranking.ranking_posts())
@@ -96,21 +96,27 @@ class PerfilAtivoBackend(ModelBackend):
         """
         Recupera usuário pelo ID durante a sessão
         
+        Perfil desativado -> None: a sessão deixa de valer na próxima
+        requisição (desativação em massa não precisa apagar sessões)
+        
         OPERAÇÃO SQL:
-        SELECT * FROM auth_user WHERE id = %s
+        SELECT auth_user.* LEFT JOIN blog_perfilusuario WHERE id = %s
         """
         try:
             with connection.cursor() as cursor:
                 # SQL EXECUTADO:
                 # SELECT id, username, password, first_name, last_name, email, 
-                #        is_staff, is_active, is_superuser, date_joined, last_login
-                # FROM auth_user 
+                #        is_staff, is_active, is_superuser, date_joined, last_login,
+                #        perfil.ativo
+                # FROM auth_user LEFT JOIN blog_perfilusuario
                 # WHERE id = %s
                 cursor.execute("""
-                    SELECT id, username, password, first_name, last_name, email, 
-                           is_staff, is_active, is_superuser, date_joined, last_login
-                    FROM auth_user 
-                    WHERE id = %s
+                    SELECT u.id, u.username, u.password, u.first_name, u.last_name, u.email, 
+                           u.is_staff, u.is_active, u.is_superuser, u.date_joined, u.last_login,
+                           p.ativo
+                    FROM auth_user u
+                    LEFT JOIN blog_perfilusuario p ON p.usuario_id = u.id
+                    WHERE u.id = %s
                 """, [user_id])
                 
                 user_data = cursor.fetchone()
@@ -118,6 +124,10 @@ class PerfilAtivoBackend(ModelBackend):
                 if not user_data:
                     return None
                 
+                # Perfil desativado por um admin (sem perfil = usuário antigo, permitido)
+                if user_data[11] is False:
+                    return None
+                
                 # Reconstruir objeto User
                 user = User(
                     id=user_data[0],
@@ -197,6 +207,10 @@ CASO: USUÁRIO DESATIVADO
    - Verifica perfil.ativo: FALSE
    - Retorna None → LOGIN BLOQUEADO
 
+3. Sessão já aberta do usuário:
+   - get_user() traz perfil.ativo junto com o usuário: FALSE
+   - Retorna None → request.user vira anônimo na próxima requisição
+
 
 CASO: USUÁRIO SEM PERFIL
 -------------------------
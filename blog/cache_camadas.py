@@ -0,0 +1,294 @@
+"""
+Cache em duas camadas: LRU no processo + cache compartilhado
+
+Backend de cache do Django (CACHES['default'], ver settings):
+
+- Camada local: LRU em memória do worker, limitado a MAXIMO_LOCAL entradas,
+  cada uma válida por no máximo SEGUNDOS_LOCAL (ou o timeout da chave, se
+  menor). Leituras repetidas não saem do processo.
+- Camada compartilhada: outro alias de CACHES (Redis em produção; cache em
+  arquivo como substituto local), visto por todos os processos e servidores.
+
+Leitura: local -> compartilhado (e guarda na local). Escrita/remoção vão à
+compartilhada e atualizam/descartam a local. A camada local guarda o
+próprio objeto (sem pickle): não altere o que get() devolver.
+
+Outro processo pode servir a cópia local antiga por até SEGUNDOS_LOCAL;
+as invalidações do barramento (invalidacao.py) rodam em todos os
+processos e descartam as cópias locais na hora.
+
+O Django cria uma instância do backend por thread (e por contexto async
+no ASGI). O LRU, suas travas e os contadores ficam no módulo, por LOCATION,
+como o _caches do LocMemCache: todas as instâncias do processo enxergam
+a mesma camada local - inclusive a thread do ouvinte de invalidação.
+
+add() é a trava de recálculo de revalidacao.py e precisa ser atômico entre
+processos. No processo, uma trava do módulo serializa os add(); entre
+processos vale o add da camada compartilhada, atômico no Redis/memcached
+(SET NX) mas não no cache em arquivo (has_key + set) nem no LocMemCache
+(um por processo). Com DEBUG=False, add() exige uma camada compartilhada
+com add atômico (ImproperlyConfigured se não tiver); o cache em arquivo só
+serve para desenvolvimento.
+
+Métricas por processo (cache.metricas()): acertos/falhas de cada camada,
+entradas removidas pelo limite do LRU e acertos negativos.
+
+Cache negativo: consultar_com_negativo() guarda MARCA_AUSENTE quando a
+busca não encontra nada (ex.: post inexistente em post_detail), e a
+próxima consulta pela mesma chave nem chega ao banco.
+
+OPTIONS:
+- COMPARTILHADO: alias da camada compartilhada (padrão 'compartilhado')
+- MAXIMO_LOCAL: entradas no LRU local (padrão 1000)
+- SEGUNDOS_LOCAL: validade máxima de uma entrada local (padrão 5)
+- ADD_ATOMICO: declara o add da camada compartilhada atômico para todos
+  os processos que a usam (ex.: testes num processo só com LocMemCache)
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+
+
+MARCA_AUSENTE = '__ausente__'
+
+_SEM_VALOR = object()
+
+# Camada local de cada LOCATION, compartilhada pelas instâncias do processo
+_entradas = {}
+_contagens = {}
+_travas = {}
+_travas_add = {}
+
+# Backends cujo add() é atômico entre processos (SET NX no servidor)
+BACKENDS_ADD_ATOMICO = (RedisCache, BaseMemcachedCache)
+
+
+class CacheEmCamadas(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        opcoes = params.get('OPTIONS', {})
+        self.alias_compartilhado = opcoes.get('COMPARTILHADO', 'compartilhado')
+        self.maximo_local = opcoes.get('MAXIMO_LOCAL', 1000)
+        self.segundos_local = opcoes.get('SEGUNDOS_LOCAL', 5)
+        self.add_atomico = opcoes.get('ADD_ATOMICO', False)
+        self.entradas = _entradas.setdefault(location, OrderedDict())
+        self.contagens = _contagens.setdefault(location, Counter())
+        self.trava = _travas.setdefault(location, threading.Lock())
+        self.trava_add = _travas_add.setdefault(location, threading.Lock())
+
+    @cached_property
+    def compartilhado(self):
+        return caches[self.alias_compartilhado]
+
+    def _exigir_add_atomico(self):
+        if settings.DEBUG or self.add_atomico:
+            return
+        if not isinstance(self.compartilhado, BACKENDS_ADD_ATOMICO):
+            raise ImproperlyConfigured(
+                f'A camada compartilhada {self.alias_compartilhado!r} '
+                f'({type(self.compartilhado).__name__}) não tem add() atômico entre '
+                'processos: configure REDIS_URL'
+            )
+
+    # ---- camada local ----
+
+    def _validade_local(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self.segundos_local
+        return min(timeout, self.segundos_local)
+
+    def _ler_local(self, chave_local):
+        with self.trava:
+            entrada = self.entradas.get(chave_local)
+            if entrada is None:
+                self.contagens['local_falhas'] += 1
+                return _SEM_VALOR
+            expira_em, valor = entrada
+            if expira_em <= time.monotonic():
+                del self.entradas[chave_local]
+                self.contagens['local_falhas'] += 1
+                return _SEM_VALOR
+            self.entradas.move_to_end(chave_local)
+            self.contagens['local_acertos'] += 1
+            if valor == MARCA_AUSENTE:
+                self.contagens['negativos'] += 1
+            return valor
+
+    def _gravar_local(self, chave_local, valor, timeout):
+        segundos = self._validade_local(timeout)
+        with self.trava:
+            if segundos <= 0:
+                self.entradas.pop(chave_local, None)
+                return
+            self.entradas[chave_local] = (time.monotonic() + segundos, valor)
+            self.entradas.move_to_end(chave_local)
+            while len(self.entradas) > self.maximo_local:
+                self.entradas.popitem(last=False)
+                self.contagens['local_removidas'] += 1
+
+    def _descartar_local(self, chaves_locais):
+        with self.trava:
+            for chave_local in chaves_locais:
+                self.entradas.pop(chave_local, None)
+
+    def _contar_compartilhado(self, acertos, falhas):
+        with self.trava:
+            self.contagens['compartilhado_acertos'] += acertos
+            self.contagens['compartilhado_falhas'] += falhas
+
+    # ---- API do Django ----
+
+    def get(self, key, default=None, version=None):
+        chave_local = self.make_and_validate_key(key, version=version)
+        valor = self._ler_local(chave_local)
+        if valor is not _SEM_VALOR:
+            return valor
+
+        valor = self.compartilhado.get(key, _SEM_VALOR, version=version)
+        if valor is _SEM_VALOR:
+            self._contar_compartilhado(0, 1)
+            return default
+        self._contar_compartilhado(1, 0)
+        if valor == MARCA_AUSENTE:
+            with self.trava:
+                self.contagens['negativos'] += 1
+        # A validade restante na compartilhada não é conhecida: fica o teto local
+        self._gravar_local(chave_local, valor, None)
+        return valor
+
+    def get_many(self, keys, version=None):
+        encontrados = {}
+        faltando = []
+        for key in keys:
+            valor = self._ler_local(self.make_and_validate_key(key, version=version))
+            if valor is _SEM_VALOR:
+                faltando.append(key)
+            else:
+                encontrados[key] = valor
+
+        if faltando:
+            compartilhados = self.compartilhado.get_many(faltando, version=version)
+            self._contar_compartilhado(len(compartilhados), len(faltando) - len(compartilhados))
+            for key, valor in compartilhados.items():
+                self._gravar_local(self.make_and_validate_key(key, version=version), valor, None)
+            encontrados.update(compartilhados)
+        return encontrados
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        chave_local = self.make_and_validate_key(key, version=version)
+        self.compartilhado.set(key, value, timeout, version=version)
+        self._gravar_local(chave_local, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        falhas = self.compartilhado.set_many(data, timeout, version=version)
+        for key, valor in data.items():
+            chave_local = self.make_and_validate_key(key, version=version)
+            if key in falhas:
+                self._descartar_local([chave_local])
+            else:
+                self._gravar_local(chave_local, valor, timeout)
+        return falhas
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._exigir_add_atomico()
+        chave_local = self.make_and_validate_key(key, version=version)
+        with self.trava_add:
+            adicionado = self.compartilhado.add(key, value, timeout, version=version)
+        if adicionado:
+            self._gravar_local(chave_local, value, timeout)
+            return True
+        # Outro processo gravou antes: a cópia local (se houver) pode estar velha
+        self._descartar_local([chave_local])
+        return False
+
+    def incr(self, key, delta=1, version=None):
+        chave_local = self.make_and_validate_key(key, version=version)
+        self._descartar_local([chave_local])
+        return self.compartilhado.incr(key, delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._descartar_local([self.make_and_validate_key(key, version=version)])
+        return self.compartilhado.touch(key, timeout, version=version)
+
+    def has_key(self, key, version=None):
+        chave_local = self.make_and_validate_key(key, version=version)
+        with self.trava:
+            entrada = self.entradas.get(chave_local)
+            if entrada is not None and entrada[0] > time.monotonic():
+                return True
+        return self.compartilhado.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        self._descartar_local([self.make_and_validate_key(key, version=version)])
+        return self.compartilhado.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._descartar_local([self.make_and_validate_key(key, version=version) for key in keys])
+        self.compartilhado.delete_many(keys, version=version)
+
+    def clear(self):
+        with self.trava:
+            self.entradas.clear()
+        self.compartilhado.clear()
+
+    def close(self, **kwargs):
+        # Instância que nunca usou a camada compartilhada: nada a fechar
+        if 'compartilhado' in self.__dict__:
+            self.compartilhado.close(**kwargs)
+
+    # ---- métricas ----
+
+    def metricas(self):
+        """
+        Contadores deste processo desde o início:
+        {'local_acertos', 'local_falhas', 'local_removidas',
+         'compartilhado_acertos', 'compartilhado_falhas', 'negativos',
+         'local_entradas', 'taxa_acerto'}  (taxa_acerto em %, as duas camadas)
+        """
+        with self.trava:
+            dados = dict(self.contagens)
+            dados['local_entradas'] = len(self.entradas)
+        for nome in ('local_acertos', 'local_falhas', 'local_removidas',
+                     'compartilhado_acertos', 'compartilhado_falhas', 'negativos'):
+            dados.setdefault(nome, 0)
+        leituras = dados['local_acertos'] + dados['local_falhas']
+        acertos = dados['local_acertos'] + dados['compartilhado_acertos']
+        dados['taxa_acerto'] = round(100 * acertos / leituras, 1) if leituras else None
+        return dados
+
+
+def metricas():
+    """Métricas do cache padrão, ou None se não for CacheEmCamadas"""
+    backend = caches['default']
+    if isinstance(backend, CacheEmCamadas):
+        return backend.metricas()
+    return None
+
+
+def consultar_com_negativo(chave, buscar, segundos):
+    """
+    buscar() com cache negativo: um resultado None fica registrado como
+    MARCA_AUSENTE por `segundos`, e as consultas seguintes devolvem None
+    sem chamar buscar(). Resultados encontrados não são guardados.
+
+    Quem cria o registro procurado chama cache.delete(chave).
+    """
+    if cache.get(chave) == MARCA_AUSENTE:
+        return None
+    resultado = buscar()
+    if resultado is None:
+        cache.set(chave, MARCA_AUSENTE, segundos)
+    return resultado
@@ -0,0 +1,84 @@
+"""
+Cache das categorias - SQL PURO
+
+A lista de categorias com contagem de posts (barra lateral de post_list)
+faz GROUP BY sobre blog_post inteiro a cada página. Ela muda pouco: fica em
+cache e é invalidada quando categorias ou posts mudam. Ao vencer, um único
+processo refaz a consulta enquanto os outros servem a lista anterior
+(ver revalidacao.py).
+
+Quem altera categorias/posts chama invalidar_categorias(), que avisa todos
+os processos pelo barramento de invalidação (ver invalidacao.py).
+"""
+
+from django.core.cache import cache
+from django.db import connection
+
+from . import db_async, invalidacao, revalidacao
+
+
+CACHE_CATEGORIAS_SEGUNDOS = 300
+CHAVE_CATEGORIAS_CONTAGEM = 'categorias:contagem'
+CHAVE_CATEGORIAS_NOMES = 'categorias:nomes'
+
+SQL_CATEGORIAS_CONTAGEM = """
+    SELECT c.id, c.nome, COUNT(p.id) as total_posts
+    FROM blog_categoria c
+    LEFT JOIN blog_post p ON c.id = p.categoria_id AND p.excluido_em IS NULL
+    GROUP BY c.id, c.nome
+    ORDER BY c.nome
+"""
+
+
+def categorias_com_contagem():
+    """
+    [(id, nome, total_posts), ...] ordenado por nome (em cache)
+
+    SQL EXECUTADO (apenas quando o cache expira):
+    SELECT c.id, c.nome, COUNT(p.id) ... GROUP BY c.id, c.nome
+    """
+    def buscar():
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_CATEGORIAS_CONTAGEM)
+            return cursor.fetchall()
+
+    return revalidacao.obter(CHAVE_CATEGORIAS_CONTAGEM, buscar, CACHE_CATEGORIAS_SEGUNDOS)
+
+
+async def acategorias_com_contagem():
+    """
+    Versão assíncrona de categorias_com_contagem() (views_async)
+
+    Mesma chave de cache; a consulta roda pelo pool de db_async.
+    """
+    async def buscar():
+        return await db_async.buscar_todos(SQL_CATEGORIAS_CONTAGEM)
+
+    return await revalidacao.aobter(CHAVE_CATEGORIAS_CONTAGEM, buscar, CACHE_CATEGORIAS_SEGUNDOS)
+
+
+def listar_categorias():
+    """
+    [(id, nome), ...] ordenado por nome (em cache) - para filtros e formulários
+
+    SQL EXECUTADO (apenas quando o cache expira):
+    SELECT id, nome FROM blog_categoria ORDER BY nome
+    """
+    def buscar():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, nome FROM blog_categoria ORDER BY nome")
+            return cursor.fetchall()
+
+    return revalidacao.obter(CHAVE_CATEGORIAS_NOMES, buscar, CACHE_CATEGORIAS_SEGUNDOS)
+
+
+def _descartar(chaves):
+    cache.delete_many([CHAVE_CATEGORIAS_CONTAGEM, CHAVE_CATEGORIAS_NOMES])
+
+
+invalidacao.registrar('categorias', _descartar)
+
+
+def invalidar_categorias():
+    """Descarta as listas de categorias em cache (em todos os processos)"""
+    invalidacao.publicar('categorias')
@@ -0,0 +1,208 @@
+"""
+Consultas de posts compartilhadas (páginas HTML e API) - SQL PURO
+
+CAMPOS_POST mapeia o nome público de cada campo para a expressão SQL e as
+junções de que ela precisa. montar_select_post() monta o SELECT só com os
+campos pedidos: quem não pede conteudo não lê o texto do post, e quem não
+pede autor/categoria não faz o JOIN.
+
+conteudo_html é o HTML pré-renderizado (renderizacao.py); gerado por versão
+antiga do renderizador, vem NULL do SELECT e é renderizado e gravado aqui.
+"""
+
+from datetime import datetime
+
+from django.conf import settings
+from django.utils.text import Truncator
+
+from . import db, paginacao, renderizacao
+
+
+JOIN_AUTOR = "LEFT JOIN auth_user u ON p.autor_id = u.id"
+JOIN_CATEGORIA = "LEFT JOIN blog_categoria c ON p.categoria_id = c.id"
+
+# nome -> (expressão SQL, junções necessárias)
+CAMPOS_POST = {
+    'id': ("p.id", ()),
+    'titulo': ("p.titulo", ()),
+    'slug': ("p.slug", ()),
+    'resumo': ("LEFT(p.conteudo, 1000)", ()),
+    'conteudo': ("p.conteudo", ()),
+    'conteudo_html': (
+        f"CASE WHEN p.versao_html = {renderizacao.VERSAO_HTML} THEN p.conteudo_html END", (),
+    ),
+    'imagem': ("p.imagem", ()),
+    'criado_em': ("p.criado_em", ()),
+    'atualizado_em': ("p.atualizado_em", ()),
+    'autor': ("u.username", (JOIN_AUTOR,)),
+    'categoria_id': ("p.categoria_id", ()),
+    'categoria': ("c.nome", (JOIN_CATEGORIA,)),
+    'total_comentarios': ("p.total_comentarios", ()),
+    'total_reacoes': ("(SELECT COUNT(*) FROM blog_reacaousuariopost r WHERE r.post_id = p.id)", ()),
+}
+
+PALAVRAS_RESUMO = 40
+
+# Chave da paginação por cursor - sempre selecionada (idx_post_criado_id)
+ORDENACAO_POSTS = paginacao.Ordenacao(['p.criado_em', 'p.id'], [datetime, int], descendente=True)
+
+# Comentários de um post, do mais novo ao mais antigo (idx_comentario_post_criado_id)
+ORDENACAO_COMENTARIOS = paginacao.Ordenacao(['c.criado_em', 'c.id'], [datetime, int], descendente=True)
+
+
+def montar_select_post(campos):
+    """
+    SELECT ... FROM blog_post p [JOINs] para os campos pedidos
+
+    As colunas da ordenação (criado_em, id) vêm sempre, com esses nomes,
+    para a paginação por cursor.
+    """
+    nomes = list(dict.fromkeys(['id', 'criado_em', *campos]))
+    colunas = []
+    juncoes = []
+    for nome in nomes:
+        expressao, necessarias = CAMPOS_POST[nome]
+        colunas.append(f"{expressao} AS {nome}")
+        juncoes.extend(j for j in necessarias if j not in juncoes)
+
+    sql = f"SELECT {', '.join(colunas)} FROM blog_post p {' '.join(juncoes)}"
+    return sql, nomes
+
+
+def formatar_valor(nome, valor):
+    """Ajustes de apresentação: caminho da imagem vira URL, resumo é truncado"""
+    if valor is None:
+        return None
+    if nome == 'imagem':
+        return settings.MEDIA_URL + valor
+    if nome == 'resumo':
+        return Truncator(valor).words(PALAVRAS_RESUMO)
+    return valor
+
+
+def linha_para_dict(nomes, linha, campos):
+    return {nome: formatar_valor(nome, valor) for nome, valor in zip(nomes, linha) if nome in campos}
+
+
+def completar_html(nomes, linhas):
+    """
+    Preenche conteudo_html das linhas com HTML de versão antiga
+
+    SQL EXECUTADO (só se houver alguma):
+    SELECT id, conteudo ... + UPDATE conteudo_html (renderizacao.renderizar_posts)
+    """
+    if 'conteudo_html' not in nomes:
+        return linhas
+    i_id, i_html = nomes.index('id'), nomes.index('conteudo_html')
+    pendentes = [linha[i_id] for linha in linhas if linha[i_html] is None]
+    if not pendentes:
+        return linhas
+
+    htmls = renderizacao.renderizar_posts(pendentes)
+    completas = []
+    for linha in linhas:
+        if linha[i_html] is None:
+            linha = list(linha)
+            linha[i_html] = htmls.get(linha[i_id])
+        completas.append(linha)
+    return completas
+
+
+def listar_posts(campos, pagina, categoria_id=None):
+    """
+    Página de posts visíveis (mais novos primeiro), só com os campos pedidos
+
+    SQL EXECUTADO:
+    SELECT <campos> FROM blog_post p [JOINs]
+    WHERE p.excluido_em IS NULL [AND p.categoria_id = %s] [AND (p.criado_em, p.id) < (%s, %s)]
+    ORDER BY p.criado_em DESC, p.id DESC LIMIT por_pagina + 1
+    """
+    select, nomes = montar_select_post(campos)
+    filtros = ["p.excluido_em IS NULL"]
+    params = []
+    if categoria_id is not None:
+        filtros.append("p.categoria_id = %s")
+        params.append(categoria_id)
+
+    condicao, params_cursor = pagina.condicao()
+    if condicao:
+        filtros.append(condicao)
+        params.extend(params_cursor)
+
+    with db.cursor_leitura() as cursor:
+        cursor.execute(f"""
+            {select}
+            WHERE {' AND '.join(filtros)}
+            ORDER BY {pagina.order_by()}
+            LIMIT %s
+        """, params + [pagina.limite])
+        linhas = pagina.ler(cursor)
+
+    linhas = completar_html(nomes, linhas)
+    return [linha_para_dict(nomes, linha, campos) for linha in linhas]
+
+
+def buscar_post(slug, campos):
+    """
+    Post visível pelo slug (dict com os campos pedidos) ou None
+
+    SQL EXECUTADO:
+    SELECT <campos> FROM blog_post p [JOINs] WHERE p.slug = %s AND p.excluido_em IS NULL
+    """
+    select, nomes = montar_select_post(campos)
+    with db.cursor_leitura() as cursor:
+        cursor.execute(f"""
+            {select}
+            WHERE p.slug = %s AND p.excluido_em IS NULL
+        """, [slug])
+        linha = cursor.fetchone()
+
+    if linha is None:
+        return None
+    linha = completar_html(nomes, [linha])[0]
+    return linha_para_dict(nomes, linha, campos)
+
+
+def id_do_post(slug):
+    """
+    SQL EXECUTADO:
+    SELECT id FROM blog_post WHERE slug = %s AND excluido_em IS NULL
+    """
+    with db.cursor_leitura() as cursor:
+        cursor.execute("""
+            SELECT id FROM blog_post WHERE slug = %s AND excluido_em IS NULL
+        """, [slug])
+        linha = cursor.fetchone()
+    return linha[0] if linha else None
+
+
+def listar_comentarios(post_id, pagina):
+    """
+    Página de comentários do post (mais novos primeiro)
+
+    SQL EXECUTADO:
+    SELECT c.id, c.conteudo, c.criado_em, c.atualizado_em, u.username
+    FROM blog_comentario c LEFT JOIN auth_user u ...
+    WHERE c.post_id = %s [AND (c.criado_em, c.id) < (%s, %s)]
+    ORDER BY c.criado_em DESC, c.id DESC LIMIT por_pagina + 1
+    """
+    condicao, params_cursor = pagina.condicao()
+    filtro_cursor = f"AND {condicao}" if condicao else ''
+
+    with db.cursor_leitura() as cursor:
+        cursor.execute(f"""
+            SELECT c.id, c.conteudo, c.criado_em, c.atualizado_em,
+                   u.username as autor
+            FROM blog_comentario c
+            LEFT JOIN auth_user u ON c.autor_id = u.id
+            WHERE c.post_id = %s {filtro_cursor}
+            ORDER BY {pagina.order_by()}
+            LIMIT %s
+        """, [post_id, *params_cursor, pagina.limite])
+        linhas = pagina.ler(cursor)
+
+    return [
+        {'id': id_, 'conteudo': conteudo, 'criado_em': criado_em,
+         'atualizado_em': atualizado_em, 'autor': autor}
+        for id_, conteudo, criado_em, atualizado_em, autor in linhas
+    ]
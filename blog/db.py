@@ -0,0 +1,189 @@
+"""
+Roteamento de leituras para a réplica - SQL PURO
+
+Escritas continuam em django.db.connection (alias 'default', o primário).
+Leituras que toleram alguns segundos de atraso abrem o cursor por
+cursor_leitura(), que escolhe o alias:
+
+- 'replica', se existir em DATABASES (ver settings: DB_REPLICA_HOST)
+- 'default' quando:
+    * a requisição atual é POST/PUT/DELETE ou o cliente escreveu há pouco
+      (cookie de LeituraPrimarioMiddleware: lê o que acabou de escrever)
+    * há uma transação aberta no primário (a leitura precisa enxergá-la)
+    * a réplica está atrasada mais que REPLICA_ATRASO_MAXIMO segundos ou
+      não responde (verificado no máximo a cada INTERVALO_VERIFICACAO s)
+
+Se a réplica cair entre duas verificações, o erro de conexão da leitura
+marca a réplica como indisponível na hora e a mesma consulta é refeita no
+primário (CursorLeitura): a requisição não vê o erro.
+
+Consultas que só alimentam caches (categorias.py, feeds.py, sitemaps.py)
+ficam no primário: rodam raramente, e um resultado atrasado lido da
+réplica ficaria no cache pelo TTL inteiro, não só pelos segundos de atraso.
+
+Teste local com dois PostgreSQL (primário na 5432, réplica por streaming
+na 5433):
+    DB_REPLICA_HOST=127.0.0.1 DB_REPLICA_PORT=5433 python manage.py runserver
+"""
+
+import contextvars
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, InterfaceError, OperationalError, connections
+
+
+logger = logging.getLogger(__name__)
+
+ALIAS_PRIMARIO = 'default'
+ALIAS_REPLICA = 'replica'
+
+ATRASO_MAXIMO = getattr(settings, 'REPLICA_ATRASO_MAXIMO', 5)
+JANELA_POS_ESCRITA = getattr(settings, 'REPLICA_JANELA_POS_ESCRITA', 15)
+INTERVALO_VERIFICACAO = 5
+
+# Ligado por LeituraPrimarioMiddleware durante a requisição
+_forcar_primario = contextvars.ContextVar('forcar_primario', default=False)
+
+_estado = {'verificado_em': 0.0, 'disponivel': False}
+_trava_estado = threading.Lock()
+
+
+def replica_configurada():
+    return ALIAS_REPLICA in settings.DATABASES
+
+
+def forcar_primario(valor=True):
+    """Define a preferência da requisição atual; retorna o token para reset"""
+    return _forcar_primario.set(valor)
+
+
+def restaurar(token):
+    _forcar_primario.reset(token)
+
+
+def atraso_replica():
+    """
+    Segundos de atraso da réplica (0 se em dia ou se não é réplica)
+
+    SQL EXECUTADO (na réplica):
+    SELECT CASE WHEN WAL recebido = WAL aplicado THEN 0
+                ELSE now() - pg_last_xact_replay_timestamp() END
+    """
+    with connections[ALIAS_REPLICA].cursor() as cursor:
+        # Sem nada pendente o atraso é zero, mesmo que o último commit
+        # replicado seja antigo (primário ocioso)
+        cursor.execute("""
+            SELECT CASE
+                WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+            END
+        """)
+        return float(cursor.fetchone()[0])
+
+
+def replica_disponivel():
+    """Réplica respondendo e em dia? (resultado reaproveitado por alguns segundos)"""
+    agora = time.monotonic()
+    if agora - _estado['verificado_em'] < INTERVALO_VERIFICACAO:
+        return _estado['disponivel']
+
+    with _trava_estado:
+        if agora - _estado['verificado_em'] < INTERVALO_VERIFICACAO:
+            return _estado['disponivel']
+        try:
+            atraso = atraso_replica()
+            disponivel = atraso <= ATRASO_MAXIMO
+            if not disponivel:
+                logger.warning('Réplica atrasada %.1fs: leituras no primário', atraso)
+        except DatabaseError:
+            logger.exception('Réplica indisponível: leituras no primário')
+            connections[ALIAS_REPLICA].close()
+            disponivel = False
+        _estado.update(verificado_em=agora, disponivel=disponivel)
+        return disponivel
+
+
+def marcar_replica_indisponivel():
+    """Réplica falhou numa leitura: primário até a próxima verificação"""
+    with _trava_estado:
+        _estado.update(verificado_em=time.monotonic(), disponivel=False)
+    try:
+        connections[ALIAS_REPLICA].close()
+    except DatabaseError:
+        pass
+
+
+def alias_leitura():
+    """Alias de banco para uma leitura agora (ver regras no topo do módulo)"""
+    if not replica_configurada() or _forcar_primario.get():
+        return ALIAS_PRIMARIO
+    if connections[ALIAS_PRIMARIO].in_atomic_block:
+        return ALIAS_PRIMARIO
+    return ALIAS_REPLICA if replica_disponivel() else ALIAS_PRIMARIO
+
+
+class CursorLeitura:
+    """
+    Cursor de leitura que troca da réplica para o primário se a réplica
+    falhar (erro de conexão ao abrir o cursor ou no execute)
+
+    Demais atributos (fetchone, fetchall, description...) são os do cursor
+    em uso.
+    """
+
+    def __init__(self):
+        self.alias = alias_leitura()
+        self.cursor = None
+        if self.alias == ALIAS_REPLICA:
+            try:
+                # cursor() já abre a conexão (se ainda não estiver aberta)
+                self.cursor = connections[ALIAS_REPLICA].cursor()
+            except (OperationalError, InterfaceError):
+                self._trocar_para_primario()
+        if self.cursor is None:
+            self.cursor = connections[ALIAS_PRIMARIO].cursor()
+
+    def _trocar_para_primario(self):
+        logger.exception('Réplica falhou numa leitura: refazendo no primário')
+        marcar_replica_indisponivel()
+        self.alias = ALIAS_PRIMARIO
+        self.cursor = connections[ALIAS_PRIMARIO].cursor()
+
+    def execute(self, sql, params=None):
+        if self.alias == ALIAS_REPLICA:
+            try:
+                return self.cursor.execute(sql, params)
+            except (OperationalError, InterfaceError):
+                self._trocar_para_primario()
+        return self.cursor.execute(sql, params)
+
+    def __getattr__(self, nome):
+        return getattr(self.cursor, nome)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def close(self):
+        try:
+            self.cursor.close()
+        except DatabaseError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        self.close()
+
+
+def cursor_leitura():
+    """Cursor para SELECTs que toleram leitura da réplica (ver CursorLeitura)"""
+    return CursorLeitura()
+
+
+def cursor_escrita():
+    """Cursor do primário (igual a django.db.connection.cursor())"""
+    return connections[ALIAS_PRIMARIO].cursor()
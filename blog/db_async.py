@@ -0,0 +1,105 @@
+"""
+Acesso assíncrono ao PostgreSQL para as views ASGI - SQL PURO
+
+Usa psycopg 3 com AsyncConnectionPool (dependência opcional):
+    pip install "psycopg[binary,pool]"
+
+Sem o pacote, disponivel() é False e views_async delega para as views
+síncronas. O pool é criado na primeira consulta, dentro do event loop do
+worker ASGI, com os dados de conexão de DATABASES['default'] (as leituras
+assíncronas vão sempre ao primário: a verificação de atraso da réplica em
+db.py é síncrona).
+
+Cada consulta pega uma conexão do pool só pelo tempo da query; consultas
+independentes rodam em conexões diferentes ao mesmo tempo (asyncio.gather).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+try:
+    from psycopg_pool import AsyncConnectionPool
+except ImportError:  # dependência opcional
+    AsyncConnectionPool = None
+
+
+TAMANHO_MINIMO_POOL = 2
+TAMANHO_MAXIMO_POOL = getattr(settings, 'ASYNC_POOL_MAXIMO', 20)
+
+_pool = None
+_trava = None
+
+
+def disponivel():
+    return AsyncConnectionPool is not None
+
+
+def parametros_conexao():
+    """Argumentos de psycopg.AsyncConnection.connect() a partir do settings"""
+    banco = settings.DATABASES['default']
+    parametros = {
+        'dbname': banco['NAME'],
+        'user': banco.get('USER'),
+        'password': banco.get('PASSWORD'),
+        'host': banco.get('HOST'),
+        'port': banco.get('PORT'),
+    }
+    parametros = {chave: valor for chave, valor in parametros.items() if valor}
+    # Mesmo fuso das conexões do Django (USE_TZ=True: sessão em UTC)
+    parametros['options'] = '-c TimeZone=UTC'
+    parametros['autocommit'] = True
+    return parametros
+
+
+async def obter_pool():
+    global _pool, _trava
+    if _pool is not None:
+        return _pool
+    if _trava is None:
+        _trava = asyncio.Lock()
+    async with _trava:
+        if _pool is None:
+            pool = AsyncConnectionPool(
+                '',
+                min_size=TAMANHO_MINIMO_POOL,
+                max_size=TAMANHO_MAXIMO_POOL,
+                kwargs=parametros_conexao(),
+                open=False,
+            )
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def buscar_todos(sql, params=None):
+    """fetchall() de uma consulta numa conexão do pool"""
+    pool = await obter_pool()
+    async with pool.connection() as conexao:
+        async with conexao.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchall()
+
+
+async def buscar_um(sql, params=None):
+    """fetchone() de uma consulta numa conexão do pool"""
+    pool = await obter_pool()
+    async with pool.connection() as conexao:
+        async with conexao.cursor() as cursor:
+            await cursor.execute(sql, params)
+            return await cursor.fetchone()
+
+
+@asynccontextmanager
+async def conexao():
+    """
+    Uma conexão do pool para sequências de comandos:
+
+        async with db_async.conexao() as conexao:
+            async with conexao.transaction():
+                ...
+    """
+    pool = await obter_pool()
+    async with pool.connection() as conexao_pool:
+        yield conexao_pool
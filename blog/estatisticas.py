@@ -0,0 +1,136 @@
+"""
+Estatísticas do painel administrativo - SQL PURO
+
+COUNT(*) exato faz varredura completa da tabela (custo cresce com o volume).
+Aqui as contagens vêm, por padrão, das estatísticas do próprio PostgreSQL
+(pg_class.reltuples, mantido por ANALYZE/autovacuum), com custo constante.
+
+- Estimativa: reltuples / relpages * páginas atuais (mesma conta do planejador,
+  acompanha o crescimento da tabela desde o último ANALYZE)
+- Tabelas pequenas ou nunca analisadas: COUNT(*) exato (é barato)
+- exato=True: COUNT(*) em todas (botão "Contagem exata" do painel)
+
+As listas de "últimos posts/usuários" ficam em cache por alguns segundos
+(invalidar_painel() as descarta em todos os processos, ver invalidacao.py).
+"""
+
+from django.core.cache import cache
+from django.db import connection
+
+from . import invalidacao
+
+
+# Chave do contexto do painel -> tabela contada
+TABELAS_PAINEL = {
+    'total_posts': 'blog_post',
+    'total_usuarios': 'auth_user',
+    'total_comentarios': 'blog_comentario',
+    'total_categorias': 'blog_categoria',
+}
+
+# Abaixo disso a estimativa não compensa: faz COUNT(*) exato
+LIMITE_CONTAGEM_EXATA = 10000
+
+CACHE_ULTIMOS_SEGUNDOS = 30
+CHAVE_ULTIMOS_POSTS = 'painel:ultimos_posts'
+CHAVE_ULTIMOS_USUARIOS = 'painel:ultimos_usuarios'
+
+
+def contar_tabelas(exato=False):
+    """
+    Conta as linhas das tabelas do painel
+
+    Retorna (contagens, estimado): contagens é {chave: total} e estimado
+    indica se algum total veio de estimativa
+
+    SQL EXECUTADO:
+    1. SELECT reltuples, relpages, tamanho atual FROM pg_class (uma query para todas)
+    2. SELECT COUNT(*) apenas para tabelas pequenas, sem estatísticas ou se exato=True
+    """
+    contagens = {}
+    estimado = False
+
+    with connection.cursor() as cursor:
+        estimativas = {}
+        if not exato:
+            # SQL: Estimativa pelo catálogo (O(1), não lê a tabela)
+            cursor.execute("""
+                SELECT c.relname,
+                       CASE
+                           WHEN c.reltuples < 0 OR c.relpages = 0 THEN NULL
+                           ELSE (c.reltuples / c.relpages)
+                                * (pg_relation_size(c.oid) / current_setting('block_size')::int)
+                       END AS estimativa
+                FROM pg_class c
+                WHERE c.oid = ANY(%s::regclass[])
+            """, [list(TABELAS_PAINEL.values())])
+
+            estimativas = {nome: valor for nome, valor in cursor.fetchall()}
+
+        for chave, tabela in TABELAS_PAINEL.items():
+            estimativa = estimativas.get(tabela)
+
+            if estimativa is not None and estimativa >= LIMITE_CONTAGEM_EXATA:
+                contagens[chave] = int(estimativa)
+                estimado = True
+            else:
+                # SQL: Contagem exata (tabela pequena, sem estatísticas ou exato=True)
+                cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+                contagens[chave] = cursor.fetchone()[0]
+
+    return contagens, estimado
+
+
+def ultimos_posts():
+    """
+    Últimos 5 posts (em cache por CACHE_ULTIMOS_SEGUNDOS)
+
+    SQL EXECUTADO (apenas quando o cache expira):
+    SELECT p.id, p.titulo, p.slug, p.criado_em, u.username ... LIMIT 5
+    """
+    def buscar():
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT p.id, p.titulo, p.slug, p.criado_em, u.username
+                FROM blog_post p
+                INNER JOIN auth_user u ON p.autor_id = u.id
+                WHERE p.excluido_em IS NULL
+                ORDER BY p.criado_em DESC
+                LIMIT 5
+            """)
+            return cursor.fetchall()
+
+    return cache.get_or_set(CHAVE_ULTIMOS_POSTS, buscar, CACHE_ULTIMOS_SEGUNDOS)
+
+
+def ultimos_usuarios():
+    """
+    Últimos 5 usuários cadastrados (em cache por CACHE_ULTIMOS_SEGUNDOS)
+
+    SQL EXECUTADO (apenas quando o cache expira):
+    SELECT u.id, u.username, u.email, u.date_joined, p.ativo ... LIMIT 5
+    """
+    def buscar():
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT u.id, u.username, u.email, u.date_joined, p.ativo
+                FROM auth_user u
+                LEFT JOIN blog_perfilusuario p ON u.id = p.usuario_id
+                ORDER BY u.date_joined DESC
+                LIMIT 5
+            """)
+            return cursor.fetchall()
+
+    return cache.get_or_set(CHAVE_ULTIMOS_USUARIOS, buscar, CACHE_ULTIMOS_SEGUNDOS)
+
+
+def _descartar(chaves):
+    cache.delete_many([CHAVE_ULTIMOS_POSTS, CHAVE_ULTIMOS_USUARIOS])
+
+
+invalidacao.registrar('painel', _descartar)
+
+
+def invalidar_painel():
+    """Descarta as listas em cache (ex.: após ativar/desativar usuários)"""
+    invalidacao.publicar('painel')
@@ -0,0 +1,127 @@
+"""
+Eventos ao vivo dos posts (reações e comentários) - PostgreSQL LISTEN/NOTIFY
+
+Quem grava reação/comentário publica no canal CANAL:
+
+    SELECT pg_notify('blog_eventos', '{"post": 42, "tipo": "reacoes", ...}')
+
+O NOTIFY só é entregue no COMMIT (nada de evento para gravação desfeita) e
+chega a todos os processos que fazem LISTEN - inclusive os de outros
+servidores ligados ao mesmo banco.
+
+Em cada processo ASGI há UM ouvinte (uma conexão em LISTEN, tarefa asyncio)
+que distribui os eventos para as filas das abas abertas no post
+(views_async.eventos_post, Server-Sent Events). Milhares de abas = uma
+conexão ao banco por processo, sem polling.
+
+Tipos de evento (campo "tipo"):
+- reacoes              {"reacoes": {"curtir": 3, ...}, "total": 7}
+- comentario           {"id", "autor", "conteudo", "criado_em", "total_comentarios"}
+- comentario_removido  {"id", "total_comentarios"}
+
+As contagens vão em valor absoluto (não incremento): um evento perdido por
+uma aba lenta é corrigido pelo próximo.
+
+O payload do pg_notify tem limite de 8000 bytes (acima disso o NOTIFY falha
+e desfaz a transação). O único campo livre é o conteúdo do comentário,
+limitado a views.TAMANHO_MAXIMO_COMENTARIO (1000) caracteres antes de gravar.
+"""
+
+import asyncio
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import db_async
+
+try:
+    import psycopg
+except ImportError:  # dependência opcional (ver db_async.py)
+    psycopg = None
+
+
+logger = logging.getLogger(__name__)
+
+CANAL = 'blog_eventos'
+TAMANHO_FILA = 100
+PAUSA_RECONEXAO = 2
+
+
+def _payload(post_id, tipo, dados):
+    return json.dumps({'post': post_id, 'tipo': tipo, **dados},
+                      cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def publicar(cursor, post_id, tipo, dados):
+    """
+    Publica um evento do post (cursor síncrono do Django)
+
+    SQL EXECUTADO:
+    SELECT pg_notify('blog_eventos', payload)
+    """
+    cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, _payload(post_id, tipo, dados)])
+
+
+async def apublicar(conexao, post_id, tipo, dados):
+    """Publica um evento do post (conexão psycopg assíncrona de db_async)"""
+    await conexao.execute("SELECT pg_notify(%s, %s)", [CANAL, _payload(post_id, tipo, dados)])
+
+
+class Ouvinte:
+    """
+    LISTEN único do processo + distribuição para as filas dos assinantes
+
+    A conexão é aberta na primeira assinatura e reaberta (com pausa) se cair.
+    """
+
+    def __init__(self):
+        self.assinantes = {}
+        self.tarefa = None
+
+    def disponivel(self):
+        return psycopg is not None and db_async.disponivel()
+
+    def assinar(self, post_id):
+        fila = asyncio.Queue(maxsize=TAMANHO_FILA)
+        self.assinantes.setdefault(post_id, set()).add(fila)
+        if self.tarefa is None or self.tarefa.done():
+            self.tarefa = asyncio.create_task(self._escutar())
+        return fila
+
+    def cancelar(self, post_id, fila):
+        filas = self.assinantes.get(post_id)
+        if filas is not None:
+            filas.discard(fila)
+            if not filas:
+                del self.assinantes[post_id]
+
+    def _distribuir(self, payload):
+        try:
+            evento = json.loads(payload)
+        except ValueError:
+            return
+        for fila in self.assinantes.get(evento.get('post'), ()):
+            try:
+                fila.put_nowait(evento)
+            except asyncio.QueueFull:
+                # Aba que não consome: descarta; as contagens do próximo
+                # evento são absolutas
+                pass
+
+    async def _escutar(self):
+        while True:
+            try:
+                conexao = await psycopg.AsyncConnection.connect(**db_async.parametros_conexao())
+                async with conexao:
+                    await conexao.execute(f"LISTEN {CANAL}")
+                    async for aviso in conexao.notifies():
+                        self._distribuir(aviso.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Ouvinte de eventos caiu; reconectando')
+            await asyncio.sleep(PAUSA_RECONEXAO)
+
+
+ouvinte = Ouvinte()
@@ -0,0 +1,102 @@
+"""
+Exportação das listas do admin em CSV / JSONL - SQL PURO, em streaming
+
+O resultado é lido por um cursor do lado do servidor (DECLARE ... CURSOR,
+via connection.chunked_cursor()) em lotes de fetchmany(), e cada lote é
+enviado ao cliente assim que lido (StreamingHttpResponse):
+
+- Memória constante no Python, independente do número de linhas
+- Os primeiros bytes saem antes de a consulta terminar
+
+O cursor é aberto dentro de uma transação: fora dela o Django declara o
+cursor WITH HOLD e o PostgreSQL materializa o resultado inteiro no COMMIT
+antes de devolver a primeira linha.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+TAMANHO_LOTE = 2000
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+# Planilhas interpretam células iniciadas por estes caracteres como fórmula
+PREFIXOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Eco:
+    """Pseudo-arquivo: csv.writer escreve e recebe a linha pronta de volta"""
+
+    def write(self, valor):
+        return valor
+
+
+def _celula_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, str):
+        return "'" + valor if valor.startswith(PREFIXOS_FORMULA) else valor
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return valor
+
+
+def ler_em_lotes(sql, params):
+    """
+    Executa a consulta num cursor do servidor e gera lotes de linhas
+
+    SQL EXECUTADO:
+    BEGIN; DECLARE cursor; FETCH FORWARD TAMANHO_LOTE (repetido); COMMIT
+    """
+    with transaction.atomic():
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                linhas = cursor.fetchmany(TAMANHO_LOTE)
+                if not linhas:
+                    break
+                yield linhas
+
+
+def gerar_csv(colunas, lotes):
+    escritor = csv.writer(_Eco())
+    yield '\ufeff' + escritor.writerow(colunas)  # BOM: acentos corretos no Excel
+    for linhas in lotes:
+        yield ''.join(
+            escritor.writerow([_celula_csv(valor) for valor in linha])
+            for linha in linhas
+        )
+
+
+def gerar_jsonl(colunas, lotes):
+    for linhas in lotes:
+        yield ''.join(
+            json.dumps(dict(zip(colunas, linha)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+            for linha in linhas
+        )
+
+
+def exportar(nome, colunas, sql, params, formato):
+    """
+    Resposta em streaming com o resultado da consulta
+
+    colunas: nomes do cabeçalho, na mesma ordem do SELECT
+    formato: 'csv' ou 'jsonl' (validar antes com FORMATOS)
+    """
+    gerador = gerar_csv if formato == 'csv' else gerar_jsonl
+    conteudo = (parte.encode('utf-8') for parte in gerador(colunas, ler_em_lotes(sql, params)))
+
+    resposta = StreamingHttpResponse(conteudo, content_type=FORMATOS[formato])
+    carimbo = timezone.localtime().strftime('%Y%m%d-%H%M%S')
+    resposta['Content-Disposition'] = f'attachment; filename="{nome}-{carimbo}.{formato}"'
+    resposta['Cache-Control'] = 'no-store'
+    return resposta
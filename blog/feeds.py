@@ -0,0 +1,163 @@
+"""
+Feeds RSS/Atom (todos os posts e por categoria) - SQL PURO
+
+Agregadores consultam o feed a cada poucos minutos. O XML pronto fica em
+cache inteiro (uma query + geração só quando o cache expira ou é
+invalidado) e a resposta leva ETag/Last-Modified: leitores que mandam
+If-None-Match/If-Modified-Since recebem 304 sem corpo.
+
+- Last-Modified: maior atualizado_em entre os posts do feed
+- ETag: hash do XML gerado (muda também quando um post sai do feed)
+
+Quem cria/edita/exclui posts (ou renomeia/remove categorias) chama
+invalidar_feeds(): incrementa a versão que compõe as chaves, descartando
+de uma vez o feed geral e os de todas as categorias - em todos os
+processos, pelo barramento de invalidação (ver invalidacao.py).
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.text import Truncator
+
+from . import invalidacao
+
+
+TOTAL_POSTS_FEED = getattr(settings, 'FEED_TOTAL_POSTS', 20)
+PALAVRAS_RESUMO = 60
+CACHE_FEED_SEGUNDOS = 600
+CHAVE_VERSAO_FEEDS = 'feeds:versao'
+
+FORMATOS = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+
+def _versao():
+    versao = cache.get(CHAVE_VERSAO_FEEDS)
+    if versao is None:
+        cache.add(CHAVE_VERSAO_FEEDS, 1, None)
+        versao = cache.get(CHAVE_VERSAO_FEEDS, 1)
+    return versao
+
+
+def _descartar(chaves):
+    try:
+        cache.incr(CHAVE_VERSAO_FEEDS)
+    except ValueError:
+        cache.add(CHAVE_VERSAO_FEEDS, 1, None)
+
+
+invalidacao.registrar('feeds', _descartar)
+
+
+def invalidar_feeds():
+    """Descarta todos os feeds em cache (nova versão de chave)"""
+    invalidacao.publicar('feeds')
+
+
+def buscar_posts(categoria_id=None):
+    """
+    Últimos TOTAL_POSTS_FEED posts (com resumo), do mais novo ao mais antigo
+
+    SQL EXECUTADO:
+    SELECT ... FROM blog_post p ... ORDER BY p.criado_em DESC, p.id DESC LIMIT N
+    (usa idx_post_criado_id / idx_post_cat_criado_id)
+    """
+    filtros = ["p.excluido_em IS NULL"]
+    params = []
+    if categoria_id is not None:
+        filtros.append("p.categoria_id = %s")
+        params.append(categoria_id)
+
+    with connection.cursor() as cursor:
+        # SQL: Só o começo do conteúdo - o feed leva apenas o resumo
+        cursor.execute(f"""
+            SELECT p.titulo, p.slug, LEFT(p.conteudo, 1000) as inicio,
+                   p.criado_em, p.atualizado_em,
+                   u.username as autor_username, c.nome as categoria_nome
+            FROM blog_post p
+            INNER JOIN auth_user u ON p.autor_id = u.id
+            LEFT JOIN blog_categoria c ON p.categoria_id = c.id
+            WHERE {' AND '.join(filtros)}
+            ORDER BY p.criado_em DESC, p.id DESC
+            LIMIT %s
+        """, params + [TOTAL_POSTS_FEED])
+        return cursor.fetchall()
+
+
+def nome_categoria(categoria_id):
+    """
+    SQL EXECUTADO:
+    SELECT nome FROM blog_categoria WHERE id = %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT nome FROM blog_categoria WHERE id = %s", [categoria_id])
+        linha = cursor.fetchone()
+        return linha[0] if linha else None
+
+
+def gerar_feed(request, formato, categoria_id=None):
+    """
+    Monta o feed e retorna (xml, ultima_modificacao, etag)
+    ou None se a categoria não existe
+    """
+    titulo = 'MeuBlog'
+    link = reverse('post_list')
+    if categoria_id is not None:
+        nome = nome_categoria(categoria_id)
+        if nome is None:
+            return None
+        titulo = f'MeuBlog - {nome}'
+        link = f"{link}?categoria={categoria_id}"
+
+    posts = buscar_posts(categoria_id)
+    ultima_modificacao = max((post[4] for post in posts), default=None)
+
+    feed = FORMATOS[formato](
+        title=titulo,
+        link=request.build_absolute_uri(link),
+        description='Últimos posts do MeuBlog',
+        language='pt-br',
+        feed_url=request.build_absolute_uri(),
+    )
+    for titulo_post, slug, inicio, criado_em, atualizado_em, autor, categoria in posts:
+        url = request.build_absolute_uri(reverse('post_detail', args=[slug]))
+        feed.add_item(
+            title=titulo_post,
+            link=url,
+            unique_id=url,
+            description=Truncator(inicio).words(PALAVRAS_RESUMO),
+            author_name=autor,
+            pubdate=criado_em,
+            updateddate=atualizado_em,
+            categories=[categoria] if categoria else None,
+        )
+
+    xml = feed.writeString('utf-8').encode('utf-8')
+    etag = '"%s"' % hashlib.md5(xml, usedforsecurity=False).hexdigest()
+    return xml, ultima_modificacao, etag
+
+
+def feed_em_cache(request, formato, categoria_id=None):
+    """
+    (xml, ultima_modificacao, etag) do cache, gerando se preciso
+
+    A chave inclui host/esquema: os links do feed são absolutos.
+    """
+    chave = 'feed:{}:{}:{}:{}'.format(
+        _versao(), categoria_id or 'todos', formato,
+        hashlib.md5(request.build_absolute_uri('/').encode(), usedforsecurity=False).hexdigest()[:8],
+    )
+    dados = cache.get(chave)
+    if dados is None:
+        dados = gerar_feed(request, formato, categoria_id)
+        if dados is None:
+            return None
+        cache.set(chave, dados, CACHE_FEED_SEGUNDOS)
+    return dados
@@ -0,0 +1,281 @@
+"""
+Barramento de invalidação de cache entre processos - PostgreSQL LISTEN/NOTIFY
+
+Cada worker guarda cópias em memória (camada local de cache_camadas, o
+LRU cache_local deste módulo para dados lidos a toda requisição, como
+perfis), e um cache.delete() feito num processo não alcança os outros
+(nem os outros servidores).
+
+Quem grava chama publicar(grupo, *chaves) em vez de apagar direto:
+
+    WITH v AS (UPDATE blog_versaoinvalidacao SET versao = versao + 1 ...)
+    SELECT pg_notify('blog_invalidacao', '<versao> <grupo> <chave,chave,...>')
+
+- A mensagem é compacta: grupo + ids (sem chaves = o grupo inteiro)
+- O NOTIFY só é entregue no COMMIT; gravação desfeita não invalida nada
+- O próprio processo aplica a invalidação no commit (transaction.on_commit)
+- Cada módulo com cache registra o que fazer com o seu grupo:
+      invalidacao.registrar('categorias', _descartar)
+
+Em cada processo web há UMA thread ouvinte (conexão em LISTEN, iniciada
+por middleware.InvalidacaoMiddleware) que aplica as mensagens dos outros.
+
+Mensagens perdidas (conexão caiu, fila de NOTIFY cheia): o UPDATE na linha
+única de blog_versaoinvalidacao serializa os publicadores até o COMMIT,
+então as versões chegam em sequência. O ouvinte ressincroniza (limpa o LRU
+local e descarta todos os grupos) quando:
+- recebe a versão N + 2 depois da N (buraco na sequência)
+- reconecta e a versão no banco não é a última que ele viu
+- fica INTERVALO_VERIFICACAO segundos sem mensagens e a versão no banco
+  mudou mesmo assim
+
+Configuração (settings, opcionais):
+- INVALIDACAO_EM_THREAD = False desliga a thread ouvinte
+- CACHE_LOCAL_MAXIMO = 5000 entradas no LRU local
+"""
+
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+
+logger = logging.getLogger(__name__)
+
+CANAL = 'blog_invalidacao'
+# NOTIFY aceita até 8000 bytes; acima disso invalida o grupo inteiro
+TAMANHO_MAXIMO_MENSAGEM = 7000
+INTERVALO_VERIFICACAO = 30
+PAUSA_RECONEXAO = 2
+
+_tratadores = {}
+
+
+class CacheLocal:
+    """
+    LRU em memória do processo, com validade por entrada
+
+    Chaves são (grupo, chave). Um valor calculado enquanto uma invalidação
+    acontecia não é guardado (contador de gerações), para não voltar a
+    servir o dado antigo.
+    """
+
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self.entradas = OrderedDict()
+        self.geracao = 0
+        self.trava = threading.Lock()
+
+    def obter(self, grupo, chave, calcular, segundos):
+        """Valor em cache ou calcular() (guardado por `segundos`)"""
+        item = (grupo, str(chave))
+        agora = time.monotonic()
+        with self.trava:
+            entrada = self.entradas.get(item)
+            if entrada is not None and entrada[0] > agora:
+                self.entradas.move_to_end(item)
+                return entrada[1]
+            geracao = self.geracao
+
+        valor = calcular()
+
+        with self.trava:
+            if self.geracao == geracao:
+                self.entradas[item] = (agora + segundos, valor)
+                self.entradas.move_to_end(item)
+                while len(self.entradas) > self.maximo:
+                    self.entradas.popitem(last=False)
+        return valor
+
+    def descartar(self, grupo, chaves=None):
+        """Remove as chaves do grupo (chaves=None: o grupo inteiro)"""
+        with self.trava:
+            self.geracao += 1
+            if chaves is None:
+                for item in [item for item in self.entradas if item[0] == grupo]:
+                    del self.entradas[item]
+            else:
+                for chave in chaves:
+                    self.entradas.pop((grupo, str(chave)), None)
+
+    def limpar(self):
+        with self.trava:
+            self.geracao += 1
+            self.entradas.clear()
+
+
+cache_local = CacheLocal(getattr(settings, 'CACHE_LOCAL_MAXIMO', 5000))
+
+
+def registrar(grupo, funcao):
+    """
+    funcao(chaves) é chamada em todo processo quando o grupo é invalidado
+
+    chaves é uma lista de strings, ou None para descartar o grupo inteiro
+    (mensagem grande demais ou ressincronização). Entradas de cache_local
+    do grupo são descartadas sem precisar registrar nada.
+    """
+    _tratadores.setdefault(grupo, []).append(funcao)
+
+
+def _aplicar(grupo, chaves):
+    cache_local.descartar(grupo, chaves)
+    for funcao in _tratadores.get(grupo, ()):
+        try:
+            funcao(chaves)
+        except Exception:
+            logger.exception('Falha ao invalidar o grupo %s', grupo)
+
+
+def _ressincronizar():
+    logger.warning('Mensagens de invalidação perdidas; descartando os caches locais')
+    cache_local.limpar()
+    for grupo in list(_tratadores):
+        _aplicar(grupo, None)
+
+
+def _mensagem(grupo, chaves):
+    if chaves:
+        texto = f"{grupo} {','.join(chaves)}"
+        if len(texto) <= TAMANHO_MAXIMO_MENSAGEM:
+            return texto
+    return grupo
+
+
+def _ler_mensagem(payload):
+    """'<versao> <grupo> [<chave,...>]' -> (versao, grupo, chaves ou None)"""
+    partes = payload.split(' ')
+    chaves = partes[2].split(',') if len(partes) > 2 and partes[2] else None
+    return int(partes[0]), partes[1], chaves
+
+
+def publicar(grupo, *chaves):
+    """
+    Invalida o grupo (ou só as chaves dele) em todos os processos
+
+    Roda na transação corrente: só vale se ela fizer COMMIT.
+
+    SQL EXECUTADO:
+    WITH v AS (UPDATE blog_versaoinvalidacao SET versao = versao + 1
+               WHERE id = 1 RETURNING versao)
+    SELECT pg_notify('blog_invalidacao', versao || ' ' || mensagem) FROM v
+    """
+    chaves = [str(chave) for chave in chaves] or None
+    mensagem = _mensagem(grupo, chaves)
+    if mensagem == grupo:
+        chaves = None
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            WITH v AS (
+                UPDATE blog_versaoinvalidacao
+                SET versao = versao + 1
+                WHERE id = 1
+                RETURNING versao
+            )
+            SELECT pg_notify(%s, versao::text || ' ' || %s) FROM v
+        """, [CANAL, mensagem])
+
+    transaction.on_commit(lambda: _aplicar(grupo, chaves))
+
+
+def versao_atual():
+    """
+    SQL EXECUTADO:
+    SELECT versao FROM blog_versaoinvalidacao WHERE id = 1
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT versao FROM blog_versaoinvalidacao WHERE id = 1")
+        linha = cursor.fetchone()
+    return linha[0] if linha else 0
+
+
+def _aguardar_avisos(bruta, segundos):
+    """Payloads recebidos em até `segundos` (lista vazia = nada chegou)"""
+    if callable(getattr(bruta, 'notifies', None)):
+        # psycopg 3 (>= 3.2): gerador com timeout
+        return [aviso.payload for aviso in bruta.notifies(timeout=segundos, stop_after=1)]
+
+    # psycopg2: espera o socket ficar legível e lê as notificações pendentes
+    if select.select([bruta], [], [], segundos)[0]:
+        bruta.poll()
+    avisos = [aviso.payload for aviso in bruta.notifies]
+    bruta.notifies.clear()
+    return avisos
+
+
+class Ouvinte:
+    """
+    Thread com LISTEN única do processo; aplica as invalidações recebidas
+
+    Usa a conexão do Django da própria thread (autocommit), reaberta com
+    pausa se cair.
+    """
+
+    def __init__(self):
+        self.versao = None
+        self.thread = None
+        self.trava = threading.Lock()
+
+    def iniciar(self):
+        if not getattr(settings, 'INVALIDACAO_EM_THREAD', True):
+            return
+        with self.trava:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._escutar, name='invalidacao-cache', daemon=True,
+                )
+                self.thread.start()
+
+    def _escutar(self):
+        while True:
+            try:
+                self._sessao()
+            except Exception:
+                logger.exception('Ouvinte de invalidação caiu; reconectando')
+            finally:
+                connection.close()
+            time.sleep(PAUSA_RECONEXAO)
+
+    def _sessao(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CANAL}")
+        # Já em LISTEN: o que foi publicado enquanto estava desconectado
+        # aparece como diferença de versão
+        self._verificar_versao()
+
+        bruta = connection.connection
+        while True:
+            avisos = _aguardar_avisos(bruta, INTERVALO_VERIFICACAO)
+            if not avisos:
+                self._verificar_versao()
+            for payload in avisos:
+                self._receber(payload)
+
+    def _verificar_versao(self):
+        atual = versao_atual()
+        if self.versao is not None and atual != self.versao:
+            _ressincronizar()
+        self.versao = atual
+
+    def _receber(self, payload):
+        try:
+            versao, grupo, chaves = _ler_mensagem(payload)
+        except (ValueError, IndexError):
+            logger.warning('Mensagem de invalidação inválida: %r', payload)
+            return
+
+        if self.versao is not None and versao > self.versao + 1:
+            _ressincronizar()
+        else:
+            # versao <= self.versao: publicada entre o LISTEN e a leitura
+            # da versão; reaplicar é inofensivo
+            _aplicar(grupo, chaves)
+        self.versao = max(versao, self.versao or 0)
+
+
+ouvinte = Ouvinte()
@@ -0,0 +1,201 @@
+"""
+Cache da listagem de posts (post_list) - SQL PURO
+
+A página inicial lista os posts com autor, categoria e contagens de
+comentários/reações: a consulta mais pesada do caminho de leitura. A
+PRIMEIRA página (POSTS_POR_PAGINA posts, conteúdo cortado em
+TAMANHO_RESUMO caracteres), o total e a categoria selecionada ficam em
+cache por filtro de categoria, com revalidação (ver revalidacao.py): ao
+vencer, um único processo refaz a consulta e os demais servem a anterior.
+O valor em cache tem tamanho fixo, qualquer que seja o volume de posts.
+
+As páginas seguintes (?depois= / ?antes=, paginação por cursor como em
+consultas.listar_posts) não vão ao cache: cada uma é uma leitura pelo
+índice (criado_em, id) na réplica.
+
+As contagens de comentários/reações podem ficar até CACHE_LISTA_SEGUNDOS
+atrasadas. Quem cria/edita/exclui posts ou altera categorias chama
+invalidar_lista_posts(): nova versão de chave em todos os processos.
+
+As consultas que enchem o cache vão ao primário (não à réplica): um valor
+atrasado ficaria servido pelo tempo todo do cache.
+
+Retorno: (posts, categoria_selecionada, total_posts, pagina), com
+pagina.proximo / pagina.anterior para os links de navegação.
+"""
+
+import asyncio
+
+from django.core.cache import cache
+from django.db import connection
+
+from . import consultas, db, db_async, invalidacao, paginacao, revalidacao
+
+
+CACHE_LISTA_SEGUNDOS = 30
+CHAVE_VERSAO_LISTA = 'lista_posts:versao'
+POSTS_POR_PAGINA = 20
+# O template mostra só as primeiras palavras (truncatewords)
+TAMANHO_RESUMO = 1000
+
+SQL_POSTS_LISTA = """
+    SELECT p.id, p.titulo, p.slug, LEFT(p.conteudo, %s) AS conteudo, p.imagem,
+           p.criado_em, p.atualizado_em, p.categoria_id,
+           u.id as autor_id, u.username as autor_username,
+           c.nome as categoria_nome,
+           p.total_comentarios,
+           (SELECT COUNT(*) FROM blog_reacaousuariopost WHERE post_id = p.id) as total_reacoes
+    FROM blog_post p
+    INNER JOIN auth_user u ON p.autor_id = u.id
+    LEFT JOIN blog_categoria c ON p.categoria_id = c.id
+    WHERE {filtro}
+    ORDER BY {ordem}
+    LIMIT %s
+"""
+
+
+def _filtro(categoria_id):
+    if categoria_id is None:
+        return "p.excluido_em IS NULL", []
+    return "p.categoria_id = %s AND p.excluido_em IS NULL", [categoria_id]
+
+
+def _pagina(parametros):
+    return paginacao.PaginaKeyset(consultas.ORDENACAO_POSTS, parametros or {},
+                                  por_pagina=POSTS_POR_PAGINA)
+
+
+def _sql_pagina(filtro, params, pagina):
+    """SELECT da página (filtro + cursor) e seus parâmetros"""
+    condicao, params_cursor = pagina.condicao()
+    if condicao:
+        filtro = f"{filtro} AND {condicao}"
+    sql = SQL_POSTS_LISTA.format(filtro=filtro, ordem=pagina.order_by())
+    return sql, [TAMANHO_RESUMO, *params, *params_cursor, pagina.limite]
+
+
+def _chave_linha(linha):
+    """(criado_em, id) da linha de SQL_POSTS_LISTA, para o cursor"""
+    return [linha[5], linha[0]]
+
+
+def _categoria(linha):
+    return {'id': linha[0], 'nome': linha[1]} if linha else None
+
+
+def _versao():
+    versao = cache.get(CHAVE_VERSAO_LISTA)
+    if versao is None:
+        cache.add(CHAVE_VERSAO_LISTA, 1, None)
+        versao = cache.get(CHAVE_VERSAO_LISTA, 1)
+    return versao
+
+
+async def _versao_async():
+    versao = await cache.aget(CHAVE_VERSAO_LISTA)
+    if versao is None:
+        await cache.aadd(CHAVE_VERSAO_LISTA, 1, None)
+        versao = await cache.aget(CHAVE_VERSAO_LISTA, 1)
+    return versao
+
+
+def _chave(versao, categoria_id):
+    return f'lista_posts:pagina1:{versao}:{categoria_id or "todas"}'
+
+
+def lista_posts(categoria_id=None, parametros=None):
+    """
+    (posts, categoria_selecionada, total_posts, pagina) para post_list
+
+    parametros: request.GET (cursor ?depois= / ?antes=)
+
+    SQL EXECUTADO:
+    1. SELECT primeira página de posts (com/sem filtro de categoria) -
+       só no recálculo do cache
+    2. COUNT total de posts do filtro - só no recálculo
+    3. SELECT nome da categoria selecionada (se houver filtro) - só no recálculo
+    4. SELECT página pelo cursor (réplica, sem cache) - só fora da primeira
+    """
+    filtro, params = _filtro(categoria_id)
+    pagina = _pagina(parametros)
+
+    def buscar():
+        primeira = _pagina(None)
+        with connection.cursor() as cursor:
+            cursor.execute(*_sql_pagina(filtro, params, primeira))
+            posts = primeira.processar(cursor.fetchall(), _chave_linha)
+
+            cursor.execute(f"SELECT COUNT(*) FROM blog_post p WHERE {filtro}", params)
+            total_posts = cursor.fetchone()[0]
+
+            categoria_selecionada = None
+            if categoria_id is not None:
+                cursor.execute("SELECT id, nome FROM blog_categoria WHERE id = %s", [categoria_id])
+                categoria_selecionada = _categoria(cursor.fetchone())
+
+        return posts, categoria_selecionada, total_posts, primeira.proximo
+
+    posts, categoria_selecionada, total_posts, proximo = revalidacao.obter(
+        _chave(_versao(), categoria_id), buscar, CACHE_LISTA_SEGUNDOS,
+    )
+
+    if pagina.condicao()[0]:
+        with db.cursor_leitura() as cursor:
+            cursor.execute(*_sql_pagina(filtro, params, pagina))
+            posts = pagina.processar(cursor.fetchall(), _chave_linha)
+    else:
+        pagina.proximo = proximo
+
+    return posts, categoria_selecionada, total_posts, pagina
+
+
+async def alista_posts(categoria_id=None, parametros=None):
+    """
+    Versão assíncrona de lista_posts() (views_async)
+
+    Mesma chave de cache; as consultas rodam em paralelo pelo pool de db_async.
+    """
+    filtro, params = _filtro(categoria_id)
+    pagina = _pagina(parametros)
+
+    async def buscar():
+        primeira = _pagina(None)
+        pendentes = [
+            db_async.buscar_todos(*_sql_pagina(filtro, params, primeira)),
+            db_async.buscar_um(f"SELECT COUNT(*) FROM blog_post p WHERE {filtro}", params),
+        ]
+        if categoria_id is not None:
+            pendentes.append(db_async.buscar_um(
+                "SELECT id, nome FROM blog_categoria WHERE id = %s", [categoria_id]
+            ))
+        linhas, total, *categoria = await asyncio.gather(*pendentes)
+        posts = primeira.processar(linhas, _chave_linha)
+        return posts, _categoria(categoria[0] if categoria else None), total[0], primeira.proximo
+
+    chave = _chave(await _versao_async(), categoria_id)
+    posts, categoria_selecionada, total_posts, proximo = await revalidacao.aobter(
+        chave, buscar, CACHE_LISTA_SEGUNDOS,
+    )
+
+    if pagina.condicao()[0]:
+        linhas = await db_async.buscar_todos(*_sql_pagina(filtro, params, pagina))
+        posts = pagina.processar(linhas, _chave_linha)
+    else:
+        pagina.proximo = proximo
+
+    return posts, categoria_selecionada, total_posts, pagina
+
+
+def _descartar(chaves):
+    try:
+        cache.incr(CHAVE_VERSAO_LISTA)
+    except ValueError:
+        cache.add(CHAVE_VERSAO_LISTA, 1, None)
+
+
+invalidacao.registrar('lista_posts', _descartar)
+
+
+def invalidar_lista_posts():
+    """Descarta as listagens em cache (nova versão de chave, todos os processos)"""
+    invalidacao.publicar('lista_posts')
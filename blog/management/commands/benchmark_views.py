@@ -0,0 +1,339 @@
+"""
+Comando: python manage.py benchmark_views
+
+Benchmark das views mais acessadas contra o banco local (populado com
+gerar_dados_carga), usando o Client de teste do Django
+
+Mede por cenário:
+- Latência p50/p95 (ms)
+- Número de queries SQL por requisição, somando todos os aliases de
+  DATABASES (primário e réplica, ver db.py). O Client roda as views
+  síncronas (WSGI); as consultas do pool assíncrono (db_async, só nas
+  views de views_async sob ASGI) não passam pelas conexões do Django e
+  não entram na contagem
+- Pico de memória Python por requisição (tracemalloc, em passada separada
+  para não distorcer a latência)
+
+Uso:
+    python manage.py benchmark_views --salvar      # grava a baseline
+    python manage.py benchmark_views --comparar    # falha se houver regressão
+
+A baseline fica em benchmarks/baseline_views.json (versionada no repositório).
+O campo "dados" dela guarda o comando gerar_dados_carga (seed e parâmetros)
+do banco medido: gere o banco com ele antes de --salvar/--comparar. --salvar
+mantém esse campo; --comparar avisa se o volume do banco for outro e falha
+se um cenário medido não estiver na baseline.
+"""
+
+import json
+import math
+import platform
+import time
+import tracemalloc
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .gerar_dados_carga import SENHA_PADRAO
+
+
+ARQUIVO_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline_views.json'
+
+
+def percentil(valores, p):
+    """Percentil pelo método nearest-rank (valores já ordenados)"""
+    if not valores:
+        return 0.0
+    indice = max(0, math.ceil(p / 100 * len(valores)) - 1)
+    return valores[min(indice, len(valores) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Mede latência, queries e memória das views principais e compara com a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=30)
+        parser.add_argument('--aquecimento', type=int, default=3,
+                            help='Requisições descartadas antes da medição')
+        parser.add_argument('--cenario', action='append', default=None,
+                            help='Executa apenas os cenários indicados (pode repetir)')
+        parser.add_argument('--senha', type=str, default=SENHA_PADRAO,
+                            help='Senha do usuário comum usado no cenário de login')
+        parser.add_argument('--arquivo', type=str, default=str(ARQUIVO_BASELINE))
+        parser.add_argument('--salvar', action='store_true',
+                            help='Grava o resultado como nova baseline')
+        parser.add_argument('--comparar', action='store_true',
+                            help='Compara com a baseline e falha se houver regressão')
+        parser.add_argument('--limite', type=float, default=0.25,
+                            help='Regressão tolerada em latência/memória (0.25 = 25%%)')
+        parser.add_argument('--minimo-ms', type=float, default=2.0,
+                            help='Diferença absoluta mínima de latência para contar como regressão')
+
+    def handle(self, *args, **opcoes):
+        self.opcoes = opcoes
+
+        dados = self._buscar_dados()
+        cenarios = self._cenarios(dados)
+
+        if opcoes['cenario']:
+            desconhecidos = set(opcoes['cenario']) - {c['nome'] for c in cenarios}
+            if desconhecidos:
+                raise CommandError(f'Cenários desconhecidos: {", ".join(sorted(desconhecidos))}')
+            cenarios = [c for c in cenarios if c['nome'] in opcoes['cenario']]
+
+        resultados = {}
+        for cenario in cenarios:
+            resultados[cenario['nome']] = self._medir(cenario)
+            self._imprimir(cenario['nome'], resultados[cenario['nome']])
+
+        arquivo = Path(opcoes['arquivo'])
+        baseline = self._ler_baseline(arquivo)
+
+        relatorio = {
+            'gerado_em': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'repeticoes': opcoes['repeticoes'],
+            'dados': (baseline or {}).get('dados'),
+            'volume': dados['volume'],
+            'cenarios': resultados,
+        }
+
+        if opcoes['comparar']:
+            if baseline is None:
+                raise CommandError(f'Baseline não encontrada: {arquivo}. Rode com --salvar primeiro.')
+            self._comparar(baseline, dados['volume'], resultados)
+
+        if opcoes['salvar']:
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            arquivo.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False) + '\n',
+                               encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'💾 Baseline gravada em {arquivo}'))
+
+    def _buscar_dados(self):
+        """
+        Escolhe os dados usados pelos cenários
+
+        SQL EXECUTADO:
+        1. SELECT admin ativo
+        2. SELECT usuário comum ativo
+        3. SELECT post com mais comentários (pior caso de post_detail)
+        4. SELECT categoria com mais posts
+        5. SELECT reltuples das tabelas principais (volume aproximado)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT usuario_id FROM blog_perfilusuario
+                WHERE tipo_usuario = 'admin' AND ativo = TRUE
+                ORDER BY usuario_id
+                LIMIT 1
+            """)
+            admin = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT u.id, u.username
+                FROM auth_user u
+                INNER JOIN blog_perfilusuario p ON p.usuario_id = u.id
+                WHERE p.tipo_usuario = 'comum' AND p.ativo = TRUE
+                ORDER BY u.id
+                LIMIT 1
+            """)
+            comum = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT p.slug
+                FROM blog_post p
+                INNER JOIN blog_comentario c ON c.post_id = p.id
+                GROUP BY p.id, p.slug
+                ORDER BY COUNT(*) DESC
+                LIMIT 1
+            """)
+            post = cursor.fetchone()
+            if not post:
+                cursor.execute("SELECT slug FROM blog_post ORDER BY id LIMIT 1")
+                post = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT categoria_id
+                FROM blog_post
+                WHERE categoria_id IS NOT NULL
+                GROUP BY categoria_id
+                ORDER BY COUNT(*) DESC
+                LIMIT 1
+            """)
+            categoria = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT relname, reltuples::bigint
+                FROM pg_class
+                WHERE relname IN ('auth_user', 'blog_post', 'blog_comentario',
+                                  'blog_reacaousuariopost', 'blog_categoria')
+            """)
+            volume = dict(cursor.fetchall())
+
+        if not (admin and comum and post and categoria):
+            raise CommandError(
+                'Banco sem dados suficientes (admin, usuário comum, post e categoria). '
+                'Rode antes: python manage.py gerar_dados_carga'
+            )
+
+        return {
+            'admin': User.objects.get(pk=admin[0]),
+            'comum': User.objects.get(pk=comum[0]),
+            'username_comum': comum[1],
+            'slug': post[0],
+            'categoria_id': categoria[0],
+            'volume': volume,
+        }
+
+    def _cenarios(self, dados):
+        slug = dados['slug']
+        return [
+            {'nome': 'post_list', 'metodo': 'get', 'url': '/', 'usuario': None},
+            {'nome': 'post_list_categoria', 'metodo': 'get',
+             'url': f"/?categoria={dados['categoria_id']}", 'usuario': None},
+            {'nome': 'post_detail', 'metodo': 'get', 'url': f'/post/{slug}/', 'usuario': None},
+            {'nome': 'post_detail_logado', 'metodo': 'get', 'url': f'/post/{slug}/',
+             'usuario': dados['comum']},
+            {'nome': 'toggle_reacao', 'metodo': 'post', 'url': f'/post/{slug}/curtir/',
+             'dados': {'tipo_reacao': 'curtir'}, 'usuario': dados['comum']},
+            {'nome': 'login_customizado', 'metodo': 'post', 'url': '/accounts/login/',
+             'dados': {'username': dados['username_comum'], 'password': self.opcoes['senha']},
+             'usuario': None, 'cliente_novo': True, 'status': 302},
+            {'nome': 'painel_admin', 'metodo': 'get', 'url': '/painel-admin/',
+             'usuario': dados['admin']},
+            {'nome': 'admin_posts', 'metodo': 'get', 'url': '/gerenciar/posts/',
+             'usuario': dados['admin']},
+            {'nome': 'admin_usuarios', 'metodo': 'get', 'url': '/gerenciar/usuarios/',
+             'usuario': dados['admin']},
+        ]
+
+    def _cliente(self, cenario):
+        cliente = Client(HTTP_HOST='localhost')
+        if cenario['usuario'] is not None:
+            cliente.force_login(cenario['usuario'])
+        return cliente
+
+    def _requisitar(self, cliente, cenario):
+        metodo = getattr(cliente, cenario['metodo'])
+        resposta = metodo(cenario['url'], cenario.get('dados'))
+
+        esperado = cenario.get('status', 200)
+        if resposta.status_code != esperado:
+            raise CommandError(
+                f"{cenario['nome']}: status {resposta.status_code} (esperado {esperado})"
+            )
+
+        # Força o consumo do corpo (respostas em streaming)
+        if resposta.streaming:
+            b''.join(resposta.streaming_content)
+        return resposta
+
+    def _medir(self, cenario):
+        cliente = self._cliente(cenario)
+
+        for _ in range(self.opcoes['aquecimento']):
+            if cenario.get('cliente_novo'):
+                cliente = self._cliente(cenario)
+            self._requisitar(cliente, cenario)
+
+        latencias = []
+        queries = []
+        for _ in range(self.opcoes['repeticoes']):
+            if cenario.get('cliente_novo'):
+                cliente = self._cliente(cenario)
+
+            with ExitStack() as pilha:
+                capturas = [
+                    pilha.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in connections
+                ]
+                inicio = time.perf_counter()
+                self._requisitar(cliente, cenario)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            queries.append(sum(len(captura.captured_queries) for captura in capturas))
+
+        # Passada separada para memória (tracemalloc deixa tudo mais lento)
+        if cenario.get('cliente_novo'):
+            cliente = self._cliente(cenario)
+        tracemalloc.start()
+        try:
+            self._requisitar(cliente, cenario)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        latencias.sort()
+        return {
+            'p50_ms': round(percentil(latencias, 50), 3),
+            'p95_ms': round(percentil(latencias, 95), 3),
+            'queries': max(queries),
+            'memoria_pico_kb': round(pico / 1024, 1),
+        }
+
+    def _imprimir(self, nome, resultado):
+        self.stdout.write(
+            f"  {nome:<22} p50 {resultado['p50_ms']:>9.2f} ms   "
+            f"p95 {resultado['p95_ms']:>9.2f} ms   "
+            f"{resultado['queries']:>4} queries   "
+            f"{resultado['memoria_pico_kb']:>9.1f} KB"
+        )
+
+    def _ler_baseline(self, arquivo):
+        if not arquivo.exists():
+            return None
+        return json.loads(arquivo.read_text(encoding='utf-8'))
+
+    def _comparar(self, relatorio_base, volume, resultados):
+        # Volume muito diferente: o banco não é o da baseline (ver "dados")
+        for tabela, linhas in (relatorio_base.get('volume') or {}).items():
+            atual = volume.get(tabela, 0)
+            if linhas and abs(atual - linhas) > 0.1 * linhas:
+                self.stdout.write(self.style.WARNING(
+                    f'  ! {tabela}: {atual} linhas, baseline medida com {linhas}'
+                ))
+        dados_base = relatorio_base.get('dados') or {}
+        if dados_base.get('comando'):
+            self.stdout.write(f"  Dados da baseline: {dados_base['comando']}")
+
+        baseline = relatorio_base['cenarios']
+        limite = self.opcoes['limite']
+        regressoes = []
+
+        for nome, atual in resultados.items():
+            base = baseline.get(nome)
+            if base is None:
+                regressoes.append(f'{nome}: sem baseline (rode com --salvar)')
+                continue
+
+            for metrica in ('p50_ms', 'p95_ms'):
+                diferenca = atual[metrica] - base[metrica]
+                if (atual[metrica] > base[metrica] * (1 + limite)
+                        and diferenca > self.opcoes['minimo_ms']):
+                    regressoes.append(
+                        f'{nome}: {metrica} {base[metrica]:.2f} → {atual[metrica]:.2f}'
+                    )
+
+            if atual['queries'] > base['queries']:
+                regressoes.append(f"{nome}: queries {base['queries']} → {atual['queries']}")
+
+            if atual['memoria_pico_kb'] > base['memoria_pico_kb'] * (1 + limite):
+                regressoes.append(
+                    f"{nome}: memória {base['memoria_pico_kb']} KB → {atual['memoria_pico_kb']} KB"
+                )
+
+        if regressoes:
+            for regressao in regressoes:
+                self.stdout.write(self.style.ERROR(f'  ✗ {regressao}'))
+            raise CommandError(
+                f'{len(regressoes)} regressão(ões) acima do limite de {limite:.0%} '
+                'ou cenário(s) sem baseline.'
+            )
+
+        self.stdout.write(self.style.SUCCESS('✅ Nenhuma regressão em relação à baseline'))
@@ -0,0 +1,562 @@
+"""
+Comando: python manage.py carga_http
+
+Gerador de carga HTTP (asyncio puro, sem dependências externas) para uma
+instância do meublog em execução
+
+Cada usuário virtual mantém sua própria conexão keep-alive e seus cookies
+(sessão + csrftoken) e executa operações sorteadas pelo --mix:
+
+- lista       GET  /                         (leitura anônima)
+- post        GET  /post/<slug>/             (leitura anônima)
+- reacao      POST /post/<slug>/curtir/      (logado, com X-CSRFToken)
+- comentario  POST /post/<slug>/             (logado, com csrfmiddlewaretoken)
+- busca       GET  /?categoria=<id>          (o blog não tem busca textual;
+                                              o filtro por categoria é a
+                                              listagem filtrada disponível)
+
+Ao final mostra vazão, taxa de erros e a distribuição de latência
+(histograma log-linear no estilo HDR) por operação e no total.
+
+Uso:
+    python manage.py runserver   # (ou gunicorn/uvicorn) em outro terminal
+    python manage.py carga_http --url http://127.0.0.1:8000 \\
+        --duracao 60 --concorrencia 50 \\
+        --mix lista=50,post=30,reacao=10,comentario=5,busca=5
+
+Comparando WSGI x ASGI (views async, ver blog/views_async.py) sob a mesma
+carga - mesma máquina, mesmo banco, mesmo número de processos:
+    gunicorn meublog.wsgi -w 4 --threads 8 -b 127.0.0.1:8000
+    uvicorn meublog.asgi:application --workers 4 --port 8001
+    python manage.py carga_http --url http://127.0.0.1:8000 \\
+        --comparar http://127.0.0.1:8001 --concorrencia 200 --seed 1
+
+Com --comparar a mesma execução (mix, duração, concorrência, seed) roda
+contra cada URL, uma depois da outra, e no fim sai uma tabela com vazão e
+percentis lado a lado.
+
+Slugs, usuários e categorias são lidos do banco configurado no settings
+(o mesmo usado pela instância alvo, populado com gerar_dados_carga).
+"""
+
+import asyncio
+import json
+import random
+import ssl
+import time
+from collections import Counter
+from urllib.parse import quote, urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from .gerar_dados_carga import SENHA_PADRAO
+
+
+OPERACOES = ('lista', 'post', 'reacao', 'comentario', 'busca')
+OPERACOES_LOGADAS = ('reacao', 'comentario')
+PERCENTIS = (50, 75, 90, 95, 99, 99.9, 99.99, 100)
+
+
+class HistogramaLatencia:
+    """
+    Histograma log-linear de latências (mesma ideia do HdrHistogram)
+
+    Valores em microssegundos. Abaixo de 2^bits o valor é guardado exato;
+    acima, cada potência de 2 é dividida em 2^bits sub-baldes, o que limita
+    o erro relativo a 1/2^(bits-1) (bits=7 → < 1,6%) com memória constante.
+    """
+
+    def __init__(self, bits=7):
+        self.bits = bits
+        self.baldes = Counter()
+        self.total = 0
+        self.soma = 0
+        self.minimo = None
+        self.maximo = 0
+
+    def registrar(self, micros):
+        micros = max(0, int(micros))
+        deslocamento = max(0, micros.bit_length() - self.bits)
+        self.baldes[(deslocamento, micros >> deslocamento)] += 1
+        self.total += 1
+        self.soma += micros
+        self.maximo = max(self.maximo, micros)
+        self.minimo = micros if self.minimo is None else min(self.minimo, micros)
+
+    def mesclar(self, outro):
+        self.baldes.update(outro.baldes)
+        self.total += outro.total
+        self.soma += outro.soma
+        self.maximo = max(self.maximo, outro.maximo)
+        if outro.minimo is not None:
+            self.minimo = outro.minimo if self.minimo is None else min(self.minimo, outro.minimo)
+
+    def percentil(self, p):
+        """Limite superior do balde que contém o percentil p (em µs)"""
+        if not self.total:
+            return 0
+        alvo = max(1, int(round(p / 100 * self.total)))
+        acumulado = 0
+        for deslocamento, base in sorted(self.baldes, key=lambda b: b[1] << b[0]):
+            acumulado += self.baldes[(deslocamento, base)]
+            if acumulado >= alvo:
+                return min(((base + 1) << deslocamento) - 1, self.maximo)
+        return self.maximo
+
+    def media(self):
+        return self.soma / self.total if self.total else 0
+
+
+class Estatisticas:
+    """Contadores globais da execução (uma instância, compartilhada pelas tarefas)"""
+
+    def __init__(self):
+        self.histogramas = {}
+        self.erros = Counter()
+        self.medindo = False
+        self.inicio_medicao = None
+        self.duracao_medida = 0
+
+    def registrar(self, operacao, micros, erro=None):
+        if not self.medindo:
+            return
+        if erro:
+            self.erros[(operacao, erro)] += 1
+            return
+        self.histogramas.setdefault(operacao, HistogramaLatencia()).registrar(micros)
+
+
+class RespostaHttp:
+    def __init__(self, status, cabecalhos, corpo):
+        self.status = status
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+
+
+class SessaoHttp:
+    """
+    Cliente HTTP/1.1 mínimo: uma conexão keep-alive + cookie jar
+
+    Reabre a conexão quando o servidor responde 'Connection: close' ou
+    fecha uma conexão ociosa.
+    """
+
+    def __init__(self, url_base, tempo_limite):
+        partes = urlsplit(url_base)
+        self.https = partes.scheme == 'https'
+        self.host = partes.hostname
+        self.porta = partes.port or (443 if self.https else 80)
+        self.cabecalho_host = partes.netloc
+        self.tempo_limite = tempo_limite
+        self.cookies = {}
+        self.leitor = None
+        self.escritor = None
+        self.logado = False
+
+    async def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            try:
+                await self.escritor.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.leitor = self.escritor = None
+
+    async def _conectar(self):
+        contexto = ssl.create_default_context() if self.https else None
+        self.leitor, self.escritor = await asyncio.open_connection(
+            self.host, self.porta, ssl=contexto
+        )
+
+    async def requisitar(self, metodo, caminho, dados=None, cabecalhos=None):
+        corpo = urlencode(dados).encode() if dados is not None else b''
+        linhas = [
+            f'{metodo} {caminho} HTTP/1.1',
+            f'Host: {self.cabecalho_host}',
+            'Connection: keep-alive',
+            'User-Agent: meublog-carga-http',
+        ]
+        if self.cookies:
+            linhas.append('Cookie: ' + '; '.join(f'{k}={v}' for k, v in self.cookies.items()))
+        if dados is not None:
+            linhas.append('Content-Type: application/x-www-form-urlencoded')
+            linhas.append(f'Content-Length: {len(corpo)}')
+        for nome, valor in (cabecalhos or {}).items():
+            linhas.append(f'{nome}: {valor}')
+        requisicao = ('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + corpo
+
+        reutilizada = self.escritor is not None
+        try:
+            return await asyncio.wait_for(self._enviar(requisicao), self.tempo_limite)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.fechar()
+            if not reutilizada:
+                raise
+            # Servidor fechou a conexão ociosa: tenta uma vez numa conexão nova
+            return await asyncio.wait_for(self._enviar(requisicao), self.tempo_limite)
+        except BaseException:
+            await self.fechar()
+            raise
+
+    async def _enviar(self, requisicao):
+        if self.escritor is None:
+            await self._conectar()
+
+        self.escritor.write(requisicao)
+        await self.escritor.drain()
+
+        linha = await self.leitor.readline()
+        if not linha:
+            raise ConnectionError('conexão fechada pelo servidor')
+        status = int(linha.split(b' ', 2)[1])
+
+        cabecalhos = {}
+        while True:
+            linha = await self.leitor.readline()
+            if linha in (b'\r\n', b'\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            nome, valor = nome.strip().lower(), valor.strip()
+            if nome == 'set-cookie':
+                self._guardar_cookie(valor)
+            else:
+                cabecalhos[nome] = valor
+
+        if cabecalhos.get('transfer-encoding', '').lower() == 'chunked':
+            partes = []
+            while True:
+                tamanho = int((await self.leitor.readline()).split(b';')[0], 16)
+                if tamanho == 0:
+                    while (await self.leitor.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                partes.append(await self.leitor.readexactly(tamanho))
+                await self.leitor.readexactly(2)
+            corpo = b''.join(partes)
+        elif 'content-length' in cabecalhos:
+            corpo = await self.leitor.readexactly(int(cabecalhos['content-length']))
+        else:
+            corpo = await self.leitor.read()
+            cabecalhos['connection'] = 'close'
+
+        if cabecalhos.get('connection', '').lower() == 'close':
+            await self.fechar()
+
+        return RespostaHttp(status, cabecalhos, corpo)
+
+    def _guardar_cookie(self, valor):
+        nome, _, conteudo = valor.split(';', 1)[0].partition('=')
+        nome = nome.strip()
+        if conteudo == '' or 'max-age=0' in valor.lower():
+            self.cookies.pop(nome, None)
+        else:
+            self.cookies[nome] = conteudo.strip()
+
+
+class Command(BaseCommand):
+    help = 'Gera carga HTTP (asyncio) contra uma instância do meublog e reporta latência e vazão'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default='http://127.0.0.1:8000')
+        parser.add_argument('--duracao', type=float, default=30, help='Segundos de medição')
+        parser.add_argument('--aquecimento', type=float, default=5,
+                            help='Segundos iniciais descartados da medição')
+        parser.add_argument('--concorrencia', type=int, default=20, help='Usuários virtuais')
+        parser.add_argument('--mix', type=str,
+                            default='lista=50,post=30,reacao=10,comentario=5,busca=5')
+        parser.add_argument('--pausa', type=float, default=0.0,
+                            help='Pausa (think time) média entre requisições de um usuário, em segundos')
+        parser.add_argument('--tempo-limite', type=float, default=10.0,
+                            help='Timeout por requisição, em segundos')
+        parser.add_argument('--usuarios', type=int, default=50,
+                            help='Quantas contas reais usar nas operações logadas')
+        parser.add_argument('--senha', type=str, default=SENHA_PADRAO)
+        parser.add_argument('--amostra-posts', type=int, default=1000,
+                            help='Quantos posts recentes sortear nas leituras')
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--saida', type=str, default=None,
+                            help='Grava o relatório em JSON neste arquivo')
+        parser.add_argument('--comparar', type=str, default=None,
+                            help='Segunda URL (ex.: build ASGI) sob a mesma carga, para comparação')
+
+    def handle(self, *args, **opcoes):
+        self.opcoes = opcoes
+        self.mix = self._ler_mix(opcoes['mix'])
+        self.dados = self._buscar_dados()
+
+        urls = [opcoes['url']] + ([opcoes['comparar']] if opcoes['comparar'] else [])
+        relatorios = []
+        for url in urls:
+            # Mesma seed a cada URL: a mesma sequência de operações
+            self.opcoes['url'] = url
+            self.rng = random.Random(opcoes['seed'])
+
+            estatisticas = Estatisticas()
+            inicio = time.perf_counter()
+            asyncio.run(self._executar(estatisticas))
+            self.stdout.write(f'Execução total: {time.perf_counter() - inicio:.1f}s\n')
+
+            relatorio = self._relatorio(estatisticas)
+            self._imprimir(relatorio)
+            relatorios.append(relatorio)
+
+        if len(relatorios) > 1:
+            self._imprimir_comparacao(*relatorios)
+
+        if opcoes['saida']:
+            saida = relatorios[0] if len(relatorios) == 1 else {'execucoes': relatorios}
+            with open(opcoes['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"💾 Relatório gravado em {opcoes['saida']}"))
+
+    def _ler_mix(self, texto):
+        mix = {}
+        for item in texto.split(','):
+            nome, _, peso = item.partition('=')
+            nome = nome.strip()
+            if nome not in OPERACOES:
+                raise CommandError(f'Operação desconhecida no --mix: {nome} '
+                                   f'(válidas: {", ".join(OPERACOES)})')
+            try:
+                mix[nome] = float(peso)
+            except ValueError:
+                raise CommandError(f'Peso inválido para {nome}: {peso!r}')
+        if not mix or sum(mix.values()) <= 0:
+            raise CommandError('--mix precisa de pelo menos uma operação com peso positivo.')
+        return mix
+
+    def _buscar_dados(self):
+        """
+        Lê do banco os alvos da carga
+
+        SQL EXECUTADO:
+        1. SELECT slugs dos posts mais recentes
+        2. SELECT ids de categorias
+        3. SELECT usernames de usuários comuns ativos
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT slug FROM blog_post
+                ORDER BY criado_em DESC
+                LIMIT %s
+            """, [self.opcoes['amostra_posts']])
+            slugs = [linha[0] for linha in cursor.fetchall()]
+
+            cursor.execute("SELECT id FROM blog_categoria ORDER BY id")
+            categorias = [linha[0] for linha in cursor.fetchall()]
+
+            cursor.execute("""
+                SELECT u.username
+                FROM auth_user u
+                INNER JOIN blog_perfilusuario p ON p.usuario_id = u.id
+                WHERE p.ativo = TRUE AND p.tipo_usuario = 'comum'
+                ORDER BY u.id
+                LIMIT %s
+            """, [self.opcoes['usuarios']])
+            usuarios = [linha[0] for linha in cursor.fetchall()]
+
+        if not slugs:
+            raise CommandError('Nenhum post no banco. Rode antes: python manage.py gerar_dados_carga')
+        if any(self.mix.get(op) for op in OPERACOES_LOGADAS) and not usuarios:
+            raise CommandError('O --mix tem operações logadas, mas não há usuários comuns ativos.')
+        if self.mix.get('busca') and not categorias:
+            raise CommandError('O --mix tem "busca", mas não há categorias.')
+
+        return {'slugs': slugs, 'categorias': categorias, 'usuarios': usuarios}
+
+    async def _executar(self, estatisticas):
+        laco = asyncio.get_running_loop()
+        fim = laco.time() + self.opcoes['aquecimento'] + self.opcoes['duracao']
+
+        async def iniciar_medicao():
+            await asyncio.sleep(self.opcoes['aquecimento'])
+            estatisticas.medindo = True
+            estatisticas.inicio_medicao = laco.time()
+
+        tarefas = [asyncio.create_task(iniciar_medicao())]
+        tarefas += [
+            asyncio.create_task(self._usuario_virtual(indice, fim, estatisticas))
+            for indice in range(self.opcoes['concorrencia'])
+        ]
+        await asyncio.gather(*tarefas)
+        if estatisticas.inicio_medicao is not None:
+            estatisticas.duracao_medida = laco.time() - estatisticas.inicio_medicao
+
+    async def _usuario_virtual(self, indice, fim, estatisticas):
+        laco = asyncio.get_running_loop()
+        rng = random.Random(self.rng.random())
+        sessao = SessaoHttp(self.opcoes['url'], self.opcoes['tempo_limite'])
+        operacoes = list(self.mix)
+        pesos = [self.mix[op] for op in operacoes]
+        usuarios = self.dados['usuarios']
+        username = usuarios[indice % len(usuarios)] if usuarios else None
+
+        try:
+            while laco.time() < fim:
+                operacao = rng.choices(operacoes, weights=pesos)[0]
+
+                if operacao in OPERACOES_LOGADAS and not sessao.logado:
+                    await self._medir(estatisticas, 'login', self._login(sessao, username))
+                    if not sessao.logado:
+                        await asyncio.sleep(1)
+                        continue
+
+                await self._medir(estatisticas, operacao, self._operacao(sessao, operacao, rng))
+
+                if self.opcoes['pausa']:
+                    await asyncio.sleep(rng.expovariate(1.0 / self.opcoes['pausa']))
+        finally:
+            await sessao.fechar()
+
+    async def _medir(self, estatisticas, operacao, corrotina):
+        inicio = time.perf_counter()
+        try:
+            erro = await corrotina
+        except asyncio.TimeoutError:
+            erro = 'timeout'
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+            erro = type(e).__name__
+        estatisticas.registrar(operacao, (time.perf_counter() - inicio) * 1_000_000, erro)
+
+    def _csrf(self, sessao):
+        return sessao.cookies.get('csrftoken', '')
+
+    async def _login(self, sessao, username):
+        """GET da página de login (recebe csrftoken) + POST das credenciais"""
+        resposta = await sessao.requisitar('GET', '/accounts/login/')
+        if resposta.status != 200:
+            return f'HTTP {resposta.status}'
+
+        resposta = await sessao.requisitar('POST', '/accounts/login/', {
+            'username': username,
+            'password': self.opcoes['senha'],
+            'csrfmiddlewaretoken': self._csrf(sessao),
+        }, {'Referer': f"{self.opcoes['url']}/accounts/login/"})
+
+        # Sucesso = redirect; 200 significa formulário de volta (credenciais recusadas)
+        if resposta.status != 302:
+            return f'login HTTP {resposta.status}'
+
+        sessao.logado = True
+        return None
+
+    async def _operacao(self, sessao, operacao, rng):
+        slug = quote(rng.choice(self.dados['slugs']))
+
+        if operacao == 'lista':
+            resposta = await sessao.requisitar('GET', '/')
+            esperado = 200
+        elif operacao == 'post':
+            resposta = await sessao.requisitar('GET', f'/post/{slug}/')
+            esperado = 200
+        elif operacao == 'busca':
+            categoria = rng.choice(self.dados['categorias'])
+            resposta = await sessao.requisitar('GET', f'/?categoria={categoria}')
+            esperado = 200
+        elif operacao == 'reacao':
+            tipo = rng.choice(['curtir', 'amei', 'engraçado', 'não_gostei'])
+            resposta = await sessao.requisitar('POST', f'/post/{slug}/curtir/', {
+                'tipo_reacao': tipo,
+            }, {
+                'X-CSRFToken': self._csrf(sessao),
+                'Referer': f"{self.opcoes['url']}/post/{slug}/",
+            })
+            esperado = 200
+        else:
+            resposta = await sessao.requisitar('POST', f'/post/{slug}/', {
+                'conteudo': f'Comentário de carga {rng.randrange(10 ** 9)}',
+                'csrfmiddlewaretoken': self._csrf(sessao),
+            }, {'Referer': f"{self.opcoes['url']}/post/{slug}/"})
+            esperado = 302
+
+        if resposta.status != esperado:
+            if resposta.status == 302 and 'login' in resposta.cabecalhos.get('location', ''):
+                # Sessão expirou: refaz login na próxima operação logada
+                sessao.logado = False
+            return f'HTTP {resposta.status}'
+        return None
+
+    def _relatorio(self, estatisticas):
+        duracao = estatisticas.duracao_medida or 1e-9
+        total = HistogramaLatencia()
+        operacoes = {}
+
+        for operacao, histograma in sorted(estatisticas.histogramas.items()):
+            total.mesclar(histograma)
+            erros = sum(n for (op, _), n in estatisticas.erros.items() if op == operacao)
+            operacoes[operacao] = self._resumo(histograma, erros, duracao)
+
+        total_erros = sum(estatisticas.erros.values())
+        return {
+            'url': self.opcoes['url'],
+            'concorrencia': self.opcoes['concorrencia'],
+            'duracao_s': round(duracao, 2),
+            'total': self._resumo(total, total_erros, duracao),
+            'operacoes': operacoes,
+            'erros': {f'{op}: {erro}': n for (op, erro), n in estatisticas.erros.most_common()},
+        }
+
+    def _resumo(self, histograma, erros, duracao):
+        requisicoes = histograma.total + erros
+        return {
+            'requisicoes': requisicoes,
+            'vazao_rps': round(histograma.total / duracao, 1),
+            'taxa_erros': round(erros / requisicoes, 4) if requisicoes else 0.0,
+            'media_ms': round(histograma.media() / 1000, 2),
+            'min_ms': round((histograma.minimo or 0) / 1000, 2),
+            'percentis_ms': {
+                str(p): round(histograma.percentil(p) / 1000, 2) for p in PERCENTIS
+            },
+        }
+
+    def _imprimir(self, relatorio):
+        total = relatorio['total']
+        self.stdout.write(self.style.SUCCESS(
+            f"📈 {relatorio['url']} - {relatorio['concorrencia']} usuários virtuais, "
+            f"{relatorio['duracao_s']}s medidos"
+        ))
+        self.stdout.write(
+            f"   {total['requisicoes']} requisições, {total['vazao_rps']} req/s bem-sucedidas, "
+            f"{total['taxa_erros']:.2%} de erros\n"
+        )
+
+        cabecalho = f"   {'operação':<12}{'req':>8}{'req/s':>9}{'erros':>8}{'média':>9}"
+        cabecalho += ''.join(f'{"p" + str(p):>9}' for p in PERCENTIS)
+        self.stdout.write(cabecalho + '   (ms)')
+
+        linhas = list(relatorio['operacoes'].items()) + [('TOTAL', total)]
+        for nome, resumo in linhas:
+            linha = (f"   {nome:<12}{resumo['requisicoes']:>8}{resumo['vazao_rps']:>9}"
+                     f"{resumo['taxa_erros']:>8.1%}{resumo['media_ms']:>9}")
+            linha += ''.join(f"{resumo['percentis_ms'][str(p)]:>9}" for p in PERCENTIS)
+            self.stdout.write(linha)
+
+        if relatorio['erros']:
+            self.stdout.write('\n   Erros:')
+            for descricao, quantidade in relatorio['erros'].items():
+                self.stdout.write(self.style.ERROR(f'     {quantidade:>6}  {descricao}'))
+
+    def _imprimir_comparacao(self, base, outro):
+        """Vazão e percentis das duas execuções lado a lado (variação em %)"""
+        self.stdout.write(self.style.SUCCESS(
+            f"\n⚖️  {base['url']}  x  {outro['url']} ({base['concorrencia']} usuários virtuais)"
+        ))
+        self.stdout.write(f"   {'operação':<12}{'métrica':<10}{'A':>10}{'B':>10}{'B/A':>9}")
+
+        def variacao(a, b):
+            return f'{(b / a - 1):+.0%}' if a else '-'
+
+        nomes = sorted(set(base['operacoes']) & set(outro['operacoes'])) + ['TOTAL']
+        for nome in nomes:
+            a = base['total'] if nome == 'TOTAL' else base['operacoes'][nome]
+            b = outro['total'] if nome == 'TOTAL' else outro['operacoes'][nome]
+            metricas = [('req/s', a['vazao_rps'], b['vazao_rps'])]
+            metricas += [(f'p{p} ms', a['percentis_ms'][str(p)], b['percentis_ms'][str(p)])
+                         for p in (50, 99)]
+            metricas.append(('erros', a['taxa_erros'], b['taxa_erros']))
+            for metrica, valor_a, valor_b in metricas:
+                self.stdout.write(
+                    f"   {nome:<12}{metrica:<10}{valor_a:>10}{valor_b:>10}{variacao(valor_a, valor_b):>9}"
+                )
+                nome = ''
@@ -0,0 +1,611 @@
+"""
+Comando: python manage.py gerar_dados_carga
+
+Gera dados sintéticos em volume de produção (usuários, perfis, categorias,
+posts, comentários e reações) para testes de escala - SQL PURO com COPY
+
+Exemplo (≈ 3 milhões de linhas em poucos minutos):
+    python manage.py gerar_dados_carga --usuarios 100000 --posts 200000 \\
+        --comentarios 1500000 --reacoes 1200000 --seed 42
+
+OPERAÇÕES SQL:
+1. SELECT nextval/setval nas sequências (reserva de blocos de IDs)
+2. COPY auth_user / blog_perfilusuario / blog_categoria / blog_post
+3. COPY blog_comentario / blog_reacaousuariopost
+4. UPDATE blog_post.total_comentarios (contador desnormalizado)
+5. ANALYZE nas tabelas carregadas
+
+DISTRIBUIÇÕES:
+- Popularidade dos posts segue Zipf (--zipf): poucos posts concentram a
+  maioria dos comentários e reações, como em produção
+- Atividade dos usuários (autoria de posts/comentários) também segue Zipf
+- Parte dos comentários (--rajadas) chega em rajada logo após a publicação
+
+A mesma --seed (com a mesma --ate) gera exatamente os mesmos dados.
+Todos os usuários gerados usam a senha SENHA_PADRAO.
+"""
+
+import io
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.text import slugify
+
+from blog.validators import validar_cpf_formato
+
+
+SENHA_PADRAO = 'Carga@123'
+
+PALAVRAS = [
+    'python', 'django', 'banco', 'dados', 'consulta', 'índice', 'servidor',
+    'desempenho', 'cache', 'código', 'projeto', 'aplicação', 'usuário',
+    'sistema', 'rede', 'segurança', 'teste', 'deploy', 'nuvem', 'api',
+    'tabela', 'linha', 'coluna', 'memória', 'processo', 'tempo', 'resposta',
+    'página', 'blog', 'post', 'comentário', 'ideia', 'exemplo', 'problema',
+    'solução', 'ferramenta', 'equipe', 'tarefa', 'versão', 'arquivo',
+    'simples', 'rápido', 'novo', 'melhor', 'grande', 'pequeno', 'importante',
+    'fácil', 'difícil', 'útil', 'hoje', 'sempre', 'muito', 'mais', 'menos',
+    'com', 'sem', 'para', 'sobre', 'entre', 'quando', 'como', 'porque',
+]
+
+TEMAS_CATEGORIA = [
+    'Tecnologia', 'Python', 'Django', 'Banco de Dados', 'DevOps', 'Carreira',
+    'Segurança', 'Frontend', 'Mobile', 'Nuvem', 'Dados', 'Inteligência Artificial',
+    'Redes', 'Linux', 'Testes', 'Arquitetura', 'Open Source', 'Games',
+]
+
+# Tipos de reação com pesos (curtir é a reação mais comum)
+TIPOS_REACAO = ['curtir', 'amei', 'engraçado', 'não_gostei']
+PESOS_REACAO = [60, 25, 10, 5]
+
+
+def gerar_cpf(base):
+    """
+    Gera um CPF válido a partir dos 9 primeiros dígitos (base)
+
+    Usa o mesmo cálculo de dígitos verificadores de validar_cpf_formato
+
+    OPERAÇÃO SQL: Nenhuma (cálculo em memória)
+    """
+    digitos = [int(d) for d in f'{base:09d}']
+
+    for peso_inicial in (10, 11):
+        soma = sum(d * (peso_inicial - i) for i, d in enumerate(digitos))
+        resto = soma % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+
+    return ''.join(str(d) for d in digitos)
+
+
+def pesos_zipf(quantidade, expoente, rng):
+    """
+    Pesos acumulados de uma distribuição de Zipf (para random.choices)
+
+    Os ranks são embaralhados para que a popularidade não dependa do ID
+    (o post mais popular não é necessariamente o primeiro criado).
+    Expoente 0 gera distribuição uniforme.
+    """
+    ranks = list(range(1, quantidade + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1.0 / (rank ** expoente) for rank in ranks))
+
+
+def formatar_copy(valor):
+    """Converte um valor Python para o formato texto do COPY"""
+    if valor is None:
+        return '\\N'
+    if valor is True:
+        return 't'
+    if valor is False:
+        return 'f'
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+
+    texto = str(valor)
+    return (texto.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+
+class CarregadorLote:
+    """
+    Acumula linhas e envia para o banco em lotes
+
+    - Padrão: COPY tabela (colunas) FROM STDIN (psycopg2 ou psycopg 3)
+    - Alternativa (--sem-copy): INSERT multi-linha com até 1000 linhas
+    """
+
+    LINHAS_POR_INSERT = 1000
+
+    def __init__(self, cursor, tabela, colunas, tamanho_lote, usar_copy=True):
+        self.cursor = cursor
+        self.tabela = tabela
+        self.colunas = colunas
+        self.tamanho_lote = tamanho_lote
+        self.usar_copy = usar_copy
+        self.linhas = []
+        self.total = 0
+
+    def adicionar(self, linha):
+        self.linhas.append(linha)
+        if len(self.linhas) >= self.tamanho_lote:
+            self.enviar()
+
+    def enviar(self):
+        if not self.linhas:
+            return
+
+        if self.usar_copy:
+            self._enviar_copy()
+        else:
+            self._enviar_insert()
+
+        self.total += len(self.linhas)
+        self.linhas = []
+
+    def _enviar_copy(self):
+        # SQL: COPY tabela (colunas) FROM STDIN
+        sql = f"COPY {self.tabela} ({', '.join(self.colunas)}) FROM STDIN"
+        dados = ''.join(
+            '\t'.join(formatar_copy(valor) for valor in linha) + '\n'
+            for linha in self.linhas
+        )
+
+        cursor_bruto = self.cursor.cursor
+        if hasattr(cursor_bruto, 'copy_expert'):
+            # psycopg2
+            cursor_bruto.copy_expert(sql, io.StringIO(dados))
+        else:
+            # psycopg 3
+            with cursor_bruto.copy(sql) as copy:
+                copy.write(dados)
+
+    def _enviar_insert(self):
+        marcadores = '(' + ', '.join(['%s'] * len(self.colunas)) + ')'
+
+        for inicio in range(0, len(self.linhas), self.LINHAS_POR_INSERT):
+            bloco = self.linhas[inicio:inicio + self.LINHAS_POR_INSERT]
+
+            # SQL: INSERT INTO tabela (colunas) VALUES (...), (...), ...
+            self.cursor.execute(
+                f"INSERT INTO {self.tabela} ({', '.join(self.colunas)}) "
+                f"VALUES {', '.join([marcadores] * len(bloco))}",
+                [valor for linha in bloco for valor in linha]
+            )
+
+
+class Command(BaseCommand):
+    help = 'Gera usuários, categorias, posts, comentários e reações sintéticos para testes de escala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=1000)
+        parser.add_argument('--admins', type=int, default=1,
+                            help='Quantos dos usuários gerados serão administradores')
+        parser.add_argument('--categorias', type=int, default=12)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comentarios', type=int, default=50000)
+        parser.add_argument('--reacoes', type=int, default=100000,
+                            help='Máximo de reações (limitado a uma por usuário e post)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Expoente de Zipf da popularidade (0 = uniforme)')
+        parser.add_argument('--rajadas', type=float, default=0.3,
+                            help='Fração dos comentários que chega em rajada após a publicação')
+        parser.add_argument('--janela-rajada', type=int, default=90,
+                            help='Duração média da rajada de comentários, em minutos')
+        parser.add_argument('--dias', type=int, default=365,
+                            help='Período (em dias) coberto pelas datas de publicação')
+        parser.add_argument('--ate', type=str, default=None,
+                            help='Data final do período (AAAA-MM-DD). Padrão: hoje')
+        parser.add_argument('--paragrafos', type=int, default=5,
+                            help='Número médio de parágrafos por post')
+        parser.add_argument('--sem-categoria', type=float, default=0.05,
+                            help='Fração de posts sem categoria')
+        parser.add_argument('--prefixo', type=str, default='carga',
+                            help='Prefixo dos usernames gerados')
+        parser.add_argument('--lote', type=int, default=20000,
+                            help='Linhas por COPY')
+        parser.add_argument('--sem-copy', action='store_true',
+                            help='Usa INSERT multi-linha em vez de COPY')
+
+    def handle(self, *args, **opcoes):
+        if opcoes['admins'] > opcoes['usuarios']:
+            raise CommandError('--admins não pode ser maior que --usuarios.')
+        if opcoes['usuarios'] < 1:
+            raise CommandError('É preciso gerar pelo menos um usuário.')
+        if min(opcoes['posts'], opcoes['comentarios'], opcoes['reacoes']) < 0:
+            raise CommandError('As quantidades não podem ser negativas.')
+        if opcoes['categorias'] < 1:
+            raise CommandError('É preciso gerar pelo menos uma categoria.')
+
+        self.rng = random.Random(opcoes['seed'])
+        self.opcoes = opcoes
+        self.usar_copy = not opcoes['sem_copy']
+
+        if opcoes['ate']:
+            try:
+                fim = datetime.strptime(opcoes['ate'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('--ate deve estar no formato AAAA-MM-DD.')
+        else:
+            fim = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        self.fim = fim.replace(tzinfo=dt_timezone.utc).timestamp()
+        self.inicio = self.fim - opcoes['dias'] * 86400
+
+        inicio_total = time.perf_counter()
+
+        with connection.cursor() as cursor:
+            self.cursor = cursor
+            self._verificar_prefixo()
+
+            usuarios = self._gerar_usuarios()
+            categorias = self._gerar_categorias()
+            posts = self._gerar_posts(usuarios, categorias)
+            if posts:
+                self._gerar_comentarios(usuarios, posts)
+                self._gerar_reacoes(usuarios, posts)
+                self._etapa('blog_post.total_comentarios', self._atualizar_contadores, posts)
+
+            self._etapa('ANALYZE', self._analisar)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Dados gerados em {time.perf_counter() - inicio_total:.1f}s'
+        ))
+        self.stdout.write(
+            f'   Admin: {self.username(0)} / senha: {SENHA_PADRAO}'
+            if opcoes['admins'] else f'   Senha de todos os usuários: {SENHA_PADRAO}'
+        )
+
+    # ------------------------------------------------------------------
+    # Auxiliares
+    # ------------------------------------------------------------------
+
+    def username(self, indice):
+        return f"{self.opcoes['prefixo']}{self.opcoes['seed']}_{indice:07d}"
+
+    def _etapa(self, nome, funcao, *args):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        total = resultado if isinstance(resultado, int) else None
+        duracao = time.perf_counter() - inicio
+
+        if total is not None:
+            self.stdout.write(f'  ✓ {nome}: {total} linhas em {duracao:.1f}s '
+                              f'({total / max(duracao, 1e-6):,.0f} linhas/s)')
+        else:
+            self.stdout.write(f'  ✓ {nome} em {duracao:.1f}s')
+
+        return resultado
+
+    def _verificar_prefixo(self):
+        """
+        Impede gerar duas vezes o mesmo lote (usernames seriam duplicados)
+
+        SQL EXECUTADO:
+        SELECT COUNT(*) FROM auth_user WHERE username = %s
+        """
+        self.cursor.execute("""
+            SELECT COUNT(*) FROM auth_user WHERE username = %s
+        """, [self.username(0)])
+
+        if self.cursor.fetchone()[0] > 0:
+            raise CommandError(
+                f'Já existem usuários com o prefixo "{self.username(0)[:-8]}". '
+                'Use outra --seed ou outro --prefixo.'
+            )
+
+    def _reservar_ids(self, tabela, quantidade):
+        """
+        Reserva um bloco contíguo de IDs na sequência da tabela
+
+        SQL EXECUTADO:
+        1. SELECT pg_get_serial_sequence(tabela, 'id')
+        2. SELECT GREATEST(nextval(seq), MAX(id) + 1)
+        3. SELECT setval(seq, inicio + quantidade - 1)
+        """
+        self.cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [tabela])
+        sequencia = self.cursor.fetchone()[0]
+
+        self.cursor.execute(f"""
+            SELECT GREATEST(nextval(%s), (SELECT COALESCE(MAX(id), 0) + 1 FROM {tabela}))
+        """, [sequencia])
+        inicio = self.cursor.fetchone()[0]
+
+        if quantidade > 0:
+            self.cursor.execute("SELECT setval(%s, %s)", [sequencia, inicio + quantidade - 1])
+
+        return inicio
+
+    def _carregador(self, tabela, colunas):
+        return CarregadorLote(self.cursor, tabela, colunas,
+                              self.opcoes['lote'], self.usar_copy)
+
+    def _data(self, timestamp):
+        return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+    def _texto(self, minimo, maximo):
+        palavras = self.rng.choices(PALAVRAS, k=self.rng.randint(minimo, maximo))
+        return ' '.join(palavras).capitalize() + '.'
+
+    def _pool(self, quantidade, gerador):
+        """Pré-gera textos para não montar um texto novo por linha"""
+        return [gerador() for _ in range(quantidade)]
+
+    # ------------------------------------------------------------------
+    # Geração por tabela
+    # ------------------------------------------------------------------
+
+    def _gerar_usuarios(self):
+        """
+        Gera usuários e perfis (CPFs válidos e únicos)
+
+        SQL EXECUTADO:
+        1. SELECT cpf FROM blog_perfilusuario (evitar CPFs já cadastrados)
+        2. COPY auth_user
+        3. COPY blog_perfilusuario
+        """
+        quantidade = self.opcoes['usuarios']
+        senha_hash = make_password(SENHA_PADRAO)
+
+        self.cursor.execute("SELECT cpf FROM blog_perfilusuario")
+        cpfs_existentes = {linha[0] for linha in self.cursor.fetchall()}
+
+        primeiro_usuario = self._reservar_ids('auth_user', quantidade)
+        primeiro_perfil = self._reservar_ids('blog_perfilusuario', quantidade)
+
+        # Datas de cadastro: até 90 dias antes do início do período
+        cadastros = sorted(
+            self.rng.uniform(self.inicio - 90 * 86400, self.inicio)
+            for _ in range(quantidade)
+        )
+
+        base_cpf = self.rng.randrange(100_000_000, 800_000_000)
+        cpfs = []
+        while len(cpfs) < quantidade:
+            cpf = gerar_cpf(base_cpf % 1_000_000_000)
+            base_cpf += 1
+            try:
+                cpf = validar_cpf_formato(cpf)
+            except ValidationError:
+                continue
+            if cpf not in cpfs_existentes:
+                cpfs.append(cpf)
+
+        def carregar_usuarios():
+            carregador = self._carregador('auth_user', [
+                'id', 'password', 'last_login', 'is_superuser', 'username',
+                'first_name', 'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+            ])
+            for i in range(quantidade):
+                username = self.username(i)
+                carregador.adicionar((
+                    primeiro_usuario + i, senha_hash, None, False, username,
+                    '', '', f'{username}@carga.meublog.dev', False, True,
+                    self._data(cadastros[i]),
+                ))
+            carregador.enviar()
+            return carregador.total
+
+        def carregar_perfis():
+            carregador = self._carregador('blog_perfilusuario', [
+                'id', 'usuario_id', 'cpf', 'tipo_usuario', 'ativo', 'criado_em', 'atualizado_em',
+            ])
+            for i in range(quantidade):
+                data = self._data(cadastros[i])
+                tipo = 'admin' if i < self.opcoes['admins'] else 'comum'
+                carregador.adicionar((
+                    primeiro_perfil + i, primeiro_usuario + i, cpfs[i], tipo, True, data, data,
+                ))
+            carregador.enviar()
+            return carregador.total
+
+        self._etapa('auth_user', carregar_usuarios)
+        self._etapa('blog_perfilusuario', carregar_perfis)
+
+        return list(range(primeiro_usuario, primeiro_usuario + quantidade))
+
+    def _gerar_categorias(self):
+        """
+        Gera categorias com nomes únicos
+
+        SQL EXECUTADO:
+        1. SELECT nome FROM blog_categoria
+        2. COPY blog_categoria
+        """
+        self.cursor.execute("SELECT nome FROM blog_categoria")
+        existentes = {linha[0] for linha in self.cursor.fetchall()}
+
+        nomes = []
+        for i in itertools.count():
+            tema = TEMAS_CATEGORIA[i % len(TEMAS_CATEGORIA)]
+            rodada = i // len(TEMAS_CATEGORIA)
+            nome = tema if rodada == 0 else f'{tema} {rodada + 1}'
+            if nome not in existentes:
+                nomes.append(nome)
+            if len(nomes) == self.opcoes['categorias']:
+                break
+
+        primeira = self._reservar_ids('blog_categoria', len(nomes))
+
+        def carregar():
+            carregador = self._carregador('blog_categoria', ['id', 'nome'])
+            for i, nome in enumerate(nomes):
+                carregador.adicionar((primeira + i, nome))
+            carregador.enviar()
+            return carregador.total
+
+        self._etapa('blog_categoria', carregar)
+        return list(range(primeira, primeira + len(nomes)))
+
+    def _gerar_posts(self, usuarios, categorias):
+        """
+        Gera posts com autores e categorias em distribuição de Zipf
+
+        Retorna lista de (post_id, timestamp de criação), em ordem de ID
+        (IDs crescem junto com a data, como em produção)
+
+        SQL EXECUTADO:
+        COPY blog_post
+        """
+        quantidade = self.opcoes['posts']
+        if quantidade == 0:
+            return []
+
+        primeiro = self._reservar_ids('blog_post', quantidade)
+        zipf = self.opcoes['zipf']
+        pesos_autores = pesos_zipf(len(usuarios), zipf, self.rng)
+        pesos_categorias = pesos_zipf(len(categorias), zipf, self.rng)
+
+        datas = sorted(self.rng.uniform(self.inicio, self.fim) for _ in range(quantidade))
+        autores = self.rng.choices(usuarios, cum_weights=pesos_autores, k=quantidade)
+        paragrafos = self._pool(2000, lambda: self._texto(40, 120))
+        titulos = self._pool(5000, lambda: self._texto(4, 10)[:-1])
+        media_paragrafos = self.opcoes['paragrafos']
+
+        def carregar():
+            carregador = self._carregador('blog_post', [
+                'id', 'titulo', 'slug', 'autor_id', 'conteudo', 'imagem',
+                'categoria_id', 'criado_em', 'atualizado_em',
+            ])
+            for i in range(quantidade):
+                post_id = primeiro + i
+                titulo = self.rng.choice(titulos)[:180]
+                total_paragrafos = max(1, int(self.rng.gauss(media_paragrafos, 2)))
+                conteudo = '\n\n'.join(self.rng.choices(paragrafos, k=total_paragrafos))
+
+                if self.rng.random() < self.opcoes['sem_categoria']:
+                    categoria_id = None
+                else:
+                    categoria_id = self.rng.choices(categorias, cum_weights=pesos_categorias)[0]
+
+                criado = self._data(datas[i])
+                carregador.adicionar((
+                    post_id, titulo, f'{slugify(titulo)[:35]}-{post_id}', autores[i],
+                    conteudo, None, categoria_id, criado, criado,
+                ))
+            carregador.enviar()
+            return carregador.total
+
+        self._etapa('blog_post', carregar)
+        return list(zip(range(primeiro, primeiro + quantidade), datas))
+
+    def _data_interacao(self, criado_post):
+        """
+        Data de um comentário/reação: em rajada logo após a publicação
+        (exponencial com média --janela-rajada) ou uniforme até o fim do período
+        """
+        if self.rng.random() < self.opcoes['rajadas']:
+            atraso = self.rng.expovariate(1.0 / (self.opcoes['janela_rajada'] * 60))
+            return min(criado_post + atraso, self.fim)
+        return self.rng.uniform(criado_post, self.fim)
+
+    def _gerar_comentarios(self, usuarios, posts):
+        """
+        Gera comentários: post escolhido por Zipf, autor escolhido por Zipf
+
+        SQL EXECUTADO:
+        COPY blog_comentario (em lotes)
+        """
+        quantidade = self.opcoes['comentarios']
+        zipf = self.opcoes['zipf']
+        pesos_posts = pesos_zipf(len(posts), zipf, self.rng)
+        pesos_autores = pesos_zipf(len(usuarios), zipf, self.rng)
+        textos = self._pool(5000, lambda: self._texto(3, 40))
+        indices_posts = range(len(posts))
+        lote = self.opcoes['lote']
+
+        def carregar():
+            carregador = self._carregador('blog_comentario', [
+                'post_id', 'autor_id', 'conteudo', 'criado_em', 'atualizado_em',
+            ])
+            restantes = quantidade
+            while restantes > 0:
+                tamanho = min(lote, restantes)
+                escolhidos = self.rng.choices(indices_posts, cum_weights=pesos_posts, k=tamanho)
+                autores = self.rng.choices(usuarios, cum_weights=pesos_autores, k=tamanho)
+
+                for indice, autor_id in zip(escolhidos, autores):
+                    post_id, criado_post = posts[indice]
+                    data = self._data(self._data_interacao(criado_post))
+                    carregador.adicionar((
+                        post_id, autor_id, self.rng.choice(textos), data, data,
+                    ))
+                restantes -= tamanho
+            carregador.enviar()
+            return carregador.total
+
+        return self._etapa('blog_comentario', carregar)
+
+    def _gerar_reacoes(self, usuarios, posts):
+        """
+        Gera reações: quantidade por post segue Zipf, no máximo uma
+        reação por (usuário, post) - respeita o unique_together
+
+        SQL EXECUTADO:
+        COPY blog_reacaousuariopost (em lotes)
+        """
+        pesos_posts = pesos_zipf(len(posts), self.opcoes['zipf'], self.rng)
+        por_post = Counter(self.rng.choices(
+            range(len(posts)), cum_weights=pesos_posts, k=self.opcoes['reacoes']
+        ))
+        total_usuarios = len(usuarios)
+
+        def carregar():
+            carregador = self._carregador('blog_reacaousuariopost', [
+                'usuario_id', 'post_id', 'tipo_reacao', 'criado_em',
+            ])
+            for indice in sorted(por_post):
+                post_id, criado_post = posts[indice]
+                quantidade = min(por_post[indice], total_usuarios)
+                tipos = self.rng.choices(TIPOS_REACAO, weights=PESOS_REACAO, k=quantidade)
+
+                for posicao, tipo in zip(self.rng.sample(range(total_usuarios), quantidade), tipos):
+                    carregador.adicionar((
+                        usuarios[posicao], post_id, tipo,
+                        self._data(self._data_interacao(criado_post)),
+                    ))
+            carregador.enviar()
+            return carregador.total
+
+        return self._etapa('blog_reacaousuariopost', carregar)
+
+    def _atualizar_contadores(self, posts):
+        """
+        Preenche o contador desnormalizado de comentários dos posts gerados
+        (o COPY de blog_comentario não passa pelas views que o mantêm)
+
+        SQL EXECUTADO:
+        UPDATE blog_post ... FROM (SELECT post_id, COUNT(*) ... GROUP BY post_id)
+        """
+        self.cursor.execute("""
+            UPDATE blog_post p
+            SET total_comentarios = c.total
+            FROM (
+                SELECT post_id, COUNT(*) AS total
+                FROM blog_comentario
+                WHERE post_id BETWEEN %s AND %s
+                GROUP BY post_id
+            ) c
+            WHERE p.id = c.post_id
+        """, [posts[0][0], posts[-1][0]])
+        return self.cursor.rowcount
+
+    def _analisar(self):
+        """
+        Atualiza estatísticas do planejador após a carga
+
+        SQL EXECUTADO:
+        ANALYZE em cada tabela carregada
+        """
+        for tabela in ('auth_user', 'blog_perfilusuario', 'blog_categoria',
+                       'blog_post', 'blog_comentario', 'blog_reacaousuariopost'):
+            self.cursor.execute(f"ANALYZE {tabela}")
@@ -0,0 +1,175 @@
+"""
+Comando: python manage.py limpar_midia
+
+Encontra (e opcionalmente apaga) imagens em MEDIA_ROOT/posts/ que nenhum
+post referencia mais - sobras de edições antigas, exclusões anteriores a
+midia.liberar_imagem() ou uploads cujo INSERT falhou
+
+Uso:
+    python manage.py limpar_midia                 # só relatório (dry-run)
+    python manage.py limpar_midia --excluir       # apaga os órfãos
+    python manage.py limpar_midia --listar        # mostra cada arquivo órfão
+
+Memória constante, independente do número de arquivos:
+- Os diretórios são percorridos com os.scandir (gerador, sem listar tudo)
+- Os arquivos são conferidos em blocos de --lote caminhos:
+      SELECT imagem FROM blog_post WHERE imagem = ANY(%s)
+  (usa o índice idx_post_imagem); só o bloco atual fica em memória
+
+Arquivos modificados há menos de --carencia horas são ignorados: o upload
+grava o arquivo antes do INSERT/UPDATE do post, então um arquivo recém-criado
+pode ainda não estar referenciado.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+def percorrer_arquivos(raiz):
+    """Gera os os.DirEntry de arquivos sob raiz (pilha explícita, sem recursão)"""
+    pendentes = [raiz]
+    while pendentes:
+        diretorio = pendentes.pop()
+        try:
+            with os.scandir(diretorio) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        pendentes.append(entrada.path)
+                    elif entrada.is_file(follow_symlinks=False):
+                        yield entrada
+        except FileNotFoundError:
+            continue
+
+
+def formatar_bytes(total):
+    for unidade in ('B', 'KB', 'MB', 'GB'):
+        if total < 1024:
+            return f'{total:.1f} {unidade}'
+        total /= 1024
+    return f'{total:.1f} TB'
+
+
+class Command(BaseCommand):
+    help = 'Lista ou apaga imagens de posts sem referência em blog_post.imagem'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--excluir', action='store_true',
+                            help='Apaga os arquivos órfãos (sem isso, só relatório)')
+        parser.add_argument('--pasta', type=str, default='posts',
+                            help='Subpasta de MEDIA_ROOT a varrer (upload_to de Post.imagem)')
+        parser.add_argument('--carencia', type=float, default=24.0,
+                            help='Ignora arquivos modificados há menos de N horas')
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Caminhos conferidos por consulta')
+        parser.add_argument('--listar', action='store_true',
+                            help='Mostra cada arquivo órfão')
+
+    def handle(self, *args, **opcoes):
+        media_root = Path(settings.MEDIA_ROOT)
+        raiz = media_root / opcoes['pasta']
+        if not raiz.is_dir():
+            raise CommandError(f'Pasta não encontrada: {raiz}')
+        if opcoes['lote'] < 1:
+            raise CommandError('--lote deve ser positivo.')
+
+        self.opcoes = opcoes
+        self.media_root = str(media_root)
+        self.limite_mtime = time.time() - opcoes['carencia'] * 3600
+        self.resumo = {
+            'arquivos': 0, 'recentes': 0, 'referenciados': 0,
+            'orfaos': 0, 'bytes_orfaos': 0, 'apagados': 0, 'bytes_apagados': 0, 'erros': 0,
+        }
+
+        inicio = time.perf_counter()
+        bloco = []
+        for entrada in percorrer_arquivos(str(raiz)):
+            self.resumo['arquivos'] += 1
+            bloco.append(entrada)
+            if len(bloco) >= opcoes['lote']:
+                self._conferir(bloco)
+                bloco = []
+        if bloco:
+            self._conferir(bloco)
+
+        self._relatorio(time.perf_counter() - inicio)
+
+    def _caminho_relativo(self, entrada):
+        """Caminho como gravado em blog_post.imagem (ex.: posts/<uuid>.jpg)"""
+        return os.path.relpath(entrada.path, self.media_root).replace(os.sep, '/')
+
+    def _conferir(self, bloco):
+        """
+        Separa os arquivos do bloco em referenciados e órfãos
+
+        SQL EXECUTADO:
+        SELECT imagem FROM blog_post WHERE imagem = ANY(%s)
+        """
+        candidatos = {}
+        for entrada in bloco:
+            try:
+                estado = entrada.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if estado.st_mtime > self.limite_mtime:
+                self.resumo['recentes'] += 1
+                continue
+            candidatos[self._caminho_relativo(entrada)] = (entrada.path, estado.st_size)
+
+        if not candidatos:
+            return
+
+        with connection.cursor() as cursor:
+            # SQL: Quais caminhos do bloco ainda são usados por algum post
+            # (inclui posts marcados como excluídos, ainda não apagados)
+            cursor.execute("""
+                SELECT imagem FROM blog_post WHERE imagem = ANY(%s)
+            """, [list(candidatos)])
+            referenciados = {linha[0] for linha in cursor.fetchall()}
+
+        self.resumo['referenciados'] += len(referenciados)
+
+        for relativo, (absoluto, tamanho) in candidatos.items():
+            if relativo in referenciados:
+                continue
+
+            self.resumo['orfaos'] += 1
+            self.resumo['bytes_orfaos'] += tamanho
+            if self.opcoes['listar']:
+                self.stdout.write(f'  {relativo} ({formatar_bytes(tamanho)})')
+
+            if self.opcoes['excluir']:
+                try:
+                    os.remove(absoluto)
+                    self.resumo['apagados'] += 1
+                    self.resumo['bytes_apagados'] += tamanho
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.resumo['erros'] += 1
+                    self.stderr.write(f'  ✗ {relativo}: {e}')
+
+    def _relatorio(self, duracao):
+        r = self.resumo
+        self.stdout.write(
+            f"Arquivos verificados: {r['arquivos']} em {duracao:.1f}s\n"
+            f"  Referenciados:        {r['referenciados']}\n"
+            f"  Dentro da carência:   {r['recentes']}\n"
+            f"  Órfãos:               {r['orfaos']} ({formatar_bytes(r['bytes_orfaos'])})"
+        )
+
+        if self.opcoes['excluir']:
+            self.stdout.write(self.style.SUCCESS(
+                f"🧹 {r['apagados']} arquivo(s) apagado(s), "
+                f"{formatar_bytes(r['bytes_apagados'])} liberados"
+                + (f", {r['erros']} erro(s)" if r['erros'] else '')
+            ))
+        elif r['orfaos']:
+            self.stdout.write(self.style.WARNING(
+                f"Dry-run: nada foi apagado. Rode com --excluir para liberar "
+                f"{formatar_bytes(r['bytes_orfaos'])}."
+            ))
@@ -0,0 +1,46 @@
+"""
+Comando: python manage.py processar_tarefas
+
+Executa as tarefas em lote pendentes (blog_tarefalote) fora do processo web
+
+Uso:
+    python manage.py processar_tarefas              # esvazia a fila e sai (cron)
+    python manage.py processar_tarefas --continuo   # fica aguardando novas tarefas
+
+Antes de processar, devolve à fila as tarefas "executando" sem progresso há
+mais de --minutos-parada (servidor reiniciado no meio de uma tarefa).
+Pode rodar em paralelo com a thread do processo web: a reserva usa
+FOR UPDATE SKIP LOCKED.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog import tarefas
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em lote pendentes (exclusão/mesclagem de categorias)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--continuo', action='store_true',
+                            help='Não sai quando a fila esvazia; consulta de novo a cada --intervalo')
+        parser.add_argument('--intervalo', type=float, default=5.0,
+                            help='Segundos entre consultas no modo contínuo')
+        parser.add_argument('--minutos-parada', type=int, default=tarefas.MINUTOS_TAREFA_PARADA,
+                            help='Tarefas executando sem progresso há mais que isso voltam para a fila')
+
+    def handle(self, *args, **opcoes):
+        while True:
+            retomadas = tarefas.retomar_paradas(opcoes['minutos_parada'])
+            if retomadas:
+                self.stdout.write(self.style.WARNING(f'↻ {retomadas} tarefa(s) parada(s) de volta à fila'))
+
+            executadas = tarefas.processar_pendentes()
+            if executadas:
+                self.stdout.write(self.style.SUCCESS(f'✓ {executadas} tarefa(s) executada(s)'))
+
+            if not opcoes['continuo']:
+                break
+            time.sleep(opcoes['intervalo'])
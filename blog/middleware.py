@@ -0,0 +1,72 @@
+"""
+Middlewares do blog (síncronos e assíncronos: não forçam troca de thread
+nas views async sob ASGI)
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import db, invalidacao
+
+
+class LeituraPrimarioMiddleware:
+    """
+    Ler o que acabou de escrever (réplica de leitura, ver db.py)
+
+    - Requisições POST/PUT/PATCH/DELETE leem do primário
+    - A resposta a elas grava o cookie COOKIE por db.JANELA_POS_ESCRITA
+      segundos; enquanto ele existir, as leituras desse cliente também vão
+      para o primário (o redirect após o POST já mostra o que foi gravado)
+    """
+
+    COOKIE = 'ler_primario'
+    METODOS_ESCRITA = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+
+        escrita = request.method in self.METODOS_ESCRITA
+        token = db.forcar_primario(escrita or self.COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            db.restaurar(token)
+        return self._marcar(escrita, response)
+
+    async def _acall(self, request):
+        escrita = request.method in self.METODOS_ESCRITA
+        token = db.forcar_primario(escrita or self.COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db.restaurar(token)
+        return self._marcar(escrita, response)
+
+    def _marcar(self, escrita, response):
+        if escrita and db.replica_configurada():
+            response.set_cookie(self.COOKIE, '1', max_age=db.JANELA_POS_ESCRITA,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+class InvalidacaoMiddleware:
+    """
+    Inicia a thread ouvinte do barramento de invalidação (ver invalidacao.py)
+
+    Roda uma vez, quando o processo web carrega os middlewares, e sai da
+    cadeia (MiddlewareNotUsed): nenhum custo por requisição. Comandos de
+    gerenciamento não carregam middlewares e não abrem o LISTEN.
+    """
+
+    def __init__(self, get_response):
+        invalidacao.ouvinte.iniciar()
+        raise MiddlewareNotUsed
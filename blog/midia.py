@@ -0,0 +1,49 @@
+"""
+Arquivos de mídia dos posts (MEDIA_ROOT/posts/) - SQL PURO
+
+Imagens são gravadas como posts/<uuid>.<ext> e referenciadas por
+blog_post.imagem. Um arquivo só é apagado quando nenhum post (nem os
+marcados como excluídos, ainda aguardando a limpeza) o referencia mais.
+
+A remoção roda depois do COMMIT (transaction.on_commit): se a transação
+que trocou/excluiu a imagem for desfeita, o arquivo continua lá.
+"""
+
+import logging
+
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+def imagem_referenciada(caminho):
+    """
+    Algum post ainda aponta para o arquivo?
+
+    SQL EXECUTADO:
+    SELECT EXISTS(SELECT 1 FROM blog_post WHERE imagem = %s)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT EXISTS(SELECT 1 FROM blog_post WHERE imagem = %s)
+        """, [caminho])
+        return cursor.fetchone()[0]
+
+
+def _apagar_se_orfa(caminho):
+    try:
+        if imagem_referenciada(caminho):
+            return
+        if default_storage.exists(caminho):
+            default_storage.delete(caminho)
+    except Exception:
+        # Arquivo que sobrar é recolhido por: manage.py limpar_midia
+        logger.exception('Falha ao liberar a imagem %s', caminho)
+
+
+def liberar_imagem(caminho):
+    """Apaga o arquivo após o COMMIT, se não houver mais referências"""
+    if caminho:
+        transaction.on_commit(lambda: _apagar_se_orfa(caminho))
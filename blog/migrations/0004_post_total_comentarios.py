@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_alter_categoria_options_comentario_atualizado_em_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='total_comentarios',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE blog_post p
+                SET total_comentarios = c.total
+                FROM (
+                    SELECT post_id, COUNT(*) AS total
+                    FROM blog_comentario
+                    GROUP BY post_id
+                ) c
+                WHERE p.id = c.post_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_tarefalote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excluido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
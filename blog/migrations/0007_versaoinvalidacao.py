@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_excluido_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoInvalidacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('versao', models.BigIntegerField(db_default=0, default=0)),
+            ],
+            options={
+                'verbose_name': 'Versão de Invalidação',
+                'verbose_name_plural': 'Versões de Invalidação',
+            },
+        ),
+        # Linha única do contador (blog/invalidacao.py)
+        migrations.RunSQL(
+            "INSERT INTO blog_versaoinvalidacao (id, versao) VALUES (1, 0)",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
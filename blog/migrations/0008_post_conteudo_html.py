@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_versaoinvalidacao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='conteudo_html',
+            field=models.TextField(blank=True, db_default='', default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='versao_html',
+            field=models.PositiveSmallIntegerField(db_default=0, default=0, editable=False),
+        ),
+    ]
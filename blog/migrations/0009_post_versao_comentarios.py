@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_post_conteudo_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='versao_comentarios',
+            field=models.PositiveIntegerField(db_default=0, default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_versao_comentarios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AtividadePost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hora', models.DateTimeField()),
+                ('reacoes', models.PositiveIntegerField(db_default=0, default=0)),
+                ('comentarios', models.PositiveIntegerField(db_default=0, default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'Atividade do Post',
+                'verbose_name_plural': 'Atividades dos Posts',
+                'unique_together': {('post', 'hora')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PontuacaoPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='pontuacao', serialize=False, to='blog.post')),
+                ('em_alta', models.FloatField()),
+                ('comentados', models.FloatField(null=True)),
+                ('atualizado_em', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Pontuação do Post',
+                'verbose_name_plural': 'Pontuações dos Posts',
+                'indexes': [
+                    models.Index(fields=['-em_alta'], name='idx_pontuacao_em_alta'),
+                    models.Index(condition=models.Q(('comentados__isnull', False)), fields=['-comentados'], name='idx_pontuacao_comentados'),
+                ],
+            },
+        ),
+    ]
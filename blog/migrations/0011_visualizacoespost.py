@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_atividadepost_pontuacaopost'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisualizacoesPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='visualizacoes', serialize=False, to='blog.post')),
+                ('total', models.BigIntegerField(db_default=0, default=0)),
+                ('atualizado_em', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Visualizações do Post',
+                'verbose_name_plural': 'Visualizações dos Posts',
+                'indexes': [models.Index(fields=['-total'], name='idx_visualizacoes_total')],
+            },
+        ),
+    ]
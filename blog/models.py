@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils.text import slugify
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 """
@@ -138,6 +138,17 @@ def criar_perfil_usuario(sender, instance, created, **kwargs):
     pass
 
 
+@receiver(post_save, sender=PerfilUsuario)
+@receiver(post_delete, sender=PerfilUsuario)
+def invalidar_perfil(sender, instance, **kwargs):
+    """
+    Perfil alterado pelo ORM (admin do Django, ativar()/desativar()):
+    descarta o tipo em cache em todos os processos (ver blog/invalidacao.py)
+    """
+    from . import invalidacao
+    invalidacao.publicar('perfis', instance.usuario_id)
+
+
 class Categoria(models.Model):
     """
     TABELA: blog_categoria
@@ -167,14 +178,34 @@ class Post(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     autor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     conteudo = models.TextField()
+    conteudo_html = models.TextField(blank=True, default='', db_default='', editable=False)
+    versao_html = models.PositiveSmallIntegerField(default=0, db_default=0, editable=False)
+    # Campos: conteudo_html TEXT NOT NULL DEFAULT '', versao_html SMALLINT NOT NULL DEFAULT 0
+    # HTML do conteúdo já escapado e em parágrafos, gerado na gravação;
+    # versão antiga do renderizador = renderizado de novo na leitura (renderizacao.py)
     imagem = models.ImageField(upload_to='posts/', blank=True, null=True)
     categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True)
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
+    total_comentarios = models.PositiveIntegerField(default=0, db_default=0, editable=False)
+    # Campo: total_comentarios INTEGER NOT NULL DEFAULT 0
+    # Contador desnormalizado: mantido pelos INSERT/DELETE de comentários
+    # (evita COUNT(*) por post nas listagens do admin)
+    versao_comentarios = models.PositiveIntegerField(default=0, db_default=0, editable=False)
+    # Campo: versao_comentarios INTEGER NOT NULL DEFAULT 0
+    # Incrementado por quem insere/edita/exclui comentários do post; compõe a
+    # chave do fragmento em cache da lista de comentários (post_detail)
+    excluido_em = models.DateTimeField(null=True, blank=True, editable=False)
+    # Campo: excluido_em TIMESTAMP NULL
+    # Preenchido na exclusão: o post some das consultas na hora e os
+    # comentários/reações são apagados em lotes por uma tarefa (tarefas.py)
 
     def save(self, *args, **kwargs):
+        from .renderizacao import VERSAO_HTML, renderizar
         if not self.slug:
             self.slug = slugify(self.titulo)
+        self.conteudo_html = renderizar(self.conteudo)
+        self.versao_html = VERSAO_HTML
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -251,6 +282,89 @@ class ReacaoUsuarioPost(models.Model):
         }
         return emojis.get(tipo_reacao, '👍')
     
+class TarefaLote(models.Model):
+    """
+    TABELA: blog_tarefalote
+    
+    Fila de tarefas longas executadas em lotes fora da requisição
+    (ex.: excluir/mesclar categorias com muitos posts) - ver blog/tarefas.py
+    
+    SQL DE CRIAÇÃO:
+    CREATE TABLE blog_tarefalote (
+        id BIGSERIAL PRIMARY KEY,
+        tipo VARCHAR(50) NOT NULL,
+        parametros JSONB NOT NULL DEFAULT '{}',
+        estado VARCHAR(20) NOT NULL DEFAULT 'pendente',
+        total INTEGER NOT NULL DEFAULT 0,
+        processados INTEGER NOT NULL DEFAULT 0,
+        erro TEXT NOT NULL DEFAULT '',
+        criado_por_id INTEGER NULL REFERENCES auth_user(id),
+        criado_em TIMESTAMP NOT NULL,
+        iniciado_em TIMESTAMP NULL,
+        atualizado_em TIMESTAMP NOT NULL,
+        concluido_em TIMESTAMP NULL
+    );
+    
+    ÍNDICES:
+    - INDEX: (estado, id) para reservar a próxima tarefa pendente
+    """
+    
+    ESTADOS = [
+        ('pendente', 'Pendente'),
+        ('executando', 'Executando'),
+        ('concluida', 'Concluída'),
+        ('falhou', 'Falhou'),
+    ]
+    
+    tipo = models.CharField(max_length=50)
+    parametros = models.JSONField(default=dict, db_default={})
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendente', db_default='pendente')
+    total = models.PositiveIntegerField(default=0, db_default=0)
+    processados = models.PositiveIntegerField(default=0, db_default=0)
+    erro = models.TextField(blank=True, default='', db_default='')
+    criado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+    # Atualizado a cada lote: serve de "sinal de vida" da tarefa
+    concluido_em = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['estado', 'id'], name='idx_tarefa_estado_id')]
+        verbose_name = 'Tarefa em Lote'
+        verbose_name_plural = 'Tarefas em Lote'
+    
+    def __str__(self):
+        return f'{self.tipo} #{self.pk} ({self.estado})'
+
+
+class VersaoInvalidacao(models.Model):
+    """
+    TABELA: blog_versaoinvalidacao
+    
+    Linha única (id = 1) com o contador de mensagens do barramento de
+    invalidação de cache (ver blog/invalidacao.py). Cada publicação incrementa
+    a versão na mesma transação do NOTIFY; um ouvinte que vê um buraco na
+    sequência sabe que perdeu mensagens.
+    
+    SQL DE CRIAÇÃO:
+    CREATE TABLE blog_versaoinvalidacao (
+        id BIGSERIAL PRIMARY KEY,
+        versao BIGINT NOT NULL DEFAULT 0
+    );
+    INSERT INTO blog_versaoinvalidacao (id, versao) VALUES (1, 0);
+    """
+    
+    versao = models.BigIntegerField(default=0, db_default=0)
+    
+    class Meta:
+        verbose_name = 'Versão de Invalidação'
+        verbose_name_plural = 'Versões de Invalidação'
+    
+    def __str__(self):
+        return f'versão {self.versao}'
+
+    
 """
 RELACIONAMENTOS E QUERIES COMUNS:
 
@@ -287,4 +401,107 @@ RELACIONAMENTOS E QUERIES COMUNS:
         FROM blog_post
         LEFT JOIN blog_comentario ON blog_post.id = blog_comentario.post_id
         GROUP BY blog_post.id
-"""
\ No newline at end of file
+"""
+
+class AtividadePost(models.Model):
+    """
+    TABELA: blog_atividadepost
+    
+    Baldes por hora de reações/comentários novos de cada post, ainda não
+    somados na pontuação (ver blog/ranking.py). Cada evento faz UPSERT na
+    linha da hora corrente; ranking.consolidar() consome e apaga os baldes.
+    
+    SQL DE CRIAÇÃO:
+    CREATE TABLE blog_atividadepost (
+        id BIGSERIAL PRIMARY KEY,
+        post_id BIGINT NOT NULL REFERENCES blog_post(id),
+        hora TIMESTAMP WITH TIME ZONE NOT NULL,
+        reacoes INTEGER NOT NULL DEFAULT 0,
+        comentarios INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (post_id, hora)
+    );
+    """
+    
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    hora = models.DateTimeField()
+    reacoes = models.PositiveIntegerField(default=0, db_default=0)
+    comentarios = models.PositiveIntegerField(default=0, db_default=0)
+    
+    class Meta:
+        unique_together = ('post', 'hora')
+        verbose_name = 'Atividade do Post'
+        verbose_name_plural = 'Atividades dos Posts'
+    
+    def __str__(self):
+        return f'{self.post_id} @ {self.hora:%Y-%m-%d %H}h'
+
+
+class PontuacaoPost(models.Model):
+    """
+    TABELA: blog_pontuacaopost
+    
+    Pontuação com decaimento de cada post com atividade, em espaço
+    logarítmico (ver blog/ranking.py): em_alta (reações + comentários) e
+    comentados (só comentários, NULL se nunca teve). Os índices em ordem
+    decrescente servem o top N com uma leitura.
+    
+    SQL DE CRIAÇÃO:
+    CREATE TABLE blog_pontuacaopost (
+        post_id BIGINT PRIMARY KEY REFERENCES blog_post(id),
+        em_alta DOUBLE PRECISION NOT NULL,
+        comentados DOUBLE PRECISION NULL,
+        atualizado_em TIMESTAMP WITH TIME ZONE NOT NULL
+    );
+    CREATE INDEX idx_pontuacao_em_alta ON blog_pontuacaopost (em_alta DESC);
+    CREATE INDEX idx_pontuacao_comentados ON blog_pontuacaopost (comentados DESC)
+        WHERE comentados IS NOT NULL;
+    """
+    
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='pontuacao')
+    em_alta = models.FloatField()
+    comentados = models.FloatField(null=True)
+    atualizado_em = models.DateTimeField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-em_alta'], name='idx_pontuacao_em_alta'),
+            models.Index(
+                fields=['-comentados'], name='idx_pontuacao_comentados',
+                condition=models.Q(comentados__isnull=False),
+            ),
+        ]
+        verbose_name = 'Pontuação do Post'
+        verbose_name_plural = 'Pontuações dos Posts'
+    
+    def __str__(self):
+        return f'{self.post_id}: {self.em_alta:.2f}'
+
+
+class VisualizacoesPost(models.Model):
+    """
+    TABELA: blog_visualizacoespost
+    
+    Total de visualizações de cada post visitado, gravado em lotes pelo
+    contador em memória dos processos (ver blog/visualizacoes.py). Fica
+    fora de blog_post para o contador não disputar lock com edições.
+    
+    SQL DE CRIAÇÃO:
+    CREATE TABLE blog_visualizacoespost (
+        post_id BIGINT PRIMARY KEY REFERENCES blog_post(id),
+        total BIGINT NOT NULL DEFAULT 0,
+        atualizado_em TIMESTAMP WITH TIME ZONE NOT NULL
+    );
+    CREATE INDEX idx_visualizacoes_total ON blog_visualizacoespost (total DESC);
+    """
+    
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='visualizacoes')
+    total = models.BigIntegerField(default=0, db_default=0)
+    atualizado_em = models.DateTimeField()
+    
+    class Meta:
+        indexes = [models.Index(fields=['-total'], name='idx_visualizacoes_total')]
+        verbose_name = 'Visualizações do Post'
+        verbose_name_plural = 'Visualizações dos Posts'
+    
+    def __str__(self):
+        return f'{self.post_id}: {self.total}'
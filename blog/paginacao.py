@@ -0,0 +1,202 @@
+"""
+Paginação por cursor (keyset) - SQL PURO
+
+OFFSET obriga o banco a ler e descartar todas as linhas anteriores à página
+(página 10.000 = 500.000 linhas lidas). Keyset continua a partir da última
+linha vista usando o índice da ordenação:
+
+    ORDER BY u.date_joined DESC, u.id DESC
+    WHERE (u.date_joined, u.id) < (%s, %s)     -- valores da última linha
+    LIMIT 51                                   -- 50 + 1 para saber se há próxima
+
+O cursor enviado na URL (?depois=... / ?antes=...) é a chave da linha de
+referência serializada em base64 (JSON), opaca para o usuário - mas não
+confiável: cada valor é conferido contra o tipo declarado da coluna na
+Ordenacao, e cursor adulterado é ignorado (primeira página) em vez de
+chegar ao banco.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+# Maior valor de BIGINT no PostgreSQL
+MAXIMO_BIGINT = 2 ** 63 - 1
+
+
+class Ordenacao:
+    """
+    Ordenação paginável: colunas (todas na mesma direção) que juntas
+    identificam a linha de forma única - a última coluna deve ser única (id)
+
+    tipos: tipo Python de cada coluna (datetime, int ou str), usado para
+    validar os valores do cursor
+
+    As mesmas colunas precisam de um índice para a paginação ser barata.
+    """
+
+    def __init__(self, colunas, tipos, descendente=False):
+        if len(tipos) != len(colunas):
+            raise ValueError('Informe um tipo para cada coluna da ordenação.')
+        self.colunas = colunas
+        self.tipos = tipos
+        self.descendente = descendente
+
+    @property
+    def nomes(self):
+        """Colunas sem o alias da tabela (u.id -> id), para a query externa"""
+        return [coluna.split('.', 1)[-1] for coluna in self.colunas]
+
+    def order_by(self, invertida=False, qualificada=True):
+        descendente = self.descendente != invertida
+        direcao = 'DESC' if descendente else 'ASC'
+        colunas = self.colunas if qualificada else self.nomes
+        return ', '.join(f'{coluna} {direcao}' for coluna in colunas)
+
+    def condicao(self, invertida=False):
+        """Comparação de tupla: (a, b) < (%s, %s) - usa o índice composto"""
+        descendente = self.descendente != invertida
+        operador = '<' if descendente else '>'
+        marcadores = ', '.join(['%s'] * len(self.colunas))
+        return f"({', '.join(self.colunas)}) {operador} ({marcadores})"
+
+
+def codificar_cursor(valores):
+    """Serializa a chave de uma linha (datas viram {'dt': iso})"""
+    serializaveis = [
+        {'dt': valor.isoformat()} if isinstance(valor, datetime) else valor
+        for valor in valores
+    ]
+    texto = json.dumps(serializaveis, separators=(',', ':'))
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def _converter(valor, tipo):
+    """Valor do JSON do cursor -> valor do tipo da coluna (ValueError se não casar)"""
+    if tipo is datetime:
+        if not isinstance(valor, dict) or not isinstance(valor.get('dt'), str):
+            raise ValueError(valor)
+        return datetime.fromisoformat(valor['dt'])
+    if tipo is int:
+        # bool é subclasse de int; fora do BIGINT o banco daria erro
+        if isinstance(valor, bool) or not isinstance(valor, int) or abs(valor) > MAXIMO_BIGINT:
+            raise ValueError(valor)
+        return valor
+    if tipo is str:
+        # NUL não é aceito em texto no PostgreSQL
+        if not isinstance(valor, str) or '\x00' in valor:
+            raise ValueError(valor)
+        return valor
+    raise TypeError(f'Tipo de coluna não suportado no cursor: {tipo!r}')
+
+
+def decodificar_cursor(cursor, tipos):
+    """
+    Desfaz codificar_cursor conferindo cada valor com tipos (um por coluna);
+    retorna None se o cursor for inválido
+    """
+    if not cursor:
+        return None
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        valores = json.loads(texto)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+    if not isinstance(valores, list) or len(valores) != len(tipos):
+        return None
+
+    try:
+        return [_converter(valor, tipo) for valor, tipo in zip(valores, tipos)]
+    except ValueError:
+        return None
+
+
+class PaginaKeyset:
+    """
+    Monta as cláusulas de uma página e processa o resultado
+
+    Uso:
+        pagina = PaginaKeyset(ordenacao, request.GET, por_pagina=50)
+        condicao, params_cursor = pagina.condicao()      # ou ('', [])
+        cursor.execute(f"SELECT ... WHERE ... {'AND ' + condicao if condicao else ''}
+                         ORDER BY {pagina.order_by()} LIMIT %s", [..., *params_cursor, pagina.limite])
+        linhas = pagina.ler(cursor)
+
+    Depois de processar: pagina.proximo / pagina.anterior são os cursores
+    (str) das páginas vizinhas, ou None.
+    """
+
+    def __init__(self, ordenacao, parametros, por_pagina=50):
+        self.ordenacao = ordenacao
+        self.por_pagina = por_pagina
+        self.antes = decodificar_cursor(parametros.get('antes'), ordenacao.tipos)
+        self.depois = None if self.antes else decodificar_cursor(parametros.get('depois'), ordenacao.tipos)
+        self.proximo = None
+        self.anterior = None
+
+    @property
+    def invertida(self):
+        """Voltando uma página: lê na ordem inversa a partir do cursor"""
+        return self.antes is not None
+
+    @property
+    def limite(self):
+        return self.por_pagina + 1
+
+    def condicao(self):
+        referencia = self.antes or self.depois
+        if referencia is None:
+            return '', []
+        return self.ordenacao.condicao(self.invertida), list(referencia)
+
+    def order_by(self, qualificada=True):
+        return self.ordenacao.order_by(self.invertida, qualificada)
+
+    def processar(self, linhas, chave):
+        linhas = list(linhas)
+        tem_mais = len(linhas) > self.por_pagina
+        linhas = linhas[:self.por_pagina]
+
+        if self.invertida:
+            linhas.reverse()
+            if linhas:
+                self.proximo = codificar_cursor(chave(linhas[-1]))
+                if tem_mais:
+                    self.anterior = codificar_cursor(chave(linhas[0]))
+        elif linhas:
+            if tem_mais:
+                self.proximo = codificar_cursor(chave(linhas[-1]))
+            if self.depois is not None:
+                self.anterior = codificar_cursor(chave(linhas[0]))
+
+        return linhas
+
+    def ler(self, cursor):
+        """
+        fetchall + processar, tirando a chave pelas colunas do resultado
+        (o SELECT precisa trazer as colunas da ordenação com o mesmo nome)
+        """
+        colunas = [coluna[0] for coluna in cursor.description]
+        indices = [colunas.index(nome) for nome in self.ordenacao.nomes]
+        return self.processar(cursor.fetchall(), chave=lambda linha: [linha[i] for i in indices])
+
+
+def termo_prefixo(texto):
+    """
+    Padrão LIKE de prefixo, em minúsculas, com curingas escapados
+
+    Usado com lower(coluna) LIKE %s e índice varchar_pattern_ops
+    """
+    escapado = texto.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escapado + '%'
+
+
+def ler_por_pagina(parametros, padrao=50, minimo=10, maximo=200):
+    try:
+        valor = int(parametros.get('por_pagina', padrao))
+    except (TypeError, ValueError):
+        return padrao
+    return max(minimo, min(maximo, valor))
@@ -0,0 +1,226 @@
+"""
+Rankings "Em alta", "Mais comentados" e "Mais vistos" - SQL PURO
+
+Calcular ao vivo quais posts estão em alta é varrer blog_reacaousuariopost
+e blog_comentario inteiras. Aqui a pontuação é mantida aos poucos:
+
+- Cada reação nova/comentário soma 1 no balde da hora corrente do post
+  (blog_atividadepost, UPSERT de uma linha na mesma transação do evento)
+- consolidar() consome os baldes (DELETE ... RETURNING) e soma cada um na
+  pontuação do post (blog_pontuacaopost), com decaimento exponencial
+- A listagem é uma leitura pelo índice da pontuação (ORDER BY ... LIMIT N),
+  em cache por CACHE_RANKING_SEGUNDOS; consolidar() roda no recálculo
+
+Decaimento em espaço logarítmico: em vez de guardar o valor decaído (que
+precisaria ser reescrito em todos os posts a cada hora), cada balde entra
+com peso * exp(lambda * hora) e a coluna guarda o logaritmo da soma:
+
+    pontuacao = ln(soma(peso * exp(lambda * horas_desde_1970)))
+
+Na hora h, o valor decaído é exp(pontuacao - lambda * h): o fator é o mesmo
+para todos os posts, então a ordem pela coluna já é a ordem pelo valor
+decaído e nenhuma linha precisa mudar com o tempo. A soma em log usa
+ln(exp(a) + exp(b)) = max(a, b) + ln(1 + exp(-|a - b|)) (sem estouro).
+
+Reações removidas e comentários excluídos não descontam: a pontuação mede
+atividade recente, não o total atual.
+
+"Mais vistos" lê o total de visualizações (blog_visualizacoespost, gravado
+em lotes por visualizacoes.py) pelo índice do total.
+"""
+
+import math
+
+from django.conf import settings
+from django.db import connection
+
+from . import db_async, revalidacao
+
+
+# Meia-vida da pontuação, em horas
+MEIA_VIDA_EM_ALTA_HORAS = getattr(settings, 'RANKING_MEIA_VIDA_EM_ALTA_HORAS', 24)
+MEIA_VIDA_COMENTADOS_HORAS = getattr(settings, 'RANKING_MEIA_VIDA_COMENTADOS_HORAS', 24 * 7)
+
+# Peso de um comentário em "Em alta" (uma reação vale 1)
+PESO_COMENTARIO = 3
+
+TAMANHO_RANKING = 5
+CACHE_RANKING_SEGUNDOS = 60
+CHAVE_RANKING = 'ranking:posts'
+
+LAMBDA_EM_ALTA = math.log(2) / MEIA_VIDA_EM_ALTA_HORAS
+LAMBDA_COMENTADOS = math.log(2) / MEIA_VIDA_COMENTADOS_HORAS
+
+SQL_REGISTRAR = """
+    INSERT INTO blog_atividadepost (post_id, hora, reacoes, comentarios)
+    VALUES (%s, date_trunc('hour', NOW()), %s, %s)
+    ON CONFLICT (post_id, hora) DO UPDATE
+    SET reacoes = blog_atividadepost.reacoes + EXCLUDED.reacoes,
+        comentarios = blog_atividadepost.comentarios + EXCLUDED.comentarios
+"""
+
+
+def _soma_log(a, b):
+    """SQL de ln(exp(a) + exp(b)); NULL conta como zero"""
+    return f"""
+        CASE WHEN {a} IS NULL THEN {b}
+             WHEN {b} IS NULL THEN {a}
+             ELSE GREATEST({a}, {b}) + LN(1 + EXP(-ABS({a} - {b})))
+        END
+    """
+
+
+# Baldes consumidos -> termo em log de cada balde -> soma em log por post
+# (max + ln(soma(exp(termo - max))), como em _soma_log) -> soma na pontuação
+SQL_CONSOLIDAR = f"""
+    WITH baldes AS (
+        DELETE FROM blog_atividadepost
+        RETURNING post_id, EXTRACT(EPOCH FROM hora) / 3600 AS horas, reacoes, comentarios
+    ),
+    termos AS (
+        SELECT post_id,
+               LN(reacoes + %(peso)s * comentarios) + %(lambda_em_alta)s * horas AS em_alta,
+               CASE WHEN comentarios > 0
+                    THEN LN(comentarios) + %(lambda_comentados)s * horas
+               END AS comentados
+        FROM baldes
+        WHERE reacoes + comentarios > 0
+    ),
+    maximos AS (
+        SELECT post_id, em_alta, comentados,
+               MAX(em_alta) OVER (PARTITION BY post_id) AS max_em_alta,
+               MAX(comentados) OVER (PARTITION BY post_id) AS max_comentados
+        FROM termos
+    ),
+    por_post AS (
+        SELECT post_id,
+               MAX(max_em_alta) + LN(SUM(EXP(em_alta - max_em_alta))) AS em_alta,
+               MAX(max_comentados) + LN(SUM(EXP(comentados - max_comentados))) AS comentados
+        FROM maximos
+        GROUP BY post_id
+    )
+    INSERT INTO blog_pontuacaopost (post_id, em_alta, comentados, atualizado_em)
+    SELECT post_id, em_alta, comentados, NOW() FROM por_post
+    ON CONFLICT (post_id) DO UPDATE
+    SET em_alta = {_soma_log('blog_pontuacaopost.em_alta', 'EXCLUDED.em_alta')},
+        comentados = {_soma_log('blog_pontuacaopost.comentados', 'EXCLUDED.comentados')},
+        atualizado_em = NOW()
+"""
+
+# Uma leitura pelo índice da pontuação (idx_pontuacao_em_alta / idx_pontuacao_comentados)
+SQL_EM_ALTA = """
+    SELECT p.titulo, p.slug, p.total_comentarios
+    FROM blog_pontuacaopost s
+    INNER JOIN blog_post p ON p.id = s.post_id
+    WHERE p.excluido_em IS NULL
+    ORDER BY s.em_alta DESC
+    LIMIT %s
+"""
+
+SQL_MAIS_COMENTADOS = """
+    SELECT p.titulo, p.slug, p.total_comentarios
+    FROM blog_pontuacaopost s
+    INNER JOIN blog_post p ON p.id = s.post_id
+    WHERE s.comentados IS NOT NULL AND p.excluido_em IS NULL
+    ORDER BY s.comentados DESC
+    LIMIT %s
+"""
+
+SQL_MAIS_VISTOS = """
+    SELECT p.titulo, p.slug, v.total
+    FROM blog_visualizacoespost v
+    INNER JOIN blog_post p ON p.id = v.post_id
+    WHERE p.excluido_em IS NULL
+    ORDER BY v.total DESC
+    LIMIT %s
+"""
+
+PARAMETROS_CONSOLIDAR = {
+    'peso': PESO_COMENTARIO,
+    'lambda_em_alta': LAMBDA_EM_ALTA,
+    'lambda_comentados': LAMBDA_COMENTADOS,
+}
+
+
+def registrar(cursor, post_id, reacoes=0, comentarios=0):
+    """
+    Soma o evento no balde da hora corrente (chamar na transação do evento)
+
+    SQL EXECUTADO:
+    INSERT INTO blog_atividadepost ... ON CONFLICT (post_id, hora) DO UPDATE
+    """
+    cursor.execute(SQL_REGISTRAR, [post_id, reacoes, comentarios])
+
+
+async def aregistrar(conexao, post_id, reacoes=0, comentarios=0):
+    """Versão assíncrona de registrar() (conexão de db_async)"""
+    await conexao.execute(SQL_REGISTRAR, [post_id, reacoes, comentarios])
+
+
+def consolidar():
+    """
+    Soma os baldes pendentes nas pontuações (um único comando)
+
+    Pode rodar a qualquer momento: os baldes consumidos são apagados no
+    mesmo comando, e eventos que chegam depois criam um balde novo.
+
+    SQL EXECUTADO:
+    WITH baldes AS (DELETE FROM blog_atividadepost RETURNING ...)
+    INSERT INTO blog_pontuacaopost ... ON CONFLICT (post_id) DO UPDATE
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_CONSOLIDAR, PARAMETROS_CONSOLIDAR)
+        return cursor.rowcount
+
+
+def _formatar(linhas, campo='total_comentarios'):
+    return [{'titulo': titulo, 'slug': slug, campo: total} for titulo, slug, total in linhas]
+
+
+def _resultado(em_alta, mais_comentados, mais_vistos):
+    return {
+        'em_alta': _formatar(em_alta),
+        'mais_comentados': _formatar(mais_comentados),
+        'mais_vistos': _formatar(mais_vistos, 'visualizacoes'),
+    }
+
+
+def ranking_posts():
+    """
+    {'em_alta': [...], 'mais_comentados': [...], 'mais_vistos': [...]} com
+    TAMANHO_RANKING posts cada (em cache, recalculado por um único processo)
+
+    SQL EXECUTADO (apenas no recálculo):
+    1. Consolidar baldes pendentes (consolidar)
+    2. SELECT top N por em_alta (índice)
+    3. SELECT top N por comentados (índice)
+    4. SELECT top N por visualizações (índice)
+    """
+    def calcular():
+        consolidar()
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_EM_ALTA, [TAMANHO_RANKING])
+            em_alta = cursor.fetchall()
+            cursor.execute(SQL_MAIS_COMENTADOS, [TAMANHO_RANKING])
+            mais_comentados = cursor.fetchall()
+            cursor.execute(SQL_MAIS_VISTOS, [TAMANHO_RANKING])
+            mais_vistos = cursor.fetchall()
+        return _resultado(em_alta, mais_comentados, mais_vistos)
+
+    return revalidacao.obter(CHAVE_RANKING, calcular, CACHE_RANKING_SEGUNDOS)
+
+
+async def aranking_posts():
+    """Versão assíncrona de ranking_posts() (mesma chave de cache)"""
+    async def calcular():
+        async with db_async.conexao() as conexao:
+            await conexao.execute(SQL_CONSOLIDAR, PARAMETROS_CONSOLIDAR)
+            cursor = await conexao.execute(SQL_EM_ALTA, [TAMANHO_RANKING])
+            em_alta = await cursor.fetchall()
+            cursor = await conexao.execute(SQL_MAIS_COMENTADOS, [TAMANHO_RANKING])
+            mais_comentados = await cursor.fetchall()
+            cursor = await conexao.execute(SQL_MAIS_VISTOS, [TAMANHO_RANKING])
+            mais_vistos = await cursor.fetchall()
+        return _resultado(em_alta, mais_comentados, mais_vistos)
+
+    return await revalidacao.aobter(CHAVE_RANKING, calcular, CACHE_RANKING_SEGUNDOS)
@@ -0,0 +1,87 @@
+"""
+HTML pré-renderizado do corpo dos posts - SQL PURO
+
+O template de post_detail aplicava {{ post.conteudo|linebreaks }} a cada
+requisição: escapar e quebrar em parágrafos um texto longo custa CPU toda
+vez. Agora o HTML (escapado, com <p>/<br>) é gerado ao gravar o post e fica
+em blog_post.conteudo_html, com a versão do renderizador em versao_html.
+
+- post_create/post_edit (e Post.save, usado pelo admin) gravam o HTML
+- Mudou a forma de renderizar? Incremente VERSAO_HTML: posts com versão
+  antiga são renderizados de novo na primeira leitura (post_detail e API)
+  e regravados com gravar()/agravar()
+- O UPDATE só sobrescreve versões menores: um processo com código antigo
+  (deploy em andamento) não desfaz o trabalho de um mais novo
+"""
+
+from django.db import connection
+from django.utils.html import linebreaks
+
+from . import db_async
+
+
+VERSAO_HTML = 1
+
+SQL_GRAVAR = """
+    UPDATE blog_post AS p
+    SET conteudo_html = v.html, versao_html = %s
+    FROM unnest(%s::bigint[], %s::text[]) AS v(id, html)
+    WHERE p.id = v.id AND p.versao_html < %s
+"""
+
+
+def renderizar(conteudo):
+    """Texto do post -> HTML escapado em parágrafos (mesmo que o filtro linebreaks)"""
+    return linebreaks(conteudo or '', autoescape=True)
+
+
+def html_atual(conteudo, conteudo_html, versao):
+    """
+    (html, desatualizado): o HTML gravado se a versão é a atual; senão o
+    renderizado agora (quem chamou deve gravá-lo)
+    """
+    if versao == VERSAO_HTML:
+        return conteudo_html, False
+    return renderizar(conteudo), True
+
+
+def _params(htmls):
+    ids = list(htmls)
+    return [VERSAO_HTML, ids, [htmls[post_id] for post_id in ids], VERSAO_HTML]
+
+
+def gravar(htmls):
+    """
+    Grava {post_id: html} renderizados na versão atual (um único UPDATE)
+
+    SQL EXECUTADO:
+    UPDATE blog_post AS p SET conteudo_html = v.html, versao_html = VERSAO_HTML
+    FROM unnest(ids, htmls) AS v(id, html) WHERE p.id = v.id AND p.versao_html < VERSAO_HTML
+    """
+    if not htmls:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_GRAVAR, _params(htmls))
+
+
+async def agravar(htmls):
+    """Versão assíncrona de gravar() (pool de db_async)"""
+    if not htmls:
+        return
+    async with db_async.conexao() as conexao:
+        await conexao.execute(SQL_GRAVAR, _params(htmls))
+
+
+def renderizar_posts(ids):
+    """
+    Renderiza e grava o HTML dos posts; retorna {post_id: html}
+
+    SQL EXECUTADO:
+    1. SELECT id, conteudo FROM blog_post WHERE id = ANY(%s)
+    2. UPDATE ... FROM unnest(...) (gravar)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id, conteudo FROM blog_post WHERE id = ANY(%s)", [list(ids)])
+        htmls = {post_id: renderizar(conteudo) for post_id, conteudo in cursor.fetchall()}
+    gravar(htmls)
+    return htmls
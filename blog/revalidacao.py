@@ -0,0 +1,130 @@
+"""
+Cache com revalidação: serve o valor antigo enquanto UM processo recalcula
+
+Com get_or_set, quando uma chave quente expira todas as requisições
+simultâneas refazem a mesma consulta pesada (estouro de cache). Aqui:
+
+- Cada entrada guarda (valor, custo, fresco_ate). Até fresco_ate o valor é
+  servido direto; depois disso continua no cache por mais `obsoleto`
+  segundos (expiração definitiva = segundos + obsoleto)
+- Recálculo único: só quem consegue cache.add() na chave da trava recalcula;
+  os demais servem o valor antigo. Sem valor antigo (chave nova ou apagada
+  por invalidação), esperam o recálculo do outro por até ESPERA_RECALCULO
+  segundos
+- Recálculo antecipado probabilístico (XFetch): perto de fresco_ate, cada
+  leitura decide recalcular com probabilidade que cresce com a proximidade
+  do vencimento e com o custo do último cálculo - o recálculo começa antes
+  de a entrada vencer, espalhado entre as requisições
+
+A trava vive no backend de cache (compartilhado entre processos, ver
+cache_camadas.py) e depende de um add() atômico: o do Redis é; o do cache
+em arquivo não é entre processos (só desenvolvimento).
+
+Uso:
+    revalidacao.obter('categorias:contagem', buscar, 300)
+    await revalidacao.aobter('categorias:contagem', abuscar, 300)
+"""
+
+import asyncio
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+OBSOLETO_SEGUNDOS = getattr(settings, 'CACHE_OBSOLETO_SEGUNDOS', 300)
+BETA = 1.0
+TEMPO_TRAVA = 30
+ESPERA_RECALCULO = 5
+INTERVALO_ESPERA = 0.05
+
+
+def _chave_trava(chave):
+    return f'{chave}:recalculando'
+
+
+def _fresca(entrada, beta):
+    """XFetch: agora - custo * beta * ln(rand) < fresco_ate"""
+    _, custo, fresco_ate = entrada
+    sorteio = math.log(1.0 - random.random())  # (-inf, 0]
+    return time.time() - custo * beta * sorteio < fresco_ate
+
+
+def _entrada(valor, custo, segundos):
+    return (valor, custo, time.time() + segundos)
+
+
+def obter(chave, calcular, segundos, obsoleto=None, beta=BETA):
+    """
+    Valor da chave, recalculado por calcular() por um único processo
+
+    segundos: tempo em que o valor é servido sem recálculo
+    obsoleto: tempo extra em que o valor antigo ainda é servido enquanto
+              outro recalcula (padrão CACHE_OBSOLETO_SEGUNDOS)
+    """
+    obsoleto = OBSOLETO_SEGUNDOS if obsoleto is None else obsoleto
+    entrada = cache.get(chave)
+    if entrada is not None and _fresca(entrada, beta):
+        return entrada[0]
+
+    trava = _chave_trava(chave)
+    if cache.add(trava, 1, TEMPO_TRAVA):
+        try:
+            # Outro pode ter terminado o recálculo entre o get e o add
+            recente = cache.get(chave)
+            if recente is not None and (entrada is None or recente[2] > entrada[2]):
+                return recente[0]
+            inicio = time.monotonic()
+            valor = calcular()
+            custo = time.monotonic() - inicio
+            cache.set(chave, _entrada(valor, custo, segundos), segundos + obsoleto)
+            return valor
+        finally:
+            cache.delete(trava)
+
+    if entrada is not None:
+        return entrada[0]
+
+    limite = time.monotonic() + ESPERA_RECALCULO
+    while time.monotonic() < limite:
+        time.sleep(INTERVALO_ESPERA)
+        entrada = cache.get(chave)
+        if entrada is not None:
+            return entrada[0]
+    # Quem recalculava demorou demais (ou caiu): calcula sem guardar
+    return calcular()
+
+
+async def aobter(chave, acalcular, segundos, obsoleto=None, beta=BETA):
+    """Versão assíncrona de obter() (acalcular é uma corrotina)"""
+    obsoleto = OBSOLETO_SEGUNDOS if obsoleto is None else obsoleto
+    entrada = await cache.aget(chave)
+    if entrada is not None and _fresca(entrada, beta):
+        return entrada[0]
+
+    trava = _chave_trava(chave)
+    if await cache.aadd(trava, 1, TEMPO_TRAVA):
+        try:
+            recente = await cache.aget(chave)
+            if recente is not None and (entrada is None or recente[2] > entrada[2]):
+                return recente[0]
+            inicio = time.monotonic()
+            valor = await acalcular()
+            custo = time.monotonic() - inicio
+            await cache.aset(chave, _entrada(valor, custo, segundos), segundos + obsoleto)
+            return valor
+        finally:
+            await cache.adelete(trava)
+
+    if entrada is not None:
+        return entrada[0]
+
+    limite = time.monotonic() + ESPERA_RECALCULO
+    while time.monotonic() < limite:
+        await asyncio.sleep(INTERVALO_ESPERA)
+        entrada = await cache.aget(chave)
+        if entrada is not None:
+            return entrada[0]
+    return await acalcular()
@@ -0,0 +1,165 @@
+"""
+Sitemaps (índice + seções de até 50 mil URLs) - SQL PURO, em streaming
+
+/sitemap.xml é um índice; cada seção /sitemap-<n>.xml lista os posts com
+id em [n * URLS_POR_SECAO, (n + 1) * URLS_POR_SECAO). Como a seção de um
+post depende só do id, alterar um post afeta apenas a sua seção.
+
+- Seção: gerada lendo (slug, atualizado_em) por cursor do servidor
+  (exportacao.ler_em_lotes) e enviada ao cliente enquanto é lida; o XML
+  completo vai para o cache ao final
+- Cada seção tem um contador de versão no cache; invalidar_post(post_id)
+  incrementa só o da seção do post (em todos os processos, ver
+  invalidacao.py), e a próxima visita regenera apenas ela
+- Índice: MIN/MAX(id) (pontas da chave primária) + lastmod das seções já
+  geradas (get_many no cache); não percorre a tabela
+"""
+
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+
+from . import exportacao, invalidacao
+
+
+URLS_POR_SECAO = 50000
+CACHE_SECAO_SEGUNDOS = 60 * 60 * 24
+
+CABECALHO_URLSET = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+RODAPE_URLSET = '</urlset>\n'
+
+
+def secao_do_post(post_id):
+    return post_id // URLS_POR_SECAO
+
+
+def _chave_versao(secao):
+    return f'sitemap:versao:{secao}'
+
+
+def _chave_secao(secao, versao, base):
+    return f'sitemap:secao:{secao}:{versao}:{base}'
+
+
+def _versoes(secoes):
+    """{secao: versao} - seções nunca invalidadas estão na versão 0"""
+    chaves = {_chave_versao(secao): secao for secao in secoes}
+    encontradas = cache.get_many(list(chaves))
+    return {secao: encontradas.get(chave, 0) for chave, secao in chaves.items()}
+
+
+def _descartar(secoes):
+    """Nova versão das seções (None: todas as seções com posts)"""
+    if secoes is None:
+        secoes = intervalo_secoes()
+    for secao in secoes:
+        chave = _chave_versao(int(secao))
+        try:
+            cache.incr(chave)
+        except ValueError:
+            cache.add(chave, 1, None)
+
+
+invalidacao.registrar('sitemap', _descartar)
+
+
+def invalidar_post(post_id):
+    """Marca como desatualizada a seção que contém o post"""
+    invalidacao.publicar('sitemap', secao_do_post(post_id))
+
+
+def intervalo_secoes():
+    """
+    range() das seções com posts visíveis (vazio se não há posts)
+
+    SQL EXECUTADO:
+    SELECT MIN(id), MAX(id) FROM blog_post WHERE excluido_em IS NULL
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT MIN(id), MAX(id) FROM blog_post WHERE excluido_em IS NULL
+        """)
+        menor, maior = cursor.fetchone()
+    if menor is None:
+        return range(0)
+    return range(secao_do_post(menor), secao_do_post(maior) + 1)
+
+
+def gerar_indice(base):
+    """
+    XML do índice; lastmod vem das seções que já estão em cache
+
+    base: esquema + host (ex.: https://meublog.com.br), sem barra final
+    """
+    secoes = intervalo_secoes()
+    versoes = _versoes(secoes)
+    chaves = {_chave_secao(secao, versao, base): secao for secao, versao in versoes.items()}
+    em_cache = cache.get_many(list(chaves))
+    lastmod = {chaves[chave]: dados[1] for chave, dados in em_cache.items()}
+
+    partes = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    ]
+    for secao in secoes:
+        url = escape(base + reverse('sitemap_secao', args=[secao]))
+        partes.append(f'  <sitemap><loc>{url}</loc>')
+        if lastmod.get(secao):
+            partes.append(f'<lastmod>{lastmod[secao].isoformat()}</lastmod>')
+        partes.append('</sitemap>\n')
+    partes.append('</sitemapindex>\n')
+    return ''.join(partes)
+
+
+def secao_em_cache(secao, base):
+    """(xml, lastmod) da seção se estiver em cache e atualizada, senão None"""
+    versao = _versoes([secao])[secao]
+    return cache.get(_chave_secao(secao, versao, base))
+
+
+def gerar_secao(secao, base):
+    """
+    Gera o XML da seção em pedaços (para StreamingHttpResponse) e, ao
+    terminar, guarda o XML completo em cache
+
+    SQL EXECUTADO:
+    DECLARE cursor FOR SELECT slug, atualizado_em FROM blog_post
+    WHERE id >= %s AND id < %s AND excluido_em IS NULL ORDER BY id
+    (FETCH em lotes; intervalo da chave primária)
+    """
+    versao = _versoes([secao])[secao]
+    # reverse() uma vez só; o slug é encaixado no molde a cada linha
+    molde = escape(base + reverse('post_detail', args=['SLUG']))
+    inicio = secao * URLS_POR_SECAO
+
+    pedacos = [CABECALHO_URLSET]
+    lastmod = None
+    yield CABECALHO_URLSET
+
+    lotes = exportacao.ler_em_lotes("""
+        SELECT slug, atualizado_em
+        FROM blog_post
+        WHERE id >= %s AND id < %s AND excluido_em IS NULL
+        ORDER BY id
+    """, [inicio, inicio + URLS_POR_SECAO])
+
+    for linhas in lotes:
+        pedaco = ''.join(
+            f'  <url><loc>{molde.replace("SLUG", escape(slug))}</loc>'
+            f'<lastmod>{atualizado_em.isoformat()}</lastmod></url>\n'
+            for slug, atualizado_em in linhas
+        )
+        maior = max(atualizado_em for _, atualizado_em in linhas)
+        lastmod = maior if lastmod is None else max(lastmod, maior)
+        pedacos.append(pedaco)
+        yield pedaco
+
+    pedacos.append(RODAPE_URLSET)
+    yield RODAPE_URLSET
+
+    cache.set(_chave_secao(secao, versao, base), (''.join(pedacos), lastmod), CACHE_SECAO_SEGUNDOS)
@@ -0,0 +1,402 @@
+"""
+Tarefas em lote fora da requisição - SQL PURO
+
+Operações que alteram muitas linhas (ex.: excluir uma categoria com 200 mil
+posts, ou um post viral com 1 milhão de reações) não cabem numa requisição:
+um único UPDATE/DELETE segura o lock de todas as linhas até o fim e a
+requisição estoura o tempo limite.
+
+Aqui elas viram tarefas na tabela blog_tarefalote, executadas em lotes de
+TAMANHO_LOTE linhas, cada lote na sua própria transação curta, com o
+progresso gravado junto do lote:
+
+    BEGIN;
+    UPDATE blog_post SET categoria_id = destino
+    WHERE id IN (SELECT id ... WHERE categoria_id = origem ORDER BY id LIMIT 1000 FOR UPDATE);
+    UPDATE blog_tarefalote SET processados = processados + 1000 ...;
+    COMMIT;
+
+Quem executa:
+- Uma thread por processo web, disparada após o COMMIT de enfileirar()
+  (desligue com TAREFAS_EM_THREAD = False no settings)
+- python manage.py processar_tarefas (cron/systemd, e para retomar tarefas
+  interrompidas por reinício do servidor)
+
+A reserva usa FOR UPDATE SKIP LOCKED: vários executores nunca pegam a
+mesma tarefa. Os lotes são idempotentes (WHERE categoria_id = origem,
+WHERE post_id = ...), então uma tarefa interrompida pode ser retomada do
+início sem efeito duplicado.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import categorias, feeds, lista_posts, midia, sitemaps
+
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = getattr(settings, 'TAREFAS_TAMANHO_LOTE', 1000)
+
+# Respiro entre lotes para não monopolizar o banco
+PAUSA_ENTRE_LOTES = 0.05
+
+# Tarefa "executando" sem progresso há mais que isso é considerada parada
+MINUTOS_TAREFA_PARADA = 10
+
+# tipo -> função(tarefa_id, parametros)
+EXECUTORES = {}
+
+
+def executor(tipo):
+    """Decorador: registra a função que executa as tarefas de um tipo"""
+    def registrar(funcao):
+        EXECUTORES[tipo] = funcao
+        return funcao
+    return registrar
+
+
+def enfileirar(tipo, parametros, usuario_id=None, total=0):
+    """
+    Cria uma tarefa pendente e dispara o executor após o COMMIT
+
+    SQL EXECUTADO:
+    INSERT INTO blog_tarefalote (...) VALUES (...) RETURNING id
+    """
+    if tipo not in EXECUTORES:
+        raise ValueError(f'Tipo de tarefa desconhecido: {tipo}')
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO blog_tarefalote
+            (tipo, parametros, estado, total, processados, erro,
+             criado_por_id, criado_em, atualizado_em)
+            VALUES (%s, %s::jsonb, 'pendente', %s, 0, '', %s, NOW(), NOW())
+            RETURNING id
+        """, [tipo, json.dumps(parametros), total, usuario_id])
+        tarefa_id = cursor.fetchone()[0]
+
+    transaction.on_commit(disparar)
+    return tarefa_id
+
+
+def tarefa_ativa_categoria(categoria_id):
+    """
+    ID de tarefa pendente/executando que envolve a categoria, ou None
+
+    SQL EXECUTADO:
+    SELECT id FROM blog_tarefalote WHERE estado IN (...) AND parametros origem/destino
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id
+            FROM blog_tarefalote
+            WHERE estado IN ('pendente', 'executando')
+              AND (parametros->>'origem' = %s OR parametros->>'destino' = %s)
+            LIMIT 1
+        """, [str(categoria_id), str(categoria_id)])
+        linha = cursor.fetchone()
+    return linha[0] if linha else None
+
+
+def reservar_proxima():
+    """
+    Marca a próxima tarefa pendente como executando
+
+    Retorna (id, tipo, parametros) ou None
+
+    SQL EXECUTADO:
+    UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE blog_tarefalote
+            SET estado = 'executando', iniciado_em = NOW(), atualizado_em = NOW()
+            WHERE id = (
+                SELECT id FROM blog_tarefalote
+                WHERE estado = 'pendente'
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, tipo, parametros
+        """)
+        linha = cursor.fetchone()
+
+    if linha is None:
+        return None
+
+    tarefa_id, tipo, parametros = linha
+    if isinstance(parametros, str):
+        parametros = json.loads(parametros)
+    return tarefa_id, tipo, parametros
+
+
+def executar(tarefa_id, tipo, parametros):
+    """
+    Executa uma tarefa já reservada e grava o estado final
+
+    SQL EXECUTADO:
+    (lotes do executor) + UPDATE blog_tarefalote SET estado = 'concluida' | 'falhou'
+    """
+    try:
+        EXECUTORES[tipo](tarefa_id, parametros)
+    except Exception as e:
+        logger.exception('Tarefa %s (%s) falhou', tarefa_id, tipo)
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                UPDATE blog_tarefalote
+                SET estado = 'falhou', erro = %s, atualizado_em = NOW(), concluido_em = NOW()
+                WHERE id = %s
+            """, [str(e)[:2000], tarefa_id])
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE blog_tarefalote
+            SET estado = 'concluida', atualizado_em = NOW(), concluido_em = NOW()
+            WHERE id = %s
+        """, [tarefa_id])
+    return True
+
+
+def processar_pendentes():
+    """Executa tarefas pendentes até a fila esvaziar; retorna quantas executou"""
+    executadas = 0
+    while True:
+        tarefa = reservar_proxima()
+        if tarefa is None:
+            return executadas
+        executar(*tarefa)
+        executadas += 1
+
+
+def retomar_paradas(minutos=MINUTOS_TAREFA_PARADA):
+    """
+    Devolve à fila tarefas "executando" sem progresso (processo reiniciado)
+
+    SQL EXECUTADO:
+    UPDATE blog_tarefalote SET estado = 'pendente' WHERE estado = 'executando' AND atualizado_em < ...
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE blog_tarefalote
+            SET estado = 'pendente', atualizado_em = NOW()
+            WHERE estado = 'executando'
+              AND atualizado_em < NOW() - make_interval(mins => %s)
+        """, [minutos])
+        return cursor.rowcount
+
+
+# ----------------------------------------------------------------------
+# Executor em thread (um por processo)
+# ----------------------------------------------------------------------
+
+_trava = threading.Lock()
+_thread_ativa = False
+
+
+def disparar():
+    """Garante uma thread processando a fila neste processo"""
+    global _thread_ativa
+
+    if not getattr(settings, 'TAREFAS_EM_THREAD', True):
+        return
+
+    with _trava:
+        if _thread_ativa:
+            return
+        _thread_ativa = True
+
+    threading.Thread(target=_trabalhar, name='tarefas-lote', daemon=True).start()
+
+
+def _trabalhar():
+    global _thread_ativa
+    try:
+        while True:
+            tarefa = reservar_proxima()
+            if tarefa is None:
+                # Confere de novo segurando a trava: uma tarefa enfileirada
+                # agora encontra _thread_ativa = False e dispara outra thread
+                with _trava:
+                    tarefa = reservar_proxima()
+                    if tarefa is None:
+                        _thread_ativa = False
+                        return
+            executar(*tarefa)
+    except Exception:
+        logger.exception('Executor de tarefas em thread interrompido')
+        with _trava:
+            _thread_ativa = False
+    finally:
+        # Conexão própria da thread
+        connection.close()
+
+
+# ----------------------------------------------------------------------
+# Categorias
+# ----------------------------------------------------------------------
+
+def _mover_posts_em_lotes(tarefa_id, origem, destino):
+    """
+    Move os posts da categoria origem para destino (None = sem categoria)
+
+    SQL EXECUTADO (por lote, transação curta):
+    1. UPDATE blog_post ... WHERE id IN (SELECT ... LIMIT TAMANHO_LOTE FOR UPDATE)
+    2. UPDATE blog_tarefalote SET processados = processados + n
+    """
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE blog_post
+                    SET categoria_id = %s
+                    WHERE id IN (
+                        SELECT id FROM blog_post
+                        WHERE categoria_id = %s
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE
+                    )
+                """, [destino, origem, TAMANHO_LOTE])
+                movidos = cursor.rowcount
+
+                cursor.execute("""
+                    UPDATE blog_tarefalote
+                    SET processados = processados + %s, atualizado_em = NOW()
+                    WHERE id = %s
+                """, [movidos, tarefa_id])
+
+        if movidos == 0:
+            return
+        time.sleep(PAUSA_ENTRE_LOTES)
+
+
+def _remover_categoria(origem, destino):
+    """
+    Remove a categoria origem (posts que chegaram durante os lotes vão junto)
+
+    SQL EXECUTADO (uma transação):
+    1. UPDATE blog_post SET categoria_id = destino WHERE categoria_id = origem
+    2. DELETE FROM blog_categoria WHERE id = origem
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                UPDATE blog_post SET categoria_id = %s WHERE categoria_id = %s
+            """, [destino, origem])
+            cursor.execute("DELETE FROM blog_categoria WHERE id = %s", [origem])
+
+    categorias.invalidar_categorias()
+    feeds.invalidar_feeds()
+    lista_posts.invalidar_lista_posts()
+
+
+@executor('excluir_categoria')
+def excluir_categoria(tarefa_id, parametros):
+    """Posts da categoria ficam sem categoria; depois a categoria é excluída"""
+    _mover_posts_em_lotes(tarefa_id, parametros['origem'], None)
+    _remover_categoria(parametros['origem'], None)
+
+
+@executor('mesclar_categorias')
+def mesclar_categorias(tarefa_id, parametros):
+    """Posts de origem passam para destino; depois origem é excluída"""
+    _mover_posts_em_lotes(tarefa_id, parametros['origem'], parametros['destino'])
+    _remover_categoria(parametros['origem'], parametros['destino'])
+
+
+# ----------------------------------------------------------------------
+# Posts
+# ----------------------------------------------------------------------
+
+def _apagar_em_lotes(tarefa_id, tabela, post_id):
+    """
+    DELETE das linhas do post em lotes (tabela: blog_comentario ou blog_reacaousuariopost)
+
+    SQL EXECUTADO (por lote, transação curta):
+    1. DELETE FROM tabela WHERE id IN (SELECT id ... WHERE post_id = %s LIMIT TAMANHO_LOTE)
+    2. UPDATE blog_tarefalote SET processados = processados + n
+    """
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    DELETE FROM {tabela}
+                    WHERE id IN (
+                        SELECT id FROM {tabela}
+                        WHERE post_id = %s
+                        LIMIT %s
+                    )
+                """, [post_id, TAMANHO_LOTE])
+                apagados = cursor.rowcount
+
+                cursor.execute("""
+                    UPDATE blog_tarefalote
+                    SET processados = processados + %s, atualizado_em = NOW()
+                    WHERE id = %s
+                """, [apagados, tarefa_id])
+
+        if apagados < TAMANHO_LOTE:
+            return
+        time.sleep(PAUSA_ENTRE_LOTES)
+
+
+def apagar_post(post_id):
+    """
+    Remove de vez o post, seus comentários e reações numa única transação
+    e libera a imagem (usado direto para posts pequenos e no fim da tarefa)
+
+    SQL EXECUTADO (uma transação):
+    1. DELETE FROM blog_comentario WHERE post_id = %s
+    2. DELETE FROM blog_reacaousuariopost WHERE post_id = %s
+    3. DELETE FROM blog_atividadepost / blog_pontuacaopost / blog_visualizacoespost
+       WHERE post_id = %s
+    4. DELETE FROM blog_post WHERE id = %s RETURNING imagem
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM blog_comentario WHERE post_id = %s", [post_id])
+            cursor.execute("DELETE FROM blog_reacaousuariopost WHERE post_id = %s", [post_id])
+            cursor.execute("DELETE FROM blog_atividadepost WHERE post_id = %s", [post_id])
+            cursor.execute("DELETE FROM blog_pontuacaopost WHERE post_id = %s", [post_id])
+            cursor.execute("DELETE FROM blog_visualizacoespost WHERE post_id = %s", [post_id])
+            cursor.execute("DELETE FROM blog_post WHERE id = %s RETURNING imagem", [post_id])
+            linha = cursor.fetchone()
+
+        if linha:
+            midia.liberar_imagem(linha[0])
+
+    categorias.invalidar_categorias()
+    feeds.invalidar_feeds()
+    lista_posts.invalidar_lista_posts()
+    sitemaps.invalidar_post(post_id)
+
+
+@executor('excluir_post')
+def excluir_post(tarefa_id, parametros):
+    """
+    Post já marcado como excluído (excluido_em): apaga comentários e reações
+    em lotes e, por fim, o próprio post
+    """
+    post_id = parametros['post_id']
+
+    # Total exato para a barra de progresso (a view só contou até o limite)
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE blog_tarefalote
+            SET total = (SELECT COUNT(*) FROM blog_comentario WHERE post_id = %s)
+                      + (SELECT COUNT(*) FROM blog_reacaousuariopost WHERE post_id = %s),
+                processados = 0
+            WHERE id = %s
+        """, [post_id, post_id, tarefa_id])
+
+    _apagar_em_lotes(tarefa_id, 'blog_comentario', post_id)
+    _apagar_em_lotes(tarefa_id, 'blog_reacaousuariopost', post_id)
+    apagar_post(post_id)
@@ -0,0 +1,141 @@
+import base64
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from . import paginacao, revalidacao
+
+
+CACHES_TESTE = {
+    'default': {
+        'BACKEND': 'blog.cache_camadas.CacheEmCamadas',
+        'LOCATION': 'teste',
+        # LocMemCache: add atômico aqui porque o teste roda num processo só
+        'OPTIONS': {'COMPARTILHADO': 'compartilhado', 'ADD_ATOMICO': True},
+    },
+    'compartilhado': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'teste-compartilhado',
+    },
+}
+
+
+@override_settings(CACHES=CACHES_TESTE)
+class RevalidacaoTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_falhas_simultaneas_recalculam_uma_vez(self):
+        """100 requisições na mesma chave vazia: um cálculo, 100 respostas"""
+        total = 100
+        calculos = []
+        resultados = []
+        trava = threading.Lock()
+        largada = threading.Barrier(total)
+
+        def calcular():
+            with trava:
+                calculos.append(1)
+            time.sleep(0.2)  # consulta pesada
+            return 'recalculado'
+
+        def requisicao():
+            largada.wait()
+            valor = revalidacao.obter('teste:estouro', calcular, 60)
+            with trava:
+                resultados.append(valor)
+
+        threads = [threading.Thread(target=requisicao) for _ in range(total)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calculos), 1)
+        self.assertEqual(resultados, ['recalculado'] * total)
+
+    def test_valor_obsoleto_servido_durante_recalculo(self):
+        revalidacao.obter('teste:obsoleto', lambda: 'antigo', 0)
+        cache.add('teste:obsoleto:recalculando', 1, 30)
+
+        valor = revalidacao.obter('teste:obsoleto', lambda: 'novo', 60)
+
+        self.assertEqual(valor, 'antigo')
+
+
+class CacheEmCamadasTests(SimpleTestCase):
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'blog.cache_camadas.CacheEmCamadas',
+            'LOCATION': 'teste-arquivo',
+        },
+        'compartilhado': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tempfile.gettempdir(),
+        },
+    })
+    def test_exige_add_atomico_fora_do_debug(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache.add('teste:trava', 1)
+        # Leitura/escrita não dependem da trava
+        self.assertIsNone(cache.get('teste:trava'))
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'blog.cache_camadas.CacheEmCamadas',
+            'LOCATION': 'teste-locmem',
+        },
+        'compartilhado': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'teste-locmem-compartilhado',
+        },
+    })
+    def test_locmem_nao_conta_como_add_atomico(self):
+        with self.assertRaises(ImproperlyConfigured):
+            cache.add('teste:trava', 1)
+
+
+class CursorTests(SimpleTestCase):
+    """Cursor de paginação adulterado é ignorado (não chega ao banco)"""
+
+    ordenacao = paginacao.Ordenacao(['p.criado_em', 'p.id'], [datetime, int], descendente=True)
+
+    def cursor(self, valores):
+        texto = json.dumps(valores)
+        return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+    def test_ida_e_volta(self):
+        chave = [datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc), 42]
+        pagina = paginacao.PaginaKeyset(self.ordenacao, {'depois': paginacao.codificar_cursor(chave)})
+        self.assertEqual(pagina.condicao(), ('(p.criado_em, p.id) < (%s, %s)', chave))
+
+    def test_valores_de_tipo_errado_sao_ignorados(self):
+        invalidos = [
+            [{'dt': '2026-10-19T12:00:00'}, 'abc'],
+            [{'dt': '2026-10-19T12:00:00'}, [1]],
+            [{'dt': '2026-10-19T12:00:00'}, True],
+            [{'dt': '2026-10-19T12:00:00'}, 2 ** 63],
+            ['2026-10-19T12:00:00', 1],
+            [{'x': 1}, 1],
+            [{'dt': 5}, 1],
+            [{'dt': 'ontem'}, 1],
+            {'dt': '2026-10-19T12:00:00'},
+            [{'dt': '2026-10-19T12:00:00'}],
+        ]
+        for valores in invalidos:
+            with self.subTest(valores=valores):
+                pagina = paginacao.PaginaKeyset(self.ordenacao, {'depois': self.cursor(valores)})
+                self.assertEqual(pagina.condicao(), ('', []))
+
+    def test_texto_com_nul_e_ignorado(self):
+        ordenacao = paginacao.Ordenacao(['u.username'], [str])
+        self.assertIsNone(paginacao.decodificar_cursor(self.cursor(['a\x00b']), ordenacao.tipos))
+        self.assertEqual(paginacao.decodificar_cursor(self.cursor(['ana']), ordenacao.tipos), ['ana'])
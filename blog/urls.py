@@ -1,16 +1,42 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views, views_async
+
+# ASGI: versões async def do caminho de leitura (ver views_async.py)
+leitura = views_async if settings.VIEWS_ASYNC else views
 
 urlpatterns = [
     # Posts
-    path('', views.post_list, name='post_list'),
+    path('', leitura.post_list, name='post_list'),
     path('post/novo/', views.post_create, name='post_create'),
-    path('post/<slug:slug>/', views.post_detail, name='post_detail'),
+    path('post/<slug:slug>/', leitura.post_detail, name='post_detail'),
     path('post/<slug:slug>/editar/', views.post_edit, name='post_edit'),
     path('post/<slug:slug>/excluir/', views.post_delete, name='post_delete'),
     
+    # Parte por usuário de post_detail (a página em si é a casca pública em cache)
+    path('post/<slug:slug>/personalizacao/', leitura.post_personalizacao, name='post_personalizacao'),
+    
     # Reações (curtidas)
-    path('post/<slug:slug>/curtir/', views.toggle_reacao, name='toggle_reacao'),
+    path('post/<slug:slug>/curtir/', leitura.toggle_reacao, name='toggle_reacao'),
+    
+    # Reações/comentários ao vivo (Server-Sent Events, só sob ASGI)
+    path('post/<slug:slug>/eventos/', views_async.eventos_post, name='eventos_post'),
+    
+    # Feeds RSS/Atom (em cache, com ETag/Last-Modified)
+    path('feed/', views.feed_posts, name='feed_posts'),
+    path('feed/atom/', views.feed_posts, {'formato': 'atom'}, name='feed_posts_atom'),
+    path('feed/categoria/<int:categoria_id>/', views.feed_posts, name='feed_categoria'),
+    path('feed/categoria/<int:categoria_id>/atom/', views.feed_posts, {'formato': 'atom'}, name='feed_categoria_atom'),
+    
+    # Sitemaps (índice + seções de 50 mil URLs, em cache por seção)
+    path('sitemap.xml', views.sitemap_indice, name='sitemap_indice'),
+    path('sitemap-<int:secao>.xml', views.sitemap_secao, name='sitemap_secao'),
+    
+    # API JSON somente leitura (v1)
+    path('api/v1/posts/', api.posts, name='api_posts'),
+    path('api/v1/posts/<slug:slug>/', api.post, name='api_post'),
+    path('api/v1/posts/<slug:slug>/comentarios/', api.comentarios, name='api_comentarios'),
+    path('api/v1/ranking/', api.ranking_posts, name='api_ranking'),
     
     # Comentários
     path('comentario/<int:comentario_id>/editar/', views.editar_comentario, name='editar_comentario'),
@@ -26,12 +52,20 @@ urlpatterns = [
     path('gerenciar/categorias/criar/', views.admin_categoria_criar, name='admin_categoria_criar'),
     path('gerenciar/categorias/<int:categoria_id>/editar/', views.admin_categoria_editar, name='admin_categoria_editar'),
     path('gerenciar/categorias/<int:categoria_id>/excluir/', views.admin_categoria_excluir, name='admin_categoria_excluir'),
+    path('gerenciar/categorias/<int:categoria_id>/mesclar/', views.admin_categoria_mesclar, name='admin_categoria_mesclar'),
+    
+    # Tarefas em lote (progresso)
+    path('gerenciar/tarefas/', views.admin_tarefas, name='admin_tarefas'),
     
     # Posts (listagem para admin)
     path('gerenciar/posts/', views.admin_posts, name='admin_posts'),
     
     # Usuários (listagem para admin)
     path('gerenciar/usuarios/', views.admin_usuarios, name='admin_usuarios'),
+    path('gerenciar/usuarios/em-massa/', views.admin_usuarios_em_massa, name='admin_usuarios_em_massa'),
+    
+    # Exportação CSV/JSONL (usuarios, posts, comentarios, reacoes)
+    path('gerenciar/exportar/<str:tipo>/', views.admin_exportar, name='admin_exportar'),
     
     # Gestão de usuários
     path('usuario/<int:usuario_id>/desativar/', views.desativar_usuario, name='desativar_usuario'),
@@ -1,139 +1,91 @@
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
-from django.db import connection
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode
 from .forms import PostForm, CustomUserCreationForm, ComentarioForm
+from . import (
+    cache_camadas, categorias, db, estatisticas, eventos, exportacao, feeds, invalidacao,
+    lista_posts, midia, paginacao, ranking, renderizacao, revalidacao, sitemaps, tarefas,
+    visualizacoes,
+)
+
+
+# Tipo do perfil no LRU local do processo (usuario_e_admin)
+CACHE_PERFIL_SEGUNDOS = 300
+# Cache negativo de post_detail: slug inexistente não volta ao banco
+CACHE_POST_AUSENTE_SEGUNDOS = 60
+
+
+def chave_post_ausente(slug):
+    return f'post:ausente:{slug}'
+
+
+# Fragmento da lista de comentários (chave versionada, ver html_comentarios)
+CACHE_COMENTARIOS_SEGUNDOS = 60 * 60
+# Mesmo limite de ComentarioForm (e da coluna): também mantém o evento de
+# novo comentário abaixo do limite de 8000 bytes do pg_notify (eventos.py)
+TAMANHO_MAXIMO_COMENTARIO = ComentarioForm.base_fields['conteudo'].max_length
+
+# blog_post.slug: VARCHAR(50) (SlugField padrão)
+TAMANHO_MAXIMO_SLUG = 50
+
+# Casca pública de post_detail (ver casca_post): contagens de reações podem
+# atrasar até aqui na primeira carga (as abas abertas recebem por SSE)
+CACHE_CASCA_SEGUNDOS = 30
 
 
 def usuario_e_admin(user):
     """
     Verifica se usuário é admin usando SQL puro
     
-    SQL EXECUTADO:
+    O tipo do perfil fica no LRU local do processo (grupo 'perfis'); quem
+    altera perfis publica a invalidação (ver invalidacao.py).
+    
+    SQL EXECUTADO (apenas fora do cache):
     SELECT tipo_usuario FROM blog_perfilusuario WHERE usuario_id = %s
     """
     if not user.is_authenticated:
         return False
     
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT tipo_usuario 
-            FROM blog_perfilusuario 
-            WHERE usuario_id = %s
-        """, [user.id])
-        
-        resultado = cursor.fetchone()
-        return resultado and resultado[0] == 'admin'
+    def buscar():
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT tipo_usuario 
+                FROM blog_perfilusuario 
+                WHERE usuario_id = %s
+            """, [user.id])
+            
+            resultado = cursor.fetchone()
+            return resultado[0] if resultado else None
+    
+    tipo = invalidacao.cache_local.obter('perfis', user.id, buscar, CACHE_PERFIL_SEGUNDOS)
+    return tipo == 'admin'
 
 
-def post_list(request):
+def contexto_post_list(posts, lista_categorias, categoria_selecionada, total_posts, ranking_posts,
+                       pagina=None):
     """
-    Lista posts com filtro opcional por categoria
+    Formata as linhas de post_list para o template (objetos mock)
     
-    SQL EXECUTADO:
-    1. SELECT posts (com/sem filtro de categoria)
-    2. SELECT categorias com contagem de posts
-    3. COUNT total de posts
+    ranking_posts: listas "Em alta", "Mais comentados" e "Mais vistos"
+    (ranking.ranking_posts)
+    pagina: PaginaKeyset da página exibida (links anterior/próxima)
+
+    Compartilhado com views_async.post_list.
     """
-    categoria_id = request.GET.get('categoria', None)
-    categoria_selecionada = None
-    
-    with connection.cursor() as cursor:
-        # Query para posts
-        if categoria_id:
-            try:
-                categoria_id = int(categoria_id)
-                
-                # SQL: Buscar posts filtrados por categoria
-                cursor.execute("""
-                    SELECT p.id, p.titulo, p.slug, p.conteudo, p.imagem, 
-                           p.criado_em, p.atualizado_em, p.categoria_id,
-                           u.id as autor_id, u.username as autor_username,
-                           c.nome as categoria_nome,
-                           (SELECT COUNT(*) FROM blog_comentario WHERE post_id = p.id) as total_comentarios,
-                           (SELECT COUNT(*) FROM blog_reacaousuariopost WHERE post_id = p.id) as total_reacoes
-                    FROM blog_post p
-                    INNER JOIN auth_user u ON p.autor_id = u.id
-                    LEFT JOIN blog_categoria c ON p.categoria_id = c.id
-                    WHERE p.categoria_id = %s
-                    ORDER BY p.criado_em DESC
-                """, [categoria_id])
-                
-                posts = cursor.fetchall()
-                
-                # SQL: Buscar nome da categoria selecionada
-                cursor.execute("""
-                    SELECT id, nome 
-                    FROM blog_categoria 
-                    WHERE id = %s
-                """, [categoria_id])
-                
-                cat_data = cursor.fetchone()
-                if cat_data:
-                    categoria_selecionada = {'id': cat_data[0], 'nome': cat_data[1]}
-                
-            except (ValueError, TypeError):
-                categoria_id = None
-                # SQL: Buscar todos os posts
-                cursor.execute("""
-                    SELECT p.id, p.titulo, p.slug, p.conteudo, p.imagem, 
-                           p.criado_em, p.atualizado_em, p.categoria_id,
-                           u.id as autor_id, u.username as autor_username,
-                           c.nome as categoria_nome,
-                           (SELECT COUNT(*) FROM blog_comentario WHERE post_id = p.id) as total_comentarios,
-                           (SELECT COUNT(*) FROM blog_reacaousuariopost WHERE post_id = p.id) as total_reacoes
-                    FROM blog_post p
-                    INNER JOIN auth_user u ON p.autor_id = u.id
-                    LEFT JOIN blog_categoria c ON p.categoria_id = c.id
-                    ORDER BY p.criado_em DESC
-                """)
-                
-                posts = cursor.fetchall()
-        else:
-            # SQL: Buscar todos os posts
-            cursor.execute("""
-                SELECT p.id, p.titulo, p.slug, p.conteudo, p.imagem, 
-                       p.criado_em, p.atualizado_em, p.categoria_id,
-                       u.id as autor_id, u.username as autor_username,
-                       c.nome as categoria_nome,
-                       (SELECT COUNT(*) FROM blog_comentario WHERE post_id = p.id) as total_comentarios,
-                       (SELECT COUNT(*) FROM blog_reacaousuariopost WHERE post_id = p.id) as total_reacoes
-                FROM blog_post p
-                INNER JOIN auth_user u ON p.autor_id = u.id
-                LEFT JOIN blog_categoria c ON p.categoria_id = c.id
-                ORDER BY p.criado_em DESC
-            """)
-            
-            posts = cursor.fetchall()
-        
-        # SQL: Buscar categorias com contagem
-        cursor.execute("""
-            SELECT c.id, c.nome, COUNT(p.id) as total_posts
-            FROM blog_categoria c
-            LEFT JOIN blog_post p ON c.id = p.categoria_id
-            GROUP BY c.id, c.nome
-            ORDER BY c.nome
-        """)
-        
-        categorias = cursor.fetchall()
-        
-        # SQL: Total de posts
-        if categoria_selecionada:
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM blog_post 
-                WHERE categoria_id = %s
-            """, [categoria_id])
-        else:
-            cursor.execute("SELECT COUNT(*) FROM blog_post")
-        
-        total_posts = cursor.fetchone()[0]
-    
-    # Formatar dados para o template
     posts_list = []
     for post in posts:
         # Criar objeto mock para o autor
@@ -189,53 +141,124 @@ def post_list(request):
         })
     
     categorias_list = []
-    for cat in categorias:
+    for cat in lista_categorias:
         categorias_list.append({
             'id': cat[0],
             'nome': cat[1],
             'total_posts': cat[2]
         })
     
-    return render(request, 'blog/post_list.html', {
+    return {
         'posts': posts_list,
         'categorias': categorias_list,
         'categoria_selecionada': categoria_selecionada,
-        'total_posts': total_posts
-    })
+        'total_posts': total_posts,
+        'pagina': pagina,
+        'em_alta': ranking_posts['em_alta'],
+        'mais_comentados': ranking_posts['mais_comentados'],
+        # .get: ranking em cache gravado antes de existir "Mais vistos"
+        'mais_vistos': ranking_posts.get('mais_vistos', []),
+    }
 
 
-def post_detail(request, slug):
+
+def post_list(request):
     """
-    Exibe post com comentários e permite comentar
+    Lista posts com filtro opcional por categoria
     
-    SQL EXECUTADO:
-    1. SELECT post por slug
-    2. SELECT comentários do post
-    3. SELECT reação do usuário (se autenticado)
-    4. SELECT contagem de reações por tipo
-    5. INSERT comentário (se POST)
+    Posts, total, categorias e rankings vêm do cache com revalidação: ao
+    vencer, uma única requisição refaz as consultas e as demais servem a
+    lista anterior (ver lista_posts.py, ranking.py e revalidacao.py)
+    
+    SQL EXECUTADO (apenas no recálculo do cache):
+    1. SELECT primeira página de posts (com/sem filtro de categoria)
+    2. SELECT categorias com contagem de posts
+    3. COUNT total de posts
+    4. SELECT nome da categoria selecionada (se houver filtro)
+    5. Consolidar baldes + SELECT top N "Em alta", "Mais comentados" e
+       "Mais vistos"
+    Páginas seguintes (?depois= / ?antes=): SELECT da página pelo cursor,
+    sem cache (ver lista_posts.py)
     """
-    with connection.cursor() as cursor:
-        # SQL: Buscar post por slug
-        cursor.execute("""
-            SELECT p.id, p.titulo, p.slug, p.conteudo, p.imagem, 
-                   p.criado_em, p.atualizado_em, p.categoria_id,
-                   u.id as autor_id, u.username as autor_username,
-                   c.nome as categoria_nome
-            FROM blog_post p
-            INNER JOIN auth_user u ON p.autor_id = u.id
-            LEFT JOIN blog_categoria c ON p.categoria_id = c.id
-            WHERE p.slug = %s
-        """, [slug])
-        
-        post_data = cursor.fetchone()
-        
-        if not post_data:
-            messages.error(request, 'Post não encontrado.')
-            return redirect('post_list')
-        
-        # Criar objetos mock para o template
-        class AutorMock:
+    try:
+        categoria_id = int(request.GET.get('categoria', ''))
+    except ValueError:
+        categoria_id = None
+    
+    posts, categoria_selecionada, total_posts, pagina = lista_posts.lista_posts(
+        categoria_id, request.GET,
+    )
+    lista_categorias = categorias.categorias_com_contagem()
+    
+    # Formatar dados para o template
+    return render(request, 'blog/post_list.html', contexto_post_list(
+        posts, lista_categorias, categoria_selecionada, total_posts, ranking.ranking_posts(),
+        pagina,
+    ))
+
+
+def formatar_post_detalhe(post_data):
+    """
+    Linha do post (SELECT de post_detail) -> dict para o template
+
+    Compartilhado com views_async.post_detail. conteudo_html vem pronto do
+    banco; se foi gerado por versão antiga do renderizador, é renderizado
+    aqui e html_desatualizado=True avisa a view para gravá-lo.
+    """
+    # Criar objetos mock para o template
+    class AutorMock:
+        def __init__(self, user_id, username):
+            self.id = user_id
+            self.username = username
+        def __str__(self):
+            return self.username
+        def __eq__(self, other):
+            if hasattr(other, 'id'):
+                return self.id == other.id
+            return False
+    
+    class CategoriaMock:
+        def __init__(self, nome):
+            self.nome = nome
+        def __str__(self):
+            return self.nome if self.nome else ""
+    
+    class ImagemMock:
+        def __init__(self, url):
+            # Adicionar prefixo /media/ se não existir
+            if url and not url.startswith('/media/') and not url.startswith('http'):
+                self.url = f'/media/{url}'
+            else:
+                self.url = url if url else ''
+    
+    conteudo_html, html_desatualizado = renderizacao.html_atual(
+        post_data[3], post_data[11], post_data[12],
+    )
+    
+    return {
+        'id': post_data[0],
+        'titulo': post_data[1],
+        'slug': post_data[2],
+        'conteudo': post_data[3],
+        'imagem': ImagemMock(post_data[4]) if post_data[4] else None,
+        'criado_em': post_data[5],
+        'atualizado_em': post_data[6],
+        'categoria': CategoriaMock(post_data[10]) if post_data[10] else None,
+        'autor': AutorMock(post_data[8], post_data[9]),
+        # HTML gerado por renderizacao.renderizar (texto escapado): seguro
+        'conteudo_html': mark_safe(conteudo_html),
+        'html_desatualizado': html_desatualizado,
+        'total_comentarios': post_data[13],
+        'versao_comentarios': post_data[14],
+    }
+
+
+def formatar_comentarios(comentarios_data):
+    """Linhas de comentários de post_detail -> lista para o template"""
+    comentarios = []
+    for com in comentarios_data:
+        # Criar objeto mock para autor do comentário
+        class ComentarioAutorMock:
             def __init__(self, user_id, username):
                 self.id = user_id
                 self.username = username
@@ -246,133 +269,297 @@ def post_detail(request, slug):
                     return self.id == other.id
                 return False
         
-        class CategoriaMock:
-            def __init__(self, nome):
-                self.nome = nome
-            def __str__(self):
-                return self.nome if self.nome else ""
-        
-        class ImagemMock:
-            def __init__(self, url):
-                # Adicionar prefixo /media/ se não existir
-                if url and not url.startswith('/media/') and not url.startswith('http'):
-                    self.url = f'/media/{url}'
-                else:
-                    self.url = url if url else ''
-        
-        post = {
-            'id': post_data[0],
-            'titulo': post_data[1],
-            'slug': post_data[2],
-            'conteudo': post_data[3],
-            'imagem': ImagemMock(post_data[4]) if post_data[4] else None,
-            'criado_em': post_data[5],
-            'atualizado_em': post_data[6],
-            'categoria': CategoriaMock(post_data[10]) if post_data[10] else None,
-            'autor': AutorMock(post_data[8], post_data[9])
-        }
-        
-        # SQL: Buscar comentários do post
-        cursor.execute("""
-            SELECT c.id, c.conteudo, c.criado_em, c.atualizado_em,
-                   u.id as autor_id, u.username as autor_username
-            FROM blog_comentario c
-            INNER JOIN auth_user u ON c.autor_id = u.id
-            WHERE c.post_id = %s
-            ORDER BY c.criado_em DESC
-        """, [post['id']])
-        
-        comentarios_data = cursor.fetchall()
-        comentarios = []
-        for com in comentarios_data:
-            # Criar objeto mock para autor do comentário
-            class ComentarioAutorMock:
-                def __init__(self, user_id, username):
-                    self.id = user_id
-                    self.username = username
-                def __str__(self):
-                    return self.username
-                def __eq__(self, other):
-                    if hasattr(other, 'id'):
-                        return self.id == other.id
-                    return False
-            
-            comentarios.append({
-                'id': com[0],
-                'conteudo': com[1],
-                'criado_em': com[2],
-                'atualizado_em': com[3],
-                'autor': ComentarioAutorMock(com[4], com[5])
-            })
-        
-        # Criar wrapper para lista de comentários com método count()
-        class ComentariosListMock(list):
-            def count(self):
-                return len(self)
-        
-        comentarios = ComentariosListMock(comentarios)
-        
-        # SQL: Verificar reação do usuário (se autenticado)
-        reacao_usuario = None
-        if request.user.is_authenticated:
-            cursor.execute("""
-                SELECT id, tipo_reacao
-                FROM blog_reacaousuariopost
-                WHERE usuario_id = %s AND post_id = %s
-            """, [request.user.id, post['id']])
-            
-            reacao_data = cursor.fetchone()
-            if reacao_data:
-                reacao_usuario = {
-                    'id': reacao_data[0],
-                    'tipo_reacao': reacao_data[1]
-                }
+        comentarios.append({
+            'id': com[0],
+            'conteudo': com[1],
+            'criado_em': com[2],
+            'atualizado_em': com[3],
+            'autor': ComentarioAutorMock(com[4], com[5])
+        })
+    
+    # Criar wrapper para lista de comentários com método count()
+    class ComentariosListMock(list):
+        def count(self):
+            return len(self)
+    
+    return ComentariosListMock(comentarios)
+
+
+SQL_COMENTARIOS_POST = """
+    SELECT c.id, c.conteudo, c.criado_em, c.atualizado_em,
+           u.id as autor_id, u.username as autor_username
+    FROM blog_comentario c
+    INNER JOIN auth_user u ON c.autor_id = u.id
+    WHERE c.post_id = %s
+    ORDER BY c.criado_em DESC
+"""
+
+
+def chave_comentarios(post_id, versao):
+    return f'comentarios:html:{post_id}:{versao}'
+
+
+def renderizar_comentarios(comentarios_data):
+    """Linhas de comentários -> HTML do fragmento (igual para todos os visitantes)"""
+    return render_to_string('blog/comentarios_lista.html', {
+        'comentarios': formatar_comentarios(comentarios_data),
+    })
+
+
+def html_comentarios(cursor, post_id, versao):
+    """
+    Fragmento da lista de comentários do post (em cache por versão)
+
+    A chave leva blog_post.versao_comentarios, incrementada na mesma
+    transação de cada INSERT/UPDATE/DELETE de comentário: nada a invalidar.
+
+    SQL EXECUTADO (apenas fora do cache):
+    SELECT comentários do post
+    """
+    def calcular():
+        cursor.execute(SQL_COMENTARIOS_POST, [post_id])
+        return renderizar_comentarios(cursor.fetchall())
+
+    html = revalidacao.obter(chave_comentarios(post_id, versao), calcular, CACHE_COMENTARIOS_SEGUNDOS)
+    # Gerado pelo template (conteúdo escapado): seguro
+    return mark_safe(html)
+
+
+SQL_POST_DETALHE = """
+    SELECT p.id, p.titulo, p.slug, p.conteudo, p.imagem, 
+           p.criado_em, p.atualizado_em, p.categoria_id,
+           u.id as autor_id, u.username as autor_username,
+           c.nome as categoria_nome,
+           p.conteudo_html, p.versao_html,
+           p.total_comentarios, p.versao_comentarios
+    FROM blog_post p
+    INNER JOIN auth_user u ON p.autor_id = u.id
+    LEFT JOIN blog_categoria c ON p.categoria_id = c.id
+    WHERE p.slug = %s AND p.excluido_em IS NULL
+"""
+
+SQL_REACOES_POST = """
+    SELECT tipo_reacao, COUNT(*) as total
+    FROM blog_reacaousuariopost
+    WHERE post_id = %s
+    GROUP BY tipo_reacao
+"""
+
+SQL_PERSONALIZACAO_POST = """
+    SELECT p.id, p.autor_id,
+           (SELECT tipo_reacao FROM blog_reacaousuariopost
+            WHERE usuario_id = %s AND post_id = p.id) as reacao,
+           ARRAY(SELECT id FROM blog_comentario
+                 WHERE post_id = p.id AND autor_id = %s) as comentarios_proprios
+    FROM blog_post p
+    WHERE p.slug = %s AND p.excluido_em IS NULL
+"""
+
+
+def chave_casca(post):
+    """
+    Chave da casca: muda quando o post é editado (atualizado_em) ou quando
+    um comentário é criado/editado/excluído (versao_comentarios)
+    """
+    atualizado = post['atualizado_em'].timestamp() if post['atualizado_em'] else 0
+    return f"post:casca:{post['id']}:{atualizado}:{post['versao_comentarios']}"
+
+
+def renderizar_casca(post, reacoes_contagem, comentarios_html):
+    """Post + contagens + comentários -> HTML da casca (igual para todos os visitantes)"""
+    reacoes_dict = {r[0]: r[1] for r in reacoes_contagem}
+    return render_to_string('blog/post_detail_casca.html', {
+        'post': post,
+        'comentarios_html': comentarios_html,
+        'reacoes_dict': reacoes_dict,
+        'total_reacoes': sum(reacoes_dict.values()),
+    })
+
+
+def casca_post(cursor, post):
+    """
+    Casca pública de post_detail (em cache por CACHE_CASCA_SEGUNDOS)
+
+    Visitantes logados e anônimos recebem o mesmo HTML: o que depende do
+    usuário fica de fora e vem de post_personalizacao.
+
+    SQL EXECUTADO (apenas fora do cache):
+    1. SELECT contagem de reações por tipo (primário: o valor fica em cache)
+    2. SELECT comentários do post (só se o fragmento não está em cache)
+    """
+    def calcular():
+        with connection.cursor() as cursor_primario:
+            cursor_primario.execute(SQL_REACOES_POST, [post['id']])
+            reacoes_contagem = cursor_primario.fetchall()
+        comentarios_html = html_comentarios(cursor, post['id'], post['versao_comentarios'])
+        return renderizar_casca(post, reacoes_contagem, comentarios_html)
+
+    html = revalidacao.obter(chave_casca(post), calcular, CACHE_CASCA_SEGUNDOS)
+    # Gerado pelo template (conteúdo escapado): seguro
+    return mark_safe(html)
+
+
+def formatar_personalizacao(user, linha):
+    """
+    Linha de SQL_PERSONALIZACAO_POST -> JSON de post_personalizacao
+
+    Compartilhado com views_async.post_personalizacao. Editar/excluir o
+    post: autor ou admin (as mesmas regras de post_edit/post_delete).
+    """
+    post_id, autor_id, reacao, comentarios_proprios = linha
+    admin = bool(usuario_e_admin(user))
+    autor = user.id == autor_id
+    return {
+        'autenticado': True,
+        'usuario': user.id,
+        'admin': admin,
+        'reacao': reacao,
+        'pode_editar': autor or admin,
+        'pode_excluir': autor or admin,
+        'comentarios_proprios': list(comentarios_proprios),
+    }
+
+
+def resposta_personalizacao(dados, status=200):
+    """JSON por usuário: nunca guardado por caches HTTP"""
+    response = JsonResponse(dados, status=status)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+def post_personalizacao(request, slug):
+    """
+    Parte por usuário de post_detail (JSON), lida pelo JS da casca pública
+    
+    Retorna a reação do visitante, se pode editar/excluir o post e os ids
+    dos seus comentários no post. Anônimo: {'autenticado': false}, sem SQL.
+    
+    SQL EXECUTADO:
+    SELECT post por slug + reação do usuário + ids dos comentários dele
+    (um único comando)
+    """
+    if not request.user.is_authenticated:
+        return resposta_personalizacao({'autenticado': False})
+    
+    with db.cursor_leitura() as cursor:
+        cursor.execute(SQL_PERSONALIZACAO_POST, [request.user.id, request.user.id, slug])
+        linha = cursor.fetchone()
+    
+    if linha is None:
+        return resposta_personalizacao({'erro': 'Post não encontrado.'}, status=404)
+    
+    return resposta_personalizacao(formatar_personalizacao(request.user, linha))
+
+
+def post_detail(request, slug):
+    """
+    Exibe post com comentários e permite comentar
+    
+    A página é a casca pública em cache (casca_post) - a mesma para
+    visitantes logados e anônimos - mais o cabeçalho de base.html. Reação
+    do usuário e botões de editar/excluir vêm de post_personalizacao.
+    
+    SQL EXECUTADO:
+    1. SELECT post por slug (cache negativo: slug inexistente responde sem
+       consultar por CACHE_POST_AUSENTE_SEGUNDOS)
+    2. UPDATE conteudo_html (só se gerado por versão antiga do renderizador)
+    3. INSERT comentário + UPDATE blog_post.total_comentarios (se POST)
+    4. UPSERT balde de atividade do post (se POST, ver ranking.py)
+    5. SELECT pg_notify (novo comentário para as abas abertas no post)
+    6. SELECT contagem de reações e comentários (só se a casca não está
+       em cache, ver casca_post)
+    """
+    # Leituras na réplica; no POST (novo comentário) db.alias_leitura() é o primário
+    with db.cursor_leitura() as cursor:
+        def buscar_post():
+            # SQL: Buscar post por slug
+            cursor.execute(SQL_POST_DETALHE, [slug])
+            linha = cursor.fetchone()
+            if linha is None and db.alias_leitura() != 'default':
+                # Réplica atrasada não pode gravar "inexistente" de um post
+                # recém-criado: a ausência é confirmada no primário
+                with connection.cursor() as cursor_primario:
+                    cursor_primario.execute(SQL_POST_DETALHE, [slug])
+                    linha = cursor_primario.fetchone()
+            return linha
         
-        # SQL: Contar reações por tipo
-        cursor.execute("""
-            SELECT tipo_reacao, COUNT(*) as total
-            FROM blog_reacaousuariopost
-            WHERE post_id = %s
-            GROUP BY tipo_reacao
-        """, [post['id']])
+        post_data = cache_camadas.consultar_com_negativo(
+            chave_post_ausente(slug), buscar_post, CACHE_POST_AUSENTE_SEGUNDOS,
+        )
         
-        reacoes_contagem = cursor.fetchall()
-        reacoes_dict = {r[0]: r[1] for r in reacoes_contagem}
+        if not post_data:
+            messages.error(request, 'Post não encontrado.')
+            return redirect('post_list')
         
-        # SQL: Total de reações
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM blog_reacaousuariopost
-            WHERE post_id = %s
-        """, [post['id']])
+        post = formatar_post_detalhe(post_data)
         
-        total_reacoes = cursor.fetchone()[0]
+        # SQL: HTML de versão antiga do renderizador -> grava o renderizado agora
+        if post['html_desatualizado']:
+            renderizacao.gravar({post['id']: post['conteudo_html']})
         
         # Processar novo comentário (POST)
         if request.method == 'POST' and request.user.is_authenticated:
             conteudo = request.POST.get('conteudo', '').strip()
-            if conteudo:
+            if not conteudo:
+                messages.error(request, 'O comentário não pode estar vazio.')
+            elif len(conteudo) > TAMANHO_MAXIMO_COMENTARIO:
+                messages.error(
+                    request,
+                    f'O comentário deve ter no máximo {TAMANHO_MAXIMO_COMENTARIO} caracteres.',
+                )
+            else:
                 try:
-                    # SQL: Inserir novo comentário
-                    cursor.execute("""
-                        INSERT INTO blog_comentario 
-                        (post_id, autor_id, conteudo, criado_em, atualizado_em)
-                        VALUES (%s, %s, %s, NOW(), NOW())
-                    """, [post['id'], request.user.id, conteudo])
+                    # Comentário, balde do ranking e evento na mesma transação:
+                    # se o NOTIFY falhar, o comentário não fica gravado
+                    with transaction.atomic():
+                        # SQL: Inserir novo comentário e incrementar o contador do post
+                        cursor.execute("""
+                            WITH novo AS (
+                                INSERT INTO blog_comentario 
+                                (post_id, autor_id, conteudo, criado_em, atualizado_em)
+                                VALUES (%s, %s, %s, NOW(), NOW())
+                                RETURNING id, post_id, criado_em
+                            ),
+                            contador AS (
+                                UPDATE blog_post
+                                SET total_comentarios = total_comentarios + 1,
+                                    versao_comentarios = versao_comentarios + 1
+                                WHERE id = (SELECT post_id FROM novo)
+                                RETURNING total_comentarios
+                            )
+                            SELECT novo.id, novo.criado_em, contador.total_comentarios
+                            FROM novo, contador
+                        """, [post['id'], request.user.id, conteudo])
+                        novo_id, novo_criado_em, total_comentarios = cursor.fetchone()
+                        
+                        # SQL: Comentário conta para os rankings (balde da hora, ver ranking.py)
+                        ranking.registrar(cursor, post['id'], comentarios=1)
+                        
+                        # SQL: Avisar as abas abertas no post (entregue no COMMIT, ver eventos.py)
+                        eventos.publicar(cursor, post['id'], 'comentario', {
+                            'id': novo_id,
+                            'autor': request.user.username,
+                            'autor_id': request.user.id,
+                            'conteudo': conteudo,
+                            'criado_em': novo_criado_em,
+                            'total_comentarios': total_comentarios,
+                        })
                     
                     messages.success(request, 'Comentário adicionado com sucesso!')
                     return redirect('post_detail', slug=slug)
                 except Exception as e:
                     messages.error(request, f'Erro ao adicionar comentário: {str(e)}')
-            else:
-                messages.error(request, 'O comentário não pode estar vazio.')
+        
+        # SQL: Casca pública (reações e comentários só fora do cache)
+        casca = casca_post(cursor, post)
+    
+    # Visualização: só em memória, gravada em lote (ver visualizacoes.py)
+    if request.method == 'GET':
+        visualizacoes.contar(post['id'])
     
     return render(request, 'blog/post_detail.html', {
         'post': post,
-        'comentarios': comentarios,
-        'reacao_usuario': reacao_usuario,
-        'reacoes_dict': reacoes_dict,
-        'total_reacoes': total_reacoes
+        'casca': casca,
     })
 
 
@@ -386,13 +573,15 @@ def toggle_reacao(request, slug):
     1. SELECT post por slug
     2. SELECT reação existente do usuário
     3. INSERT/UPDATE/DELETE reação
-    4. SELECT contagem de reações atualizada
+    4. UPSERT balde de atividade do post (só reação nova, ver ranking.py)
+    5. SELECT contagem de reações atualizada
+    6. SELECT pg_notify (contagens para as abas abertas no post)
     """
     try:
         with connection.cursor() as cursor:
             # SQL: Buscar post
             cursor.execute("""
-                SELECT id FROM blog_post WHERE slug = %s
+                SELECT id FROM blog_post WHERE slug = %s AND excluido_em IS NULL
             """, [slug])
             
             post_data = cursor.fetchone()
@@ -440,6 +629,9 @@ def toggle_reacao(request, slug):
                     VALUES (%s, %s, %s, NOW())
                 """, [request.user.id, post_id, tipo_reacao])
                 reacao_adicionada = True
+                
+                # SQL: Reação nova conta para "Em alta" (balde da hora, ver ranking.py)
+                ranking.registrar(cursor, post_id, reacoes=1)
             
             # SQL: Buscar contagem atualizada de reações
             cursor.execute("""
@@ -461,6 +653,12 @@ def toggle_reacao(request, slug):
             
             total_reacoes = cursor.fetchone()[0]
             
+            # SQL: Avisar as abas abertas no post (ver eventos.py)
+            eventos.publicar(cursor, post_id, 'reacoes', {
+                'reacoes': reacoes_dict,
+                'total': total_reacoes,
+            })
+            
             return JsonResponse({
                 'sucesso': True,
                 'reacao_adicionada': reacao_adicionada,
@@ -480,7 +678,7 @@ def editar_comentario(request, comentario_id):
     
     SQL EXECUTADO:
     1. SELECT comentário por ID com JOIN
-    2. UPDATE comentário (se POST)
+    2. UPDATE comentário + UPDATE blog_post.versao_comentarios (se POST, mesmo comando)
     """
     try:
         with connection.cursor() as cursor:
@@ -537,12 +735,23 @@ def editar_comentario(request, comentario_id):
                     messages.error(request, 'O comentário não pode estar vazio.')
                 elif len(novo_conteudo) < 3:
                     messages.error(request, 'O comentário deve ter pelo menos 3 caracteres.')
+                elif len(novo_conteudo) > TAMANHO_MAXIMO_COMENTARIO:
+                    messages.error(
+                        request,
+                        f'O comentário deve ter no máximo {TAMANHO_MAXIMO_COMENTARIO} caracteres.',
+                    )
                 else:
-                    # SQL: Atualizar comentário
+                    # SQL: Atualizar comentário e a versão dos comentários do post
                     cursor.execute("""
-                        UPDATE blog_comentario
-                        SET conteudo = %s, atualizado_em = NOW()
-                        WHERE id = %s
+                        WITH editado AS (
+                            UPDATE blog_comentario
+                            SET conteudo = %s, atualizado_em = NOW()
+                            WHERE id = %s
+                            RETURNING post_id
+                        )
+                        UPDATE blog_post
+                        SET versao_comentarios = versao_comentarios + 1
+                        WHERE id IN (SELECT post_id FROM editado)
                     """, [novo_conteudo, comentario_id])
                     
                     messages.success(request, 'Comentário atualizado com sucesso!')
@@ -566,7 +775,8 @@ def excluir_comentario(request, comentario_id):
     SQL EXECUTADO:
     1. SELECT comentário por ID
     2. SELECT perfil do usuário (verificar se é admin)
-    3. DELETE comentário
+    3. DELETE comentário + UPDATE blog_post.total_comentarios e versao_comentarios (mesmo comando)
+    4. SELECT pg_notify (comentário removido, para as abas abertas no post)
     """
     try:
         with connection.cursor() as cursor:
@@ -593,11 +803,28 @@ def excluir_comentario(request, comentario_id):
             is_admin = usuario_e_admin(request.user)
             
             if is_autor or is_admin:
-                # SQL: Deletar comentário
+                # SQL: Deletar comentário e decrementar o contador do post
                 cursor.execute("""
-                    DELETE FROM blog_comentario WHERE id = %s
+                    WITH removido AS (
+                        DELETE FROM blog_comentario WHERE id = %s
+                        RETURNING post_id
+                    )
+                    UPDATE blog_post p
+                    SET total_comentarios = GREATEST(p.total_comentarios - 1, 0),
+                        versao_comentarios = p.versao_comentarios + 1
+                    FROM removido r
+                    WHERE p.id = r.post_id
+                    RETURNING p.id, p.total_comentarios
                 """, [comentario_id_db])
                 
+                removido = cursor.fetchone()
+                if removido:
+                    # SQL: Avisar as abas abertas no post (ver eventos.py)
+                    eventos.publicar(cursor, removido[0], 'comentario_removido', {
+                        'id': comentario_id_db,
+                        'total_comentarios': removido[1],
+                    })
+                
                 messages.success(request, 'Comentário excluído com sucesso.')
                 return redirect('post_detail', slug=post_slug)
             else:
@@ -657,7 +884,7 @@ def post_create(request):
     
     SQL EXECUTADO:
     1. SELECT categorias (para dropdown)
-    2. INSERT post (se válido)
+    2. INSERT post com o HTML do conteúdo já renderizado (se válido)
     """
     if request.method == 'POST':
         # Processar formulário manualmente
@@ -702,12 +929,20 @@ def post_create(request):
                     # SQL: Inserir novo post
                     cursor.execute("""
                         INSERT INTO blog_post 
-                        (titulo, slug, conteudo, imagem, categoria_id, 
-                         autor_id, criado_em, atualizado_em)
-                        VALUES (%s, %s, %s, %s, %s, %s, NOW(), NOW())
-                    """, [titulo, slug, conteudo, imagem_path, 
-                          categoria_id, request.user.id])
+                        (titulo, slug, conteudo, conteudo_html, versao_html,
+                         imagem, categoria_id, autor_id, criado_em, atualizado_em)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                        RETURNING id
+                    """, [titulo, slug, conteudo,
+                          renderizacao.renderizar(conteudo), renderizacao.VERSAO_HTML,
+                          imagem_path, categoria_id, request.user.id])
+                    post_id = cursor.fetchone()[0]
                 
+                cache.delete(chave_post_ausente(slug))
+                categorias.invalidar_categorias()
+                feeds.invalidar_feeds()
+                lista_posts.invalidar_lista_posts()
+                sitemaps.invalidar_post(post_id)
                 messages.success(request, 'Post criado com sucesso!')
                 return redirect('post_detail', slug=slug)
             except Exception as e:
@@ -726,7 +961,7 @@ def post_edit(request, slug):
     SQL EXECUTADO:
     1. SELECT post por slug
     2. SELECT perfil do usuário (verificar se é admin)
-    3. UPDATE post (se válido)
+    3. UPDATE post com o HTML do conteúdo já renderizado (se válido)
     """
     try:
         with connection.cursor() as cursor:
@@ -734,7 +969,7 @@ def post_edit(request, slug):
             cursor.execute("""
                 SELECT id, titulo, slug, conteudo, imagem, categoria_id, autor_id
                 FROM blog_post
-                WHERE slug = %s
+                WHERE slug = %s AND excluido_em IS NULL
             """, [slug])
             
             post_data = cursor.fetchone()
@@ -799,11 +1034,22 @@ def post_edit(request, slug):
                     cursor.execute("""
                         UPDATE blog_post
                         SET titulo = %s, slug = %s, conteudo = %s, 
+                            conteudo_html = %s, versao_html = %s,
                             imagem = %s, categoria_id = %s, atualizado_em = NOW()
                         WHERE id = %s
-                    """, [novo_titulo, novo_slug, novo_conteudo, 
+                    """, [novo_titulo, novo_slug, novo_conteudo,
+                          renderizacao.renderizar(novo_conteudo), renderizacao.VERSAO_HTML,
                           imagem_path, nova_categoria_id, post_id])
                     
+                    # Imagem trocada: arquivo antigo apagado se ninguém mais o usa
+                    if imagem_path != post_imagem:
+                        midia.liberar_imagem(post_imagem)
+                    
+                    cache.delete(chave_post_ausente(novo_slug))
+                    categorias.invalidar_categorias()
+                    feeds.invalidar_feeds()
+                    lista_posts.invalidar_lista_posts()
+                    sitemaps.invalidar_post(post_id)
                     messages.success(request, 'Post atualizado com sucesso!')
                     return redirect('post_detail', slug=novo_slug)
             
@@ -845,21 +1091,31 @@ def post_delete(request, slug):
     """
     Excluir post (autor ou admin)
     
+    Post pequeno (até tarefas.TAMANHO_LOTE comentários + reações): apagado
+    na hora, numa transação (tarefas.apagar_post).
+    Post grande: marcado com excluido_em (some de todas as consultas no
+    mesmo instante), com o slug liberado para um post novo, e uma tarefa
+    apaga comentários/reações em lotes e depois o post. Nos dois casos a imagem é liberada por midia.liberar_imagem.
+    
     SQL EXECUTADO:
-    1. SELECT post por slug
+    1. SELECT post por slug (+ reações contadas até o limite)
     2. SELECT perfil do usuário (verificar se é admin)
-    3. DELETE comentários (CASCADE)
-    4. DELETE reações (CASCADE)
-    5. DELETE post
+    3a. DELETE comentários, reações e post (uma transação) - post pequeno
+    3b. UPDATE blog_post SET excluido_em, slug + INSERT blog_tarefalote - post grande
     """
     try:
         with connection.cursor() as cursor:
-            # SQL: Buscar post
+            # SQL: Buscar post (reações contadas só até passar do limite)
             cursor.execute("""
-                SELECT id, titulo, autor_id
-                FROM blog_post
-                WHERE slug = %s
-            """, [slug])
+                SELECT p.id, p.titulo, p.autor_id, p.total_comentarios,
+                       (SELECT COUNT(*) FROM (
+                            SELECT 1 FROM blog_reacaousuariopost r
+                            WHERE r.post_id = p.id
+                            LIMIT %s
+                       ) limitadas)
+                FROM blog_post p
+                WHERE p.slug = %s AND p.excluido_em IS NULL
+            """, [tarefas.TAMANHO_LOTE + 1, slug])
             
             post_data = cursor.fetchone()
             
@@ -870,6 +1126,7 @@ def post_delete(request, slug):
             post_id = post_data[0]
             post_titulo = post_data[1]
             autor_id = post_data[2]
+            dependentes = post_data[3] + post_data[4]
             
             # Verificar permissões
             is_autor = request.user.id == autor_id
@@ -881,20 +1138,32 @@ def post_delete(request, slug):
             
             if request.method == 'POST':
                 try:
-                    # SQL: Deletar comentários (CASCADE)
-                    cursor.execute("""
-                        DELETE FROM blog_comentario WHERE post_id = %s
-                    """, [post_id])
-                    
-                    # SQL: Deletar reações (CASCADE)
-                    cursor.execute("""
-                        DELETE FROM blog_reacaousuariopost WHERE post_id = %s
-                    """, [post_id])
-                    
-                    # SQL: Deletar post
-                    cursor.execute("""
-                        DELETE FROM blog_post WHERE id = %s
-                    """, [post_id])
+                    if dependentes <= tarefas.TAMANHO_LOTE:
+                        # SQL: Deletar comentários, reações e post (atômico)
+                        tarefas.apagar_post(post_id)
+                    else:
+                        with transaction.atomic():
+                            # SQL: Marcar como excluído (some das consultas) e liberar
+                            # o slug (UNIQUE) até a tarefa apagar a linha. slugify nunca
+                            # gera "--": o sufixo não colide com slug de post real
+                            cursor.execute("""
+                                UPDATE blog_post
+                                SET excluido_em = NOW(),
+                                    slug = LEFT(slug, %s - LENGTH('--excluido-' || id))
+                                           || '--excluido-' || id
+                                WHERE id = %s
+                            """, [TAMANHO_MAXIMO_SLUG, post_id])
+                            
+                            # SQL: Enfileirar limpeza em lotes
+                            tarefas.enfileirar('excluir_post', {
+                                'post_id': post_id,
+                                'nome': post_titulo[:100],
+                            }, usuario_id=request.user.id, total=dependentes)
+                        
+                        categorias.invalidar_categorias()
+                        feeds.invalidar_feeds()
+                        lista_posts.invalidar_lista_posts()
+                        sitemaps.invalidar_post(post_id)
                     
                     messages.success(request, "Post excluído com sucesso.")
                     return redirect('post_list')
@@ -910,6 +1179,63 @@ def post_delete(request, slug):
         return redirect('post_list')
 
 
+def definir_ativo_usuarios(ativo, admin_id, usuario_ids=None, filtros=None, params=None,
+                           proteger_admins=True):
+    """
+    Ativa/desativa vários usuários num único UPDATE set-based
+
+    Alvo: usuario_ids (lista de IDs) ou filtros/params de filtros_usuarios
+    (alias u = auth_user). Nunca altera o próprio admin; na desativação,
+    perfis admin são protegidos (proteger_admins=False desliga, para a
+    desativação individual). Só conta quem realmente mudou de estado.
+
+    Sessões: PerfilAtivoBackend.get_user recusa perfis inativos, então os
+    usuários desativados perdem a sessão na próxima requisição.
+
+    Retorna (total, exemplos): total alterado e até 5 usernames
+
+    SQL EXECUTADO:
+    WITH alterados AS (UPDATE blog_perfilusuario ... RETURNING usuario_id)
+    SELECT COUNT(*), usernames, ids FROM alterados
+    + invalidação dos perfis alterados em todos os processos (invalidacao.py)
+    """
+    condicoes = ["u.id = p.usuario_id", "p.usuario_id <> %s", "p.ativo <> %s"]
+    valores = [admin_id, ativo]
+
+    if not ativo and proteger_admins:
+        condicoes.append("p.tipo_usuario <> 'admin'")
+
+    if usuario_ids is not None:
+        condicoes.append("p.usuario_id = ANY(%s)")
+        valores.append(list(usuario_ids))
+    else:
+        condicoes += filtros or []
+        valores += params or []
+
+    with connection.cursor() as cursor:
+        # SQL: UPDATE em lote + resumo (uma ida ao banco)
+        cursor.execute(f"""
+            WITH alterados AS (
+                UPDATE blog_perfilusuario p
+                SET ativo = %s, atualizado_em = NOW()
+                FROM auth_user u
+                WHERE {' AND '.join(condicoes)}
+                RETURNING u.id, u.username
+            )
+            SELECT COUNT(*), (ARRAY_AGG(username ORDER BY username))[1:5],
+                   ARRAY_AGG(id)
+            FROM alterados
+        """, [ativo] + valores)
+
+        total, exemplos, ids = cursor.fetchone()
+
+    if total:
+        invalidacao.publicar('perfis', *ids)
+        estatisticas.invalidar_painel()
+
+    return total, exemplos or []
+
+
 @login_required
 def desativar_usuario(request, usuario_id):
     """
@@ -917,60 +1243,29 @@ def desativar_usuario(request, usuario_id):
     
     SQL EXECUTADO:
     1. SELECT perfil do usuário logado (verificar se é admin)
-    2. SELECT usuário a ser desativado
-    3. SELECT perfil do usuário a ser desativado
-    4. UPDATE perfil (ativo = FALSE)
+    2. UPDATE perfil (ativo = FALSE) ... RETURNING (definir_ativo_usuarios)
     """
     # Verificar se o usuário logado é admin
     if not usuario_e_admin(request.user):
         messages.error(request, 'Você não tem permissão para desativar usuários.')
         return redirect('post_list')
     
+    # Não permite desativar a si mesmo
+    if usuario_id == request.user.id:
+        messages.error(request, 'Você não pode desativar sua própria conta.')
+        return redirect('post_list')
+    
     try:
-        with connection.cursor() as cursor:
-            # SQL: Buscar usuário
-            cursor.execute("""
-                SELECT id, username
-                FROM auth_user
-                WHERE id = %s
-            """, [usuario_id])
-            
-            usuario_data = cursor.fetchone()
-            
-            if not usuario_data:
-                messages.error(request, 'Usuário não encontrado.')
-                return redirect('post_list')
-            
-            user_id = usuario_data[0]
-            username = usuario_data[1]
-            
-            # Não permite desativar a si mesmo
-            if user_id == request.user.id:
-                messages.error(request, 'Você não pode desativar sua própria conta.')
-                return redirect('post_list')
-            
-            # SQL: Verificar se tem perfil
-            cursor.execute("""
-                SELECT id
-                FROM blog_perfilusuario
-                WHERE usuario_id = %s
-            """, [user_id])
-            
-            perfil_data = cursor.fetchone()
-            
-            if perfil_data:
-                # SQL: Desativar perfil
-                cursor.execute("""
-                    UPDATE blog_perfilusuario
-                    SET ativo = FALSE, atualizado_em = NOW()
-                    WHERE usuario_id = %s
-                """, [user_id])
-                
-                messages.success(request, f'Usuário {username} foi desativado.')
-            else:
-                messages.error(request, 'Usuário não possui perfil.')
-            
-            return redirect('post_list')
+        total, exemplos = definir_ativo_usuarios(
+            False, request.user.id, usuario_ids=[usuario_id], proteger_admins=False,
+        )
+        
+        if total:
+            messages.success(request, f'Usuário {exemplos[0]} foi desativado.')
+        else:
+            messages.error(request, 'Usuário não encontrado, sem perfil ou já desativado.')
+        
+        return redirect('post_list')
             
     except Exception as e:
         messages.error(request, f'Erro ao desativar usuário: {str(e)}')
@@ -984,9 +1279,7 @@ def ativar_usuario(request, usuario_id):
     
     SQL EXECUTADO:
     1. SELECT perfil do usuário logado (verificar se é admin)
-    2. SELECT usuário a ser ativado
-    3. SELECT perfil do usuário a ser ativado
-    4. UPDATE perfil (ativo = TRUE)
+    2. UPDATE perfil (ativo = TRUE) ... RETURNING (definir_ativo_usuarios)
     """
     # Verificar se o usuário logado é admin
     if not usuario_e_admin(request.user):
@@ -994,51 +1287,78 @@ def ativar_usuario(request, usuario_id):
         return redirect('post_list')
     
     try:
-        with connection.cursor() as cursor:
-            # SQL: Buscar usuário
-            cursor.execute("""
-                SELECT id, username
-                FROM auth_user
-                WHERE id = %s
-            """, [usuario_id])
-            
-            usuario_data = cursor.fetchone()
-            
-            if not usuario_data:
-                messages.error(request, 'Usuário não encontrado.')
-                return redirect('post_list')
-            
-            user_id = usuario_data[0]
-            username = usuario_data[1]
-            
-            # SQL: Verificar se tem perfil
-            cursor.execute("""
-                SELECT id
-                FROM blog_perfilusuario
-                WHERE usuario_id = %s
-            """, [user_id])
-            
-            perfil_data = cursor.fetchone()
-            
-            if perfil_data:
-                # SQL: Ativar perfil
-                cursor.execute("""
-                    UPDATE blog_perfilusuario
-                    SET ativo = TRUE, atualizado_em = NOW()
-                    WHERE usuario_id = %s
-                """, [user_id])
-                
-                messages.success(request, f'Usuário {username} foi reativado.')
-            else:
-                messages.error(request, 'Usuário não possui perfil.')
-            
-            return redirect('post_list')
+        total, exemplos = definir_ativo_usuarios(True, request.user.id, usuario_ids=[usuario_id])
+        
+        if total:
+            messages.success(request, f'Usuário {exemplos[0]} foi reativado.')
+        else:
+            messages.error(request, 'Usuário não encontrado, sem perfil ou já ativo.')
+        
+        return redirect('post_list')
             
     except Exception as e:
         messages.error(request, f'Erro ao ativar usuário: {str(e)}')
         return redirect('post_list')
 
 
+@login_required
+@require_POST
+def admin_usuarios_em_massa(request):
+    """
+    Ativa/desativa vários usuários de uma vez (admin)
+
+    POST:
+    - acao: ativar | desativar
+    - escopo: selecionados (usuario_ids marcados na página) | filtro (todos
+      os usuários que casam com a busca q, em todas as páginas; exige q)
+
+    SQL EXECUTADO:
+    1. SELECT perfil do usuário logado (verificar se é admin)
+    2. UPDATE em lote ... RETURNING (definir_ativo_usuarios)
+    """
+    if not usuario_e_admin(request.user):
+        messages.error(request, 'Acesso negado. Apenas administradores.')
+        return redirect('post_list')
+
+    acao = request.POST.get('acao')
+    escopo = request.POST.get('escopo', 'selecionados')
+    destino = 'admin_usuarios'
+    retorno = urlencode({
+        chave: request.POST[chave] for chave in ('q', 'ordem') if request.POST.get(chave)
+    })
+
+    if acao not in ('ativar', 'desativar'):
+        messages.error(request, 'Ação inválida.')
+        return redirect(destino)
+
+    ativo = acao == 'ativar'
+
+    if escopo == 'filtro':
+        filtros, params, _ = filtros_usuarios(request.POST)
+        if not filtros:
+            # Sem busca o "filtro" seria a tabela inteira
+            messages.error(request, 'Informe uma busca para alterar todos os usuários que casam com ela.')
+            return redirect(f"{reverse(destino)}?{retorno}")
+        total, exemplos = definir_ativo_usuarios(
+            ativo, request.user.id, filtros=filtros, params=params,
+        )
+    else:
+        usuario_ids = [int(i) for i in request.POST.getlist('usuario_ids') if i.isdigit()]
+        if not usuario_ids:
+            messages.error(request, 'Nenhum usuário selecionado.')
+            return redirect(f"{reverse(destino)}?{retorno}")
+        total, exemplos = definir_ativo_usuarios(ativo, request.user.id, usuario_ids=usuario_ids)
+
+    if total:
+        verbo = 'ativado' if ativo else 'desativado'
+        nomes = ', '.join(exemplos) + ('…' if total > len(exemplos) else '')
+        messages.success(request, f'{total} usuário(s) {verbo}(s): {nomes}')
+    else:
+        messages.info(request, 'Nenhum usuário precisou ser alterado.')
+
+    return redirect(f"{reverse(destino)}?{retorno}")
+
+
 def esqueci_senha(request):
     """
     Tela customizada de recuperação de senha - 100% SQL PURO
@@ -1197,65 +1517,34 @@ def login_customizado(request):
 def painel_admin(request):
     """
     Dashboard administrativo - SQL PURO
-    
+
+    Contagens estimadas por padrão (pg_class.reltuples, custo constante);
+    ?exato=1 força COUNT(*) exato. Ver blog/estatisticas.py
+
     SQL EXECUTADO:
-    1. Conta total de posts
-    2. Conta total de usuários
-    3. Conta total de comentários
-    4. Conta total de categorias
-    5. Lista últimos 5 posts
-    6. Lista últimos 5 usuários
+    1. SELECT estimativas em pg_class (uma query para as 4 tabelas)
+       (COUNT(*) só para tabelas pequenas ou com ?exato=1)
+    2. Lista últimos 5 posts (cache de 30s)
+    3. Lista últimos 5 usuários (cache de 30s)
+
+    Mostra também as métricas do cache em camadas deste processo.
     """
-    
+
     # Verificar se é admin
     if not usuario_e_admin(request.user):
         messages.error(request, 'Acesso negado. Apenas administradores.')
         return redirect('post_list')
-    
-    with connection.cursor() as cursor:
-        # SQL: Contar posts
-        cursor.execute("SELECT COUNT(*) FROM blog_post")
-        total_posts = cursor.fetchone()[0]
-        
-        # SQL: Contar usuários
-        cursor.execute("SELECT COUNT(*) FROM auth_user")
-        total_usuarios = cursor.fetchone()[0]
-        
-        # SQL: Contar comentários
-        cursor.execute("SELECT COUNT(*) FROM blog_comentario")
-        total_comentarios = cursor.fetchone()[0]
-        
-        # SQL: Contar categorias
-        cursor.execute("SELECT COUNT(*) FROM blog_categoria")
-        total_categorias = cursor.fetchone()[0]
-        
-        # SQL: Últimos 5 posts
-        cursor.execute("""
-            SELECT p.id, p.titulo, p.slug, p.criado_em, u.username
-            FROM blog_post p
-            INNER JOIN auth_user u ON p.autor_id = u.id
-            ORDER BY p.criado_em DESC
-            LIMIT 5
-        """)
-        ultimos_posts = cursor.fetchall()
-        
-        # SQL: Últimos 5 usuários
-        cursor.execute("""
-            SELECT u.id, u.username, u.email, u.date_joined, p.ativo
-            FROM auth_user u
-            LEFT JOIN blog_perfilusuario p ON u.id = p.usuario_id
-            ORDER BY u.date_joined DESC
-            LIMIT 5
-        """)
-        ultimos_usuarios = cursor.fetchall()
-    
+
+    contagem_exata = request.GET.get('exato') == '1'
+    contagens, contagens_estimadas = estatisticas.contar_tabelas(exato=contagem_exata)
+
     context = {
-        'total_posts': total_posts,
-        'total_usuarios': total_usuarios,
-        'total_comentarios': total_comentarios,
-        'total_categorias': total_categorias,
-        'ultimos_posts': ultimos_posts,
-        'ultimos_usuarios': ultimos_usuarios,
+        **contagens,
+        'contagens_estimadas': contagens_estimadas,
+        'contagem_exata': contagem_exata,
+        'ultimos_posts': estatisticas.ultimos_posts(),
+        'ultimos_usuarios': estatisticas.ultimos_usuarios(),
+        'metricas_cache': cache_camadas.metricas(),
     }
     
     return render(request, 'blog/admin/dashboard.html', context)
@@ -1274,7 +1563,7 @@ def admin_categorias(request):
         messages.error(request, 'Acesso negado. Apenas administradores.')
         return redirect('post_list')
     
-    with connection.cursor() as cursor:
+    with db.cursor_leitura() as cursor:
         # SQL: Listar categorias com contagem de posts
         cursor.execute("""
             SELECT 
@@ -1282,15 +1571,15 @@ def admin_categorias(request):
                 c.nome,
                 COUNT(p.id) AS total_posts
             FROM blog_categoria c
-            LEFT JOIN blog_post p ON c.id = p.categoria_id
+            LEFT JOIN blog_post p ON c.id = p.categoria_id AND p.excluido_em IS NULL
             GROUP BY c.id, c.nome
             ORDER BY c.nome ASC
         """)
         
-        categorias = cursor.fetchall()
+        lista_categorias = cursor.fetchall()
     
     return render(request, 'blog/admin/categorias_lista.html', {
-        'categorias': categorias
+        'categorias': lista_categorias
     })
 
 
@@ -1331,6 +1620,7 @@ def admin_categoria_criar(request):
                         VALUES (%s)
                     """, [nome])
                     
+                    categorias.invalidar_categorias()
                     messages.success(request, f'Categoria "{nome}" criada com sucesso!')
                     return redirect('admin_categorias')
     
@@ -1395,6 +1685,9 @@ def admin_categoria_editar(request, categoria_id):
                         WHERE id = %s
                     """, [nome, categoria_id])
                     
+                    categorias.invalidar_categorias()
+                    feeds.invalidar_feeds()
+                    lista_posts.invalidar_lista_posts()
                     messages.success(request, f'Categoria atualizada para "{nome}"!')
                     return redirect('admin_categorias')
     
@@ -1409,9 +1702,13 @@ def admin_categoria_excluir(request, categoria_id):
     """
     Excluir categoria - SQL PURO
     
+    A exclusão roda como tarefa em lotes (blog/tarefas.py): os posts ficam
+    sem categoria em transações curtas e a categoria é removida no final.
+    
     SQL EXECUTADO:
     1. SELECT categoria com contagem de posts
-    2. DELETE categoria (se confirmado)
+    2. SELECT tarefa em andamento para a categoria
+    3. INSERT blog_tarefalote (se confirmado)
     """
     
     if not usuario_e_admin(request.user):
@@ -1426,7 +1723,7 @@ def admin_categoria_excluir(request, categoria_id):
                 c.nome,
                 COUNT(p.id) AS total_posts
             FROM blog_categoria c
-            LEFT JOIN blog_post p ON c.id = p.categoria_id
+            LEFT JOIN blog_post p ON c.id = p.categoria_id AND p.excluido_em IS NULL
             WHERE c.id = %s
             GROUP BY c.id, c.nome
         """, [categoria_id])
@@ -1444,20 +1741,19 @@ def admin_categoria_excluir(request, categoria_id):
         }
         
         if request.method == 'POST':
-            # SQL: Antes de excluir, setar posts para NULL
-            cursor.execute("""
-                UPDATE blog_post
-                SET categoria_id = NULL
-                WHERE categoria_id = %s
-            """, [categoria_id])
-            
-            # SQL: Excluir categoria
-            cursor.execute("""
-                DELETE FROM blog_categoria WHERE id = %s
-            """, [categoria_id])
-            
-            messages.success(request, f'Categoria "{categoria["nome"]}" excluída com sucesso!')
-            return redirect('admin_categorias')
+            if tarefas.tarefa_ativa_categoria(categoria_id):
+                messages.error(request, 'Já existe uma tarefa em andamento para esta categoria.')
+                return redirect('admin_tarefas')
+            
+            # SQL: Enfileirar exclusão em lotes
+            tarefas.enfileirar('excluir_categoria', {
+                'origem': categoria_id,
+                'destino': None,
+                'nome': categoria['nome'],
+            }, usuario_id=request.user.id, total=categoria['total_posts'])
+            
+            messages.success(request, f'Exclusão da categoria "{categoria["nome"]}" iniciada.')
+            return redirect('admin_tarefas')
     
     return render(request, 'blog/admin/categoria_confirmar_exclusao.html', {
         'categoria': categoria
@@ -1465,12 +1761,17 @@ def admin_categoria_excluir(request, categoria_id):
 
 
 @login_required
-def admin_posts(request):
+def admin_categoria_mesclar(request, categoria_id):
     """
-    Listar todos os posts (admin) - SQL PURO
+    Mesclar categoria: move os posts para outra categoria e exclui esta
+    
+    Executado como tarefa em lotes (blog/tarefas.py)
     
     SQL EXECUTADO:
-    SELECT posts com autor e categoria
+    1. SELECT categoria com contagem de posts
+    2. SELECT categorias (destinos possíveis, em cache)
+    3. SELECT tarefa em andamento para origem/destino
+    4. INSERT blog_tarefalote (se confirmado)
     """
     
     if not usuario_e_admin(request.user):
@@ -1478,8 +1779,218 @@ def admin_posts(request):
         return redirect('post_list')
     
     with connection.cursor() as cursor:
-        # SQL: Listar todos os posts
+        # SQL: Buscar categoria com contagem de posts
         cursor.execute("""
+            SELECT c.id, c.nome, COUNT(p.id) AS total_posts
+            FROM blog_categoria c
+            LEFT JOIN blog_post p ON c.id = p.categoria_id AND p.excluido_em IS NULL
+            WHERE c.id = %s
+            GROUP BY c.id, c.nome
+        """, [categoria_id])
+        
+        categoria_data = cursor.fetchone()
+    
+    if not categoria_data:
+        messages.error(request, 'Categoria não encontrada.')
+        return redirect('admin_categorias')
+    
+    categoria = {
+        'id': categoria_data[0],
+        'nome': categoria_data[1],
+        'total_posts': categoria_data[2]
+    }
+    destinos = [c for c in categorias.listar_categorias() if c[0] != categoria_id]
+    
+    if request.method == 'POST':
+        destino = request.POST.get('destino', '')
+        destino_id = int(destino) if destino.isdigit() else None
+        nomes = dict(destinos)
+        
+        if destino_id not in nomes:
+            messages.error(request, 'Escolha a categoria de destino.')
+        elif tarefas.tarefa_ativa_categoria(categoria_id) or tarefas.tarefa_ativa_categoria(destino_id):
+            messages.error(request, 'Já existe uma tarefa em andamento para uma das categorias.')
+            return redirect('admin_tarefas')
+        else:
+            # SQL: Enfileirar mesclagem em lotes
+            tarefas.enfileirar('mesclar_categorias', {
+                'origem': categoria_id,
+                'destino': destino_id,
+                'nome': f'{categoria["nome"]} → {nomes[destino_id]}',
+            }, usuario_id=request.user.id, total=categoria['total_posts'])
+            
+            messages.success(
+                request, f'Mesclagem de "{categoria["nome"]}" em "{nomes[destino_id]}" iniciada.'
+            )
+            return redirect('admin_tarefas')
+    
+    return render(request, 'blog/admin/categoria_mesclar.html', {
+        'categoria': categoria,
+        'destinos': destinos,
+    })
+
+
+@login_required
+def admin_tarefas(request):
+    """
+    Progresso das tarefas em lote (admin)
+    
+    SQL EXECUTADO:
+    SELECT últimas 50 tarefas com o username de quem criou
+    """
+    
+    if not usuario_e_admin(request.user):
+        messages.error(request, 'Acesso negado. Apenas administradores.')
+        return redirect('post_list')
+    
+    with db.cursor_leitura() as cursor:
+        # SQL: Últimas tarefas
+        cursor.execute("""
+            SELECT t.id, t.tipo, t.parametros->>'nome', t.estado, t.total, t.processados,
+                   t.erro, t.criado_em, t.concluido_em, u.username
+            FROM blog_tarefalote t
+            LEFT JOIN auth_user u ON t.criado_por_id = u.id
+            ORDER BY t.id DESC
+            LIMIT 50
+        """)
+        
+        lista = [
+            {
+                'id': linha[0],
+                'tipo': linha[1],
+                'nome': linha[2],
+                'estado': linha[3],
+                'total': linha[4],
+                'processados': linha[5],
+                'percentual': min(100, round(100 * linha[5] / linha[4])) if linha[4] else
+                              (100 if linha[3] == 'concluida' else 0),
+                'erro': linha[6],
+                'criado_em': linha[7],
+                'concluido_em': linha[8],
+                'criado_por': linha[9],
+            }
+            for linha in cursor.fetchall()
+        ]
+    
+    return render(request, 'blog/admin/tarefas_lista.html', {
+        'tarefas': lista,
+        'em_andamento': any(t['estado'] in ('pendente', 'executando') for t in lista),
+    })
+
+
+# Ordenações da lista de posts (cada uma com índice correspondente)
+ORDENACOES_POSTS = {
+    'recentes': paginacao.Ordenacao(['p.criado_em', 'p.id'], [datetime, int], descendente=True),
+    'antigos': paginacao.Ordenacao(['p.criado_em', 'p.id'], [datetime, int]),
+    'titulo': paginacao.Ordenacao(['p.titulo', 'p.id'], [str, int]),
+    'comentarios': paginacao.Ordenacao(['p.total_comentarios', 'p.id'], [int, int], descendente=True),
+}
+
+ORDENS_POSTS_ROTULOS = [
+    ('recentes', 'Mais recentes'),
+    ('antigos', 'Mais antigos'),
+    ('titulo', 'Título A-Z'),
+    ('comentarios', 'Mais comentados'),
+]
+
+
+def _ler_data(texto):
+    """'AAAA-MM-DD' -> date, ou None se vazio/inválido"""
+    try:
+        return datetime.strptime(texto, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def filtros_posts(parametros):
+    """
+    Monta o WHERE da lista de posts do admin a partir dos parâmetros GET
+
+    - autor: username exato
+    - categoria: id da categoria ou 'sem' (posts sem categoria)
+    - de / ate: intervalo de criação (AAAA-MM-DD, ambos inclusivos)
+
+    Retorna (filtros, params, valores): filtros é lista de condições SQL
+    (alias p = blog_post) e valores são os filtros normalizados para o template
+    """
+    # Posts excluídos aguardando a limpeza em lotes não aparecem
+    filtros = ["p.excluido_em IS NULL"]
+    params = []
+    valores = {'autor': '', 'categoria': '', 'de': '', 'ate': ''}
+
+    autor = parametros.get('autor', '').strip()[:150]
+    if autor:
+        # Username é UNIQUE: subquery resolvida uma vez pelo índice
+        filtros.append("p.autor_id = (SELECT id FROM auth_user WHERE username = %s)")
+        params.append(autor)
+        valores['autor'] = autor
+
+    categoria = parametros.get('categoria', '')
+    if categoria == 'sem':
+        filtros.append("p.categoria_id IS NULL")
+        valores['categoria'] = 'sem'
+    elif categoria.isdigit():
+        filtros.append("p.categoria_id = %s")
+        params.append(int(categoria))
+        valores['categoria'] = categoria
+
+    de = _ler_data(parametros.get('de'))
+    if de:
+        filtros.append("p.criado_em >= %s")
+        params.append(timezone.make_aware(datetime.combine(de, time.min)))
+        valores['de'] = de.isoformat()
+
+    ate = _ler_data(parametros.get('ate'))
+    if ate:
+        filtros.append("p.criado_em < %s")
+        params.append(timezone.make_aware(datetime.combine(ate + timedelta(days=1), time.min)))
+        valores['ate'] = ate.isoformat()
+
+    return filtros, params, valores
+
+
+@login_required
+def admin_posts(request):
+    """
+    Listar posts (admin) - SQL PURO, paginado por cursor
+
+    Parâmetros GET:
+    - autor, categoria, de, ate: filtros (ver filtros_posts)
+    - ordem: recentes | antigos | titulo | comentarios
+    - depois / antes: cursor da página (gerado pela própria listagem)
+    - por_pagina: 10 a 200 (padrão 50)
+
+    SQL EXECUTADO:
+    1. SELECT página de posts com autor, categoria e visualizações (keyset
+       pelo índice da ordenação; total de comentários vem do contador
+       blog_post.total_comentarios)
+    2. SELECT categorias (para o filtro, em cache)
+    """
+    
+    if not usuario_e_admin(request.user):
+        messages.error(request, 'Acesso negado. Apenas administradores.')
+        return redirect('post_list')
+    
+    ordem = request.GET.get('ordem', 'recentes')
+    if ordem not in ORDENACOES_POSTS:
+        ordem = 'recentes'
+
+    filtros, params, valores = filtros_posts(request.GET)
+    pagina = paginacao.PaginaKeyset(
+        ORDENACOES_POSTS[ordem], request.GET,
+        por_pagina=paginacao.ler_por_pagina(request.GET),
+    )
+
+    condicao, params_cursor = pagina.condicao()
+    if condicao:
+        filtros.append(condicao)
+        params += params_cursor
+
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ''
+
+    with db.cursor_leitura() as cursor:
+        # SQL: Página de posts
+        cursor.execute(f"""
             SELECT 
                 p.id,
                 p.titulo,
@@ -1487,57 +1998,300 @@ def admin_posts(request):
                 p.criado_em,
                 u.username AS autor,
                 c.nome AS categoria,
-                COUNT(DISTINCT com.id) AS total_comentarios
+                p.total_comentarios,
+                COALESCE(v.total, 0) AS visualizacoes
             FROM blog_post p
             INNER JOIN auth_user u ON p.autor_id = u.id
             LEFT JOIN blog_categoria c ON p.categoria_id = c.id
-            LEFT JOIN blog_comentario com ON p.id = com.post_id
-            GROUP BY p.id, u.username, c.nome
-            ORDER BY p.criado_em DESC
-        """)
+            LEFT JOIN blog_visualizacoespost v ON v.post_id = p.id
+            {where}
+            ORDER BY {pagina.order_by()}
+            LIMIT %s
+        """, params + [pagina.limite])
         
-        posts = cursor.fetchall()
+        posts = pagina.ler(cursor)
     
     return render(request, 'blog/admin/posts_lista.html', {
-        'posts': posts
+        'posts': posts,
+        'categorias': categorias.listar_categorias(),
+        'filtros': valores,
+        'filtros_query': urlencode({k: v for k, v in valores.items() if v}),
+        'ordem': ordem,
+        'ordens': ORDENS_POSTS_ROTULOS,
+        'pagina': pagina,
     })
 
 
+# Ordenações da lista de usuários (cada uma com índice correspondente)
+ORDENACOES_USUARIOS = {
+    'recentes': paginacao.Ordenacao(['u.date_joined', 'u.id'], [datetime, int], descendente=True),
+    'antigos': paginacao.Ordenacao(['u.date_joined', 'u.id'], [datetime, int]),
+    'username': paginacao.Ordenacao(['u.username'], [str]),
+    'username_desc': paginacao.Ordenacao(['u.username'], [str], descendente=True),
+    'email': paginacao.Ordenacao(['u.email', 'u.id'], [str, int]),
+}
+
+ORDENS_USUARIOS_ROTULOS = [
+    ('recentes', 'Mais recentes'),
+    ('antigos', 'Mais antigos'),
+    ('username', 'Username A-Z'),
+    ('username_desc', 'Username Z-A'),
+    ('email', 'Email A-Z'),
+]
+
+
+def filtros_usuarios(parametros):
+    """
+    Monta o WHERE da lista de usuários do admin a partir dos parâmetros GET
+
+    - q: prefixo do username ou do email, sem diferenciar maiúsculas
+
+    Retorna (filtros, params, busca) com alias u = auth_user
+    """
+    filtros = []
+    params = []
+
+    busca = parametros.get('q', '').strip()[:150]
+    if busca:
+        # Prefixo: usa os índices lower(...) varchar_pattern_ops
+        termo = paginacao.termo_prefixo(busca)
+        filtros.append("(lower(u.username) LIKE %s OR lower(u.email) LIKE %s)")
+        params += [termo, termo]
+
+    return filtros, params, busca
+
+
 @login_required
 def admin_usuarios(request):
     """
-    Listar todos os usuários (admin) - SQL PURO
-    
+    Listar usuários (admin) - SQL PURO, paginado por cursor
+
+    Parâmetros GET:
+    - q: busca por prefixo no username ou email (sem diferenciar maiúsculas)
+    - ordem: recentes | antigos | username | username_desc | email
+    - depois / antes: cursor da página (gerado pela própria listagem)
+    - por_pagina: 10 a 200 (padrão 50)
+
     SQL EXECUTADO:
-    SELECT usuários com perfil
+    SELECT página de usuários (keyset pelo índice da ordenação) e, só para as
+    linhas da página, subqueries COUNT(*) de posts e comentários por índice
+    (evita o JOIN posts × comentários + COUNT(DISTINCT) sobre todos os usuários)
     """
     
     if not usuario_e_admin(request.user):
         messages.error(request, 'Acesso negado. Apenas administradores.')
         return redirect('post_list')
     
-    with connection.cursor() as cursor:
-        # SQL: Listar usuários com perfil
-        cursor.execute("""
+    ordem = request.GET.get('ordem', 'recentes')
+    if ordem not in ORDENACOES_USUARIOS:
+        ordem = 'recentes'
+
+    filtros, params, busca = filtros_usuarios(request.GET)
+    pagina = paginacao.PaginaKeyset(
+        ORDENACOES_USUARIOS[ordem], request.GET,
+        por_pagina=paginacao.ler_por_pagina(request.GET),
+    )
+
+    condicao, params_cursor = pagina.condicao()
+    if condicao:
+        filtros.append(condicao)
+        params += params_cursor
+
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ''
+
+    with db.cursor_leitura() as cursor:
+        # SQL: Página de usuários; contagens calculadas apenas para essas linhas
+        cursor.execute(f"""
             SELECT 
-                u.id,
-                u.username,
-                u.email,
-                u.date_joined,
-                p.tipo_usuario,
-                p.ativo,
-                COUNT(DISTINCT po.id) AS total_posts,
-                COUNT(DISTINCT c.id) AS total_comentarios
-            FROM auth_user u
-            LEFT JOIN blog_perfilusuario p ON u.id = p.usuario_id
-            LEFT JOIN blog_post po ON u.id = po.autor_id
-            LEFT JOIN blog_comentario c ON u.id = c.autor_id
-            GROUP BY u.id, u.username, u.email, u.date_joined, p.tipo_usuario, p.ativo
-            ORDER BY u.date_joined DESC
-        """)
+                pg.id,
+                pg.username,
+                pg.email,
+                pg.date_joined,
+                pg.tipo_usuario,
+                pg.ativo,
+                (SELECT COUNT(*) FROM blog_post po WHERE po.autor_id = pg.id AND po.excluido_em IS NULL) AS total_posts,
+                (SELECT COUNT(*) FROM blog_comentario c WHERE c.autor_id = pg.id) AS total_comentarios
+            FROM (
+                SELECT u.id, u.username, u.email, u.date_joined, p.tipo_usuario, p.ativo
+                FROM auth_user u
+                LEFT JOIN blog_perfilusuario p ON u.id = p.usuario_id
+                {where}
+                ORDER BY {pagina.order_by()}
+                LIMIT %s
+            ) pg
+            ORDER BY {pagina.order_by(qualificada=False)}
+        """, params + [pagina.limite])
         
-        usuarios = cursor.fetchall()
+        usuarios = pagina.ler(cursor)
     
     return render(request, 'blog/admin/usuarios_lista.html', {
-        'usuarios': usuarios
-    })
\ No newline at end of file
+        'usuarios': usuarios,
+        'busca': busca,
+        'ordem': ordem,
+        'ordens': ORDENS_USUARIOS_ROTULOS,
+        'pagina': pagina,
+    })
+
+
+# Exportações: tipo -> (colunas, SELECT sem WHERE, filtros aceitos, ORDER BY)
+# Comentários e reações aceitam os mesmos filtros da lista de posts
+# (aplicados ao post de cada linha)
+EXPORTACOES = {
+    'usuarios': (
+        ['id', 'username', 'email', 'date_joined', 'tipo_usuario', 'ativo',
+         'total_posts', 'total_comentarios'],
+        """
+            SELECT u.id, u.username, u.email, u.date_joined, p.tipo_usuario, p.ativo,
+                   (SELECT COUNT(*) FROM blog_post po WHERE po.autor_id = u.id AND po.excluido_em IS NULL),
+                   (SELECT COUNT(*) FROM blog_comentario c WHERE c.autor_id = u.id)
+            FROM auth_user u
+            LEFT JOIN blog_perfilusuario p ON u.id = p.usuario_id
+        """,
+        'usuarios',
+        'u.id',
+    ),
+    'posts': (
+        ['id', 'titulo', 'slug', 'autor', 'categoria', 'criado_em', 'atualizado_em',
+         'total_comentarios'],
+        """
+            SELECT p.id, p.titulo, p.slug, u.username, c.nome, p.criado_em, p.atualizado_em,
+                   p.total_comentarios
+            FROM blog_post p
+            INNER JOIN auth_user u ON p.autor_id = u.id
+            LEFT JOIN blog_categoria c ON p.categoria_id = c.id
+        """,
+        'posts',
+        'p.id',
+    ),
+    'comentarios': (
+        ['id', 'post_id', 'post_slug', 'autor', 'conteudo', 'criado_em', 'atualizado_em'],
+        """
+            SELECT com.id, p.id, p.slug, u.username, com.conteudo, com.criado_em, com.atualizado_em
+            FROM blog_comentario com
+            INNER JOIN blog_post p ON com.post_id = p.id
+            LEFT JOIN auth_user u ON com.autor_id = u.id
+        """,
+        'posts',
+        'com.id',
+    ),
+    'reacoes': (
+        ['id', 'post_id', 'post_slug', 'usuario', 'tipo_reacao', 'criado_em'],
+        """
+            SELECT r.id, p.id, p.slug, u.username, r.tipo_reacao, r.criado_em
+            FROM blog_reacaousuariopost r
+            INNER JOIN blog_post p ON r.post_id = p.id
+            INNER JOIN auth_user u ON r.usuario_id = u.id
+        """,
+        'posts',
+        'r.id',
+    ),
+}
+
+
+@login_required
+def admin_exportar(request, tipo):
+    """
+    Exporta usuários, posts, comentários ou reações (admin) em CSV ou JSONL
+
+    Parâmetros GET:
+    - formato: csv (padrão) | jsonl
+    - os mesmos filtros de admin_usuarios (usuarios) ou admin_posts (demais)
+
+    SQL EXECUTADO:
+    SELECT ... ORDER BY id lido em lotes por cursor do servidor (ver exportacao.py)
+    """
+    if not usuario_e_admin(request.user):
+        messages.error(request, 'Acesso negado. Apenas administradores.')
+        return redirect('post_list')
+
+    formato = request.GET.get('formato', 'csv')
+    if tipo not in EXPORTACOES or formato not in exportacao.FORMATOS:
+        messages.error(request, 'Exportação inválida.')
+        return redirect('painel_admin')
+
+    colunas, consulta, tipo_filtro, ordem = EXPORTACOES[tipo]
+    if tipo_filtro == 'usuarios':
+        filtros, params, _ = filtros_usuarios(request.GET)
+    else:
+        filtros, params, _ = filtros_posts(request.GET)
+
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ''
+    sql = f"{consulta} {where} ORDER BY {ordem}"
+
+    return exportacao.exportar(tipo, colunas, sql, params, formato)
+
+
+def feed_posts(request, formato='rss', categoria_id=None):
+    """
+    Feed RSS/Atom dos últimos posts (todos ou de uma categoria)
+
+    XML inteiro em cache (ver feeds.py); responde 304 quando o leitor já tem
+    a versão atual (If-None-Match / If-Modified-Since).
+
+    SQL EXECUTADO (apenas quando o cache expira ou é invalidado):
+    1. SELECT nome da categoria (feed por categoria)
+    2. SELECT últimos posts com resumo
+    """
+    dados = feeds.feed_em_cache(request, formato, categoria_id)
+    if dados is None:
+        raise Http404('Categoria não encontrada.')
+
+    xml, ultima_modificacao, etag = dados
+    response = HttpResponse(xml, content_type=feeds.FORMATOS[formato].content_type)
+    response['ETag'] = etag
+    if ultima_modificacao:
+        response['Last-Modified'] = http_date(ultima_modificacao.timestamp())
+    patch_cache_control(response, public=True, max_age=300)
+
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=ultima_modificacao.timestamp() if ultima_modificacao else None,
+        response=response,
+    )
+
+
+def sitemap_indice(request):
+    """
+    Índice dos sitemaps (uma entrada por seção de até 50 mil posts)
+
+    SQL EXECUTADO:
+    1. SELECT MIN(id), MAX(id) FROM blog_post (ver sitemaps.py)
+    """
+    base = request.build_absolute_uri('/').rstrip('/')
+    response = HttpResponse(sitemaps.gerar_indice(base), content_type='application/xml')
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
+
+
+def sitemap_secao(request, secao):
+    """
+    Seção do sitemap: do cache ou gerada em streaming (cursor do servidor)
+
+    Seção fora de sitemaps.intervalo_secoes(): 404 (nada vai ao cache)
+    
+    SQL EXECUTADO:
+    1. SELECT MIN(id), MAX(id) dos posts visíveis (intervalo_secoes)
+    2. SELECT slug, atualizado_em ... WHERE id no intervalo da seção, em
+       lotes (apenas se a seção mudou ou saiu do cache)
+    """
+    if secao not in sitemaps.intervalo_secoes():
+        raise Http404('Seção do sitemap inexistente.')
+    
+    base = request.build_absolute_uri('/').rstrip('/')
+    dados = sitemaps.secao_em_cache(secao, base)
+
+    if dados is None:
+        response = StreamingHttpResponse(sitemaps.gerar_secao(secao, base),
+                                         content_type='application/xml')
+    else:
+        xml, lastmod = dados
+        response = HttpResponse(xml, content_type='application/xml')
+        if lastmod:
+            response['Last-Modified'] = http_date(lastmod.timestamp())
+            response = get_conditional_response(
+                request, last_modified=lastmod.timestamp(), response=response
+            )
+
+    patch_cache_control(response, public=True, max_age=3600)
+    return response
@@ -0,0 +1,396 @@
+"""
+Views assíncronas do caminho de leitura (ASGI) - SQL PURO
+
+Versões async def de post_list, post_detail, post_personalizacao e
+toggle_reacao. As consultas
+vão pelo pool assíncrono de db_async e as independentes rodam ao mesmo
+tempo com asyncio.gather: a página espera a consulta mais lenta, não a
+soma delas, e o worker atende outras requisições enquanto espera o banco.
+
+- post_list: posts + categorias (barra lateral) + total + nome da categoria
+  + rankings (ranking.py)
+- post_detail: post + casca pública em cache; fora do cache, contagem de
+  reações e comentários em paralelo
+- post_personalizacao: reação do usuário e ids dos comentários dele
+- eventos_post: Server-Sent Events de reações/comentários (eventos.py)
+
+A formatação para o template é a mesma das views síncronas
+(views.contexto_post_list, views.formatar_post_detalhe, ...). O render
+roda em thread (sync_to_async): o template consulta request.user.perfil e
+as mensagens da sessão pelo ORM síncrono.
+
+Ativadas em blog/urls.py quando settings.VIEWS_ASYNC (meublog/asgi.py
+liga por padrão). Sem psycopg_pool instalado, delegam às views síncronas.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import require_POST
+
+from . import (
+    cache_camadas, categorias, db_async, eventos, lista_posts, ranking, renderizacao, revalidacao,
+    views, visualizacoes,
+)
+
+
+# Subconsulta pelo slug: as consultas do post_detail não esperam o id
+SQL_ID_POR_SLUG = "(SELECT id FROM blog_post WHERE slug = %s AND excluido_em IS NULL)"
+
+TIPOS_REACAO = ['curtir', 'amei', 'engraçado', 'não_gostei']
+
+_render = sync_to_async(render)
+
+
+async def post_list(request):
+    """
+    Lista posts com filtro opcional por categoria (async)
+
+    Mesmo cache com revalidação de views.post_list (lista_posts.py);
+    no recálculo as consultas rodam em paralelo.
+
+    SQL EXECUTADO (apenas no recálculo do cache):
+    1. SELECT primeira página de posts (com/sem filtro de categoria)
+    2. SELECT categorias com contagem de posts
+    3. COUNT total de posts
+    4. SELECT nome da categoria selecionada (se houver filtro)
+    5. Consolidar baldes + SELECT top N "Em alta", "Mais comentados" e
+       "Mais vistos"
+    """
+    if not db_async.disponivel():
+        return await sync_to_async(views.post_list)(request)
+
+    try:
+        categoria_id = int(request.GET.get('categoria', ''))
+    except ValueError:
+        categoria_id = None
+
+    (posts, categoria_selecionada, total_posts, pagina), lista_categorias, ranking_posts = await asyncio.gather(
+        lista_posts.alista_posts(categoria_id, request.GET),
+        categorias.acategorias_com_contagem(),
+        ranking.aranking_posts(),
+    )
+
+    return await _render(request, 'blog/post_list.html', views.contexto_post_list(
+        posts, lista_categorias, categoria_selecionada, total_posts, ranking_posts, pagina
+    ))
+
+
+async def _comentar(request, slug, usuario):
+    """
+    Novo comentário (POST de post_detail)
+
+    Retorna o redirect, ou None para exibir a página com a mensagem de erro
+
+    SQL EXECUTADO (uma transação):
+    1. WITH alvo (post pelo slug), novo (INSERT comentário)
+       UPDATE blog_post SET total_comentarios + 1, versao_comentarios + 1
+       (um único comando)
+    2. UPSERT balde de atividade do post (ver ranking.py)
+    3. SELECT pg_notify (novo comentário para as abas abertas no post)
+    """
+    conteudo = request.POST.get('conteudo', '').strip()
+    if not conteudo:
+        messages.error(request, 'O comentário não pode estar vazio.')
+        return None
+    if len(conteudo) > views.TAMANHO_MAXIMO_COMENTARIO:
+        messages.error(
+            request,
+            f'O comentário deve ter no máximo {views.TAMANHO_MAXIMO_COMENTARIO} caracteres.',
+        )
+        return None
+
+    try:
+        async with db_async.conexao() as conexao:
+            async with conexao.transaction():
+                cursor = await conexao.execute(f"""
+                    WITH alvo AS {SQL_ID_POR_SLUG},
+                    novo AS (
+                        INSERT INTO blog_comentario
+                        (post_id, autor_id, conteudo, criado_em, atualizado_em)
+                        SELECT id, %s, %s, NOW(), NOW() FROM alvo
+                        RETURNING id, post_id, criado_em
+                    ),
+                    contador AS (
+                        UPDATE blog_post
+                        SET total_comentarios = total_comentarios + 1,
+                            versao_comentarios = versao_comentarios + 1
+                        WHERE id = (SELECT post_id FROM novo)
+                        RETURNING total_comentarios
+                    )
+                    SELECT novo.post_id, novo.id, novo.criado_em, contador.total_comentarios
+                    FROM novo, contador
+                """, [slug, usuario.id, conteudo])
+                linha = await cursor.fetchone()
+
+                if linha is not None:
+                    post_id, novo_id, criado_em, total_comentarios = linha
+                    # SQL: Comentário conta para os rankings (ver ranking.py)
+                    await ranking.aregistrar(conexao, post_id, comentarios=1)
+                    # SQL: Avisar as abas abertas (entregue no COMMIT)
+                    await eventos.apublicar(conexao, post_id, 'comentario', {
+                        'id': novo_id,
+                        'autor': usuario.username,
+                        'autor_id': usuario.id,
+                        'conteudo': conteudo,
+                        'criado_em': criado_em,
+                        'total_comentarios': total_comentarios,
+                    })
+    except Exception as e:
+        messages.error(request, f'Erro ao adicionar comentário: {str(e)}')
+        return None
+
+    if linha is None:
+        messages.error(request, 'Post não encontrado.')
+        return redirect('post_list')
+
+    messages.success(request, 'Comentário adicionado com sucesso!')
+    return redirect('post_detail', slug=slug)
+
+
+async def _html_comentarios(post_id, versao):
+    """Versão assíncrona de views.html_comentarios() (mesma chave de cache)"""
+    async def calcular():
+        linhas = await db_async.buscar_todos(views.SQL_COMENTARIOS_POST, [post_id])
+        return await sync_to_async(views.renderizar_comentarios)(linhas)
+
+    html = await revalidacao.aobter(
+        views.chave_comentarios(post_id, versao), calcular, views.CACHE_COMENTARIOS_SEGUNDOS
+    )
+    return mark_safe(html)
+
+
+async def _casca_post(post):
+    """Versão assíncrona de views.casca_post() (mesma chave de cache)"""
+    async def calcular():
+        reacoes_contagem, comentarios_html = await asyncio.gather(
+            db_async.buscar_todos(views.SQL_REACOES_POST, [post['id']]),
+            _html_comentarios(post['id'], post['versao_comentarios']),
+        )
+        return await sync_to_async(views.renderizar_casca)(post, reacoes_contagem, comentarios_html)
+
+    html = await revalidacao.aobter(views.chave_casca(post), calcular, views.CACHE_CASCA_SEGUNDOS)
+    return mark_safe(html)
+
+
+async def post_detail(request, slug):
+    """
+    Exibe post com comentários e permite comentar (async)
+
+    Mesma casca pública em cache de views.post_detail; a parte por usuário
+    vem de post_personalizacao.
+
+    SQL EXECUTADO:
+    1. INSERT comentário + UPDATE total_comentarios (se POST)
+    2. SELECT post
+    3. UPDATE conteudo_html (só se gerado por versão antiga do renderizador)
+    4. Em paralelo, só se a casca não está em cache: SELECT contagem de
+       reações por tipo e comentários (ver views.casca_post)
+
+    Slug inexistente fica no cache negativo (views.chave_post_ausente) e
+    responde sem consultar o banco.
+    """
+    if not db_async.disponivel():
+        return await sync_to_async(views.post_detail)(request, slug)
+
+    chave_ausente = views.chave_post_ausente(slug)
+    if await cache.aget(chave_ausente) == cache_camadas.MARCA_AUSENTE:
+        messages.error(request, 'Post não encontrado.')
+        return redirect('post_list')
+
+    usuario = await request.auser()
+
+    if request.method == 'POST' and usuario.is_authenticated:
+        response = await _comentar(request, slug, usuario)
+        if response is not None:
+            return response
+
+    post_data = await db_async.buscar_um(views.SQL_POST_DETALHE, [slug])
+
+    if not post_data:
+        # Leitura no primário (db_async): a ausência é confiável
+        await cache.aset(chave_ausente, cache_camadas.MARCA_AUSENTE, views.CACHE_POST_AUSENTE_SEGUNDOS)
+        messages.error(request, 'Post não encontrado.')
+        return redirect('post_list')
+
+    post = views.formatar_post_detalhe(post_data)
+    if post['html_desatualizado']:
+        await renderizacao.agravar({post['id']: post['conteudo_html']})
+
+    casca = await _casca_post(post)
+    if request.method == 'GET':
+        visualizacoes.contar(post['id'])
+
+    return await _render(request, 'blog/post_detail.html', {
+        'post': post,
+        'casca': casca,
+    })
+
+
+async def post_personalizacao(request, slug):
+    """
+    Parte por usuário de post_detail (JSON, async)
+
+    SQL EXECUTADO:
+    SELECT post por slug + reação do usuário + ids dos comentários dele
+    """
+    if not db_async.disponivel():
+        return await sync_to_async(views.post_personalizacao)(request, slug)
+
+    usuario = await request.auser()
+    if not usuario.is_authenticated:
+        return views.resposta_personalizacao({'autenticado': False})
+
+    linha = await db_async.buscar_um(views.SQL_PERSONALIZACAO_POST, [usuario.id, usuario.id, slug])
+    if linha is None:
+        return views.resposta_personalizacao({'erro': 'Post não encontrado.'}, status=404)
+
+    dados = await sync_to_async(views.formatar_personalizacao)(usuario, linha)
+    return views.resposta_personalizacao(dados)
+
+
+@login_required
+@require_POST
+async def toggle_reacao(request, slug):
+    """
+    Curtir/descurtir post via AJAX (async)
+
+    SQL EXECUTADO (uma conexão, uma transação):
+    1. SELECT post por slug
+    2. SELECT reação existente do usuário
+    3. INSERT/UPDATE/DELETE reação
+    4. UPSERT balde de atividade do post (só reação nova, ver ranking.py)
+    5. SELECT contagem de reações atualizada
+    6. SELECT pg_notify (contagens para as abas abertas no post)
+    """
+    if not db_async.disponivel():
+        return await sync_to_async(views.toggle_reacao)(request, slug)
+
+    tipo_reacao = request.POST.get('tipo_reacao', 'curtir')
+    if tipo_reacao not in TIPOS_REACAO:
+        return JsonResponse({'erro': 'Tipo de reação inválido', 'sucesso': False}, status=400)
+
+    usuario = await request.auser()
+
+    try:
+        async with db_async.conexao() as conexao:
+            async with conexao.transaction():
+                cursor = await conexao.execute("""
+                    SELECT id FROM blog_post WHERE slug = %s AND excluido_em IS NULL
+                """, [slug])
+                post_data = await cursor.fetchone()
+                if not post_data:
+                    return JsonResponse({'erro': 'Post não encontrado', 'sucesso': False}, status=404)
+
+                post_id = post_data[0]
+
+                cursor = await conexao.execute("""
+                    SELECT id, tipo_reacao
+                    FROM blog_reacaousuariopost
+                    WHERE usuario_id = %s AND post_id = %s
+                """, [usuario.id, post_id])
+                reacao_existente = await cursor.fetchone()
+
+                if reacao_existente and reacao_existente[1] == tipo_reacao:
+                    # SQL: Remover reação (mesmo tipo clicado novamente)
+                    await conexao.execute("""
+                        DELETE FROM blog_reacaousuariopost WHERE id = %s
+                    """, [reacao_existente[0]])
+                    reacao_adicionada = False
+                elif reacao_existente:
+                    # SQL: Atualizar tipo de reação
+                    await conexao.execute("""
+                        UPDATE blog_reacaousuariopost SET tipo_reacao = %s WHERE id = %s
+                    """, [tipo_reacao, reacao_existente[0]])
+                    reacao_adicionada = True
+                else:
+                    # SQL: Inserir nova reação
+                    await conexao.execute("""
+                        INSERT INTO blog_reacaousuariopost
+                        (usuario_id, post_id, tipo_reacao, criado_em)
+                        VALUES (%s, %s, %s, NOW())
+                    """, [usuario.id, post_id, tipo_reacao])
+                    reacao_adicionada = True
+                    # SQL: Reação nova conta para "Em alta" (ver ranking.py)
+                    await ranking.aregistrar(conexao, post_id, reacoes=1)
+
+                cursor = await conexao.execute("""
+                    SELECT tipo_reacao, COUNT(*) as total
+                    FROM blog_reacaousuariopost
+                    WHERE post_id = %s
+                    GROUP BY tipo_reacao
+                """, [post_id])
+                reacoes_dict = {r[0]: r[1] for r in await cursor.fetchall()}
+
+                # SQL: Avisar as abas abertas (entregue no COMMIT)
+                await eventos.apublicar(conexao, post_id, 'reacoes', {
+                    'reacoes': reacoes_dict,
+                    'total': sum(reacoes_dict.values()),
+                })
+
+        return JsonResponse({
+            'sucesso': True,
+            'reacao_adicionada': reacao_adicionada,
+            'tipo_reacao': tipo_reacao,
+            'reacoes': reacoes_dict,
+            'total_reacoes': sum(reacoes_dict.values()),
+        })
+
+    except Exception as e:
+        return JsonResponse({'erro': str(e), 'sucesso': False}, status=500)
+
+
+INTERVALO_PING = 15
+
+
+async def eventos_post(request, slug):
+    """
+    Server-Sent Events do post: reações e comentários ao vivo
+
+    A aba assina o ouvinte do processo (eventos.ouvinte); nenhuma consulta
+    por evento. Um comentário ": ping" a cada INTERVALO_PING segundos mantém
+    a conexão aberta em proxies.
+
+    Só sob ASGI (settings.VIEWS_ASYNC) com psycopg instalado; caso contrário
+    responde 204, e o EventSource do navegador para de tentar.
+
+    SQL EXECUTADO:
+    1. SELECT id do post pelo slug
+    """
+    if not settings.VIEWS_ASYNC or not eventos.ouvinte.disponivel():
+        return HttpResponse(status=204)
+
+    linha = await db_async.buscar_um(
+        "SELECT id FROM blog_post WHERE slug = %s AND excluido_em IS NULL", [slug]
+    )
+    if linha is None:
+        return HttpResponse(status=204)
+    post_id = linha[0]
+
+    async def transmitir():
+        fila = eventos.ouvinte.assinar(post_id)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    evento = await asyncio.wait_for(fila.get(), INTERVALO_PING)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+                    continue
+                dados = json.dumps(evento, ensure_ascii=False)
+                yield f"event: {evento['tipo']}\ndata: {dados}\n\n"
+        finally:
+            eventos.ouvinte.cancelar(post_id, fila)
+
+    response = StreamingHttpResponse(transmitir(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: não segurar o stream
+    return response
@@ -0,0 +1,104 @@
+"""
+Contador de visualizações dos posts - SQL PURO
+
+UPDATE blog_post SET visualizacoes = visualizacoes + 1 a cada post_detail
+enfileira todas as requisições de um post popular no lock da mesma linha
+(e reescreve a linha inteira do post a cada visita). Aqui:
+
+- contar() só soma num dicionário em memória do processo (post_id -> n)
+- Uma thread por processo descarrega o acumulado a cada
+  VISUALIZACOES_SEGUNDOS_DESCARGA segundos, num único comando:
+  INSERT ... ON CONFLICT DO UPDATE SET total = total + n na tabela
+  blog_visualizacoespost (fora de blog_post: editar o post não disputa
+  lock com o contador)
+- As linhas vão ordenadas por post_id: vários processos descarregando ao
+  mesmo tempo travam as linhas na mesma ordem (sem deadlock), e cada
+  linha recebe no máximo uma escrita por processo por intervalo
+
+Visualizações ainda não descarregadas se perdem se o processo morrer sem
+sair normalmente (na saída normal, atexit descarrega). Falha do banco na
+descarga devolve as contagens ao acumulado para a próxima tentativa.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+SEGUNDOS_DESCARGA = getattr(settings, 'VISUALIZACOES_SEGUNDOS_DESCARGA', 5)
+
+# JOIN com blog_post: contagens de post apagado no meio do caminho são descartadas
+SQL_DESCARREGAR = """
+    INSERT INTO blog_visualizacoespost (post_id, total, atualizado_em)
+    SELECT v.post_id, v.n, NOW()
+    FROM unnest(%s::bigint[], %s::bigint[]) AS v(post_id, n)
+    INNER JOIN blog_post p ON p.id = v.post_id
+    ORDER BY v.post_id
+    ON CONFLICT (post_id) DO UPDATE
+    SET total = blog_visualizacoespost.total + EXCLUDED.total,
+        atualizado_em = NOW()
+"""
+
+_trava = threading.Lock()
+_acumulado = Counter()
+_thread_ativa = False
+
+
+def contar(post_id):
+    """Soma uma visualização (só memória; seguro em views síncronas e async)"""
+    global _thread_ativa
+
+    with _trava:
+        _acumulado[post_id] += 1
+        if _thread_ativa:
+            return
+        _thread_ativa = True
+
+    atexit.register(descarregar)
+    threading.Thread(target=_trabalhar, name='visualizacoes', daemon=True).start()
+
+
+def descarregar():
+    """
+    Grava o acumulado do processo (um único comando, linhas em ordem de id)
+
+    SQL EXECUTADO:
+    INSERT INTO blog_visualizacoespost ... SELECT FROM unnest(ids, contagens)
+    ORDER BY post_id ON CONFLICT (post_id) DO UPDATE SET total = total + n
+    """
+    global _acumulado
+
+    with _trava:
+        pendentes, _acumulado = _acumulado, Counter()
+    if not pendentes:
+        return 0
+
+    ids = sorted(pendentes)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(SQL_DESCARREGAR, [ids, [pendentes[post_id] for post_id in ids]])
+    except Exception:
+        # Volta para o acumulado: a próxima descarga tenta de novo
+        with _trava:
+            _acumulado.update(pendentes)
+        raise
+    return len(ids)
+
+
+def _trabalhar():
+    while True:
+        time.sleep(SEGUNDOS_DESCARGA)
+        try:
+            descarregar()
+        except Exception:
+            logger.exception('Falha ao descarregar visualizações')
+            # Conexão própria da thread: reabre na próxima descarga
+            connection.close()
+
@@ -59,6 +59,41 @@ ON blog_post(autor_id, criado_em DESC);
 
 \echo '  ✓ Índice criado: idx_post_autor_data (composto)'
 
+-- Índices COMPOSTOS para paginação por cursor em admin_posts
+-- (id como desempate: WHERE (criado_em, id) < (%s, %s) ORDER BY criado_em DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_post_criado_id 
+ON blog_post(criado_em, id);
+
+\echo '  ✓ Índice criado: idx_post_criado_id (composto)'
+
+CREATE INDEX IF NOT EXISTS idx_post_autor_criado_id 
+ON blog_post(autor_id, criado_em, id);
+
+\echo '  ✓ Índice criado: idx_post_autor_criado_id (composto)'
+
+CREATE INDEX IF NOT EXISTS idx_post_cat_criado_id 
+ON blog_post(categoria_id, criado_em, id);
+
+\echo '  ✓ Índice criado: idx_post_cat_criado_id (composto)'
+
+CREATE INDEX IF NOT EXISTS idx_post_titulo_id 
+ON blog_post(titulo, id);
+
+\echo '  ✓ Índice criado: idx_post_titulo_id (composto)'
+
+-- Ordenação "mais comentados" pelo contador desnormalizado
+CREATE INDEX IF NOT EXISTS idx_post_total_comentarios_id 
+ON blog_post(total_comentarios, id);
+
+\echo '  ✓ Índice criado: idx_post_total_comentarios_id (composto)'
+
+-- Índice para achar o post que referencia um arquivo de imagem
+-- Usado em: midia.liberar_imagem() e no comando limpar_midia
+CREATE INDEX IF NOT EXISTS idx_post_imagem 
+ON blog_post(imagem);
+
+\echo '  ✓ Índice criado: idx_post_imagem'
+
 -- ============================================================================
 -- ÍNDICES PARA TABELA: blog_comentario
 -- ============================================================================
@@ -84,6 +119,13 @@ ON blog_comentario(post_id, criado_em DESC);
 
 \echo '  ✓ Índice criado: idx_comentario_post_data (composto)'
 
+-- Paginação por cursor dos comentários de um post (API)
+-- WHERE post_id = %s AND (criado_em, id) < (%s, %s) ORDER BY criado_em DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_comentario_post_criado_id 
+ON blog_comentario(post_id, criado_em, id);
+
+\echo '  ✓ Índice criado: idx_comentario_post_criado_id (composto)'
+
 -- ============================================================================
 -- ÍNDICES PARA TABELA: blog_reacaousuariopost
 -- ============================================================================
@@ -169,6 +211,31 @@ ON auth_user(username, is_active);
 
 \echo '  ✓ Índice criado: idx_user_username_active (composto)'
 
+-- Índices para busca por prefixo sem diferenciar maiúsculas
+-- Usado em: admin_usuarios (?q=) -> lower(username) LIKE 'abc%'
+-- varchar_pattern_ops permite LIKE por prefixo independente do collation
+CREATE INDEX IF NOT EXISTS idx_user_username_lower 
+ON auth_user(lower(username) varchar_pattern_ops);
+
+\echo '  ✓ Índice criado: idx_user_username_lower (busca por prefixo)'
+
+CREATE INDEX IF NOT EXISTS idx_user_email_lower 
+ON auth_user(lower(email) varchar_pattern_ops);
+
+\echo '  ✓ Índice criado: idx_user_email_lower (busca por prefixo)'
+
+-- Índices COMPOSTOS para paginação por cursor em admin_usuarios
+-- (ordenação por data de cadastro ou email, com id como desempate)
+CREATE INDEX IF NOT EXISTS idx_user_date_joined_id 
+ON auth_user(date_joined, id);
+
+\echo '  ✓ Índice criado: idx_user_date_joined_id (composto)'
+
+CREATE INDEX IF NOT EXISTS idx_user_email_id 
+ON auth_user(email, id);
+
+\echo '  ✓ Índice criado: idx_user_email_id (composto)'
+
 -- ============================================================================
 -- ÍNDICES PARA FULL-TEXT SEARCH (Opcional)
 -- ============================================================================
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meublog.settings')
+# Sob ASGI, post_list/post_detail/toggle_reacao usam as views async
+# (blog/views_async.py). MEUBLOG_ASYNC=0 volta para as síncronas.
+os.environ.setdefault('MEUBLOG_ASYNC', '1')
 
 application = get_asgi_application()
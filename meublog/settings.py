@@ -1,4 +1,4 @@
-#import os
+import os
 from pathlib import Path
 
 # Caminho base do projeto
@@ -36,6 +36,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'blog.middleware.LeituraPrimarioMiddleware',  # Réplica: ler o que acabou de escrever
+    'blog.middleware.InvalidacaoMiddleware',  # Caches locais: ouvinte de invalidação
 ]
 
 ROOT_URLCONF = 'meublog.urls'
@@ -70,6 +72,56 @@ DATABASES = {
     }
 }
 
+# Views async do caminho de leitura (blog/views_async.py): ligadas pelo
+# meublog/asgi.py; sob WSGI continuam as síncronas
+VIEWS_ASYNC = os.environ.get('MEUBLOG_ASYNC') == '1'
+# Conexões máximas do pool assíncrono (psycopg_pool) por worker ASGI
+ASYNC_POOL_MAXIMO = 20
+
+# Réplica de leitura (opcional): leituras de listagens/páginas vão para ela
+# (ver blog/db.py). Ativada quando DB_REPLICA_HOST está definido.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', '5432'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Segundos de atraso tolerados antes de voltar a ler do primário
+REPLICA_ATRASO_MAXIMO = 5
+# Após um POST, o mesmo cliente lê do primário por este tempo (segundos)
+REPLICA_JANELA_POS_ESCRITA = 15
+
+# Cache em duas camadas (blog/cache_camadas.py): LRU em cada processo na
+# frente de um cache compartilhado. Com REDIS_URL a camada compartilhada é
+# o Redis; sem ele, arquivos em disco (compartilhados pelos processos da
+# mesma máquina - substituto para desenvolvimento e testes). Com DEBUG=False
+# o REDIS_URL é obrigatório: a trava de recálculo precisa de add() atômico
+if os.environ.get('REDIS_URL'):
+    CACHE_COMPARTILHADO = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+else:
+    CACHE_COMPARTILHADO = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'blog.cache_camadas.CacheEmCamadas',
+        'LOCATION': 'default',  # nome da camada local (uma por processo)
+        'OPTIONS': {
+            'COMPARTILHADO': 'compartilhado',
+            'MAXIMO_LOCAL': 1000,   # entradas no LRU de cada processo
+            'SEGUNDOS_LOCAL': 5,    # validade máxima de uma cópia local
+        },
+    },
+    'compartilhado': CACHE_COMPARTILHADO,
+}
+
 # Validações de senha
 AUTH_PASSWORD_VALIDATORS = [
     {